@@ -59,6 +59,7 @@ DATA_DIR="$CONFIG_DIR/data"
 MODELS_DIR="$CONFIG_DIR/models"
 PROXY_FILE="$CONFIG_DIR/proxies.json"
 API_KEYS_FILE="$CONFIG_DIR/api_keys.json"
+PROFILES_FILE="$CONFIG_DIR/profiles.json"
 
 # Required tools and dependencies
 REQUIRED_TOOLS=(
@@ -815,13 +816,87 @@ GROK_API_KEY=
 USE_PROXIES=false
 PROXY_ROTATION_INTERVAL=300
 PROXY_TEST_TIMEOUT=10
+PROXY_TEST_URL=https://httpbin.org/ip
+PROXY_VERIFY_CONCURRENCY=200
+PROXY_VERIFY_TARGET=0
+PROXY_MAX_FAILURES=3
+PROXY_COOLDOWN=30
+PROXY_REVERIFY_INTERVAL=120
+PROXY_CACHE_TTL=3600
+PROXY_VERIFY_TTL=1800
+BROWSER_MAX_CONTEXTS=16
+DEVICE_SCALE_FACTOR=2.0
 
 # Scraping Settings
 DEFAULT_USER_AGENT="Mozilla/5.0 (Macintosh; Apple Silicon Mac OS X) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/118.0.0.0 Safari/537.36"
 STEALTH_MODE=true
 REQUEST_TIMEOUT=30
 MAX_RETRIES=3
+RETRY_BASE_DELAY=2
+RETRY_MAX_DELAY=60
+ADAPTIVE_CONCURRENCY=true
+HOST_INITIAL_CONCURRENCY=2
+HOST_MAX_CONCURRENCY=16
+WAIT_STRATEGY=networkidle
+NETWORKIDLE_CAP=5
+WAIT_BASELINE_SAMPLE_RATE=0.05
+WAIT_BASELINE_MAX_WAIT=10
+SCREENSHOT_FORMAT=jpeg
+SCREENSHOT_QUALITY=80
+SCREENSHOT_SCALE=1.0
+SCREENSHOT_MAX_HEIGHT=10000
+SCREENSHOT_DEDUP_DISTANCE=4
+SCREENSHOT_TILE_MAX_HEIGHT=50000
+MEMORY_PROFILE=false
+MEMORY_SNAPSHOT_EVERY=500
+MEMORY_SOFT_LIMIT_MB=0
+MEMORY_HARD_LIMIT_MB=0
+HTTP_CACHE=true
+HTTP_CACHE_MAX_MB=512
+HTTP_CACHE_TYPES=stylesheet,script,font,image
+ARCHIVE_MODE=off
+ARCHIVE_PATH=$DATA_DIR/archives/crawl.db
 DEFAULT_CRAWL_DELAY=2
+FRONTIER_ORDER=bfs
+FRONTIER_SITEMAP=true
+CRAWL_TIME_BUDGET=0
+FRONTIER_HOT_SIZE=50000
+FRONTIER_BATCH_SIZE=5000
+NEAR_DUPLICATE_MODE=flag
+NEAR_DUPLICATE_DISTANCE=3
+TEXT_EXTRACTION=offline
+EXTRACTION_WORKERS=0
+
+# Daemon Settings
+DAEMON_HOST=127.0.0.1
+DAEMON_PORT=8765
+DAEMON_SOCKET=
+DAEMON_MAX_JOBS=4
+DAEMON_CONCURRENCY=8
+DAEMON_JOB_HISTORY=1000
+DAEMON_JOB_EVENTS=1000
+DAEMON_JOB_TTL=3600
+DAEMON_TOKEN=
+
+# Job Queue Settings
+JOB_LEASE_SECONDS=60
+JOB_MAX_ATTEMPTS=3
+JOB_RETRY_DELAY=30
+WORKER_CONCURRENCY=2
+WORKER_POLL_INTERVAL=1
+
+# Change Monitoring Settings
+MONITOR_DEFAULT_INTERVAL=1d
+MONITOR_BATCH_SIZE=100
+MONITOR_POLL_INTERVAL=60
+
+# Metrics Settings
+LOOP_LAG_MONITOR=true
+LOOP_LAG_INTERVAL=0.1
+LOOP_LAG_THRESHOLD=0.25
+METRICS_ENABLED=false
+METRICS_HOST=127.0.0.1
+METRICS_PORT=9464
 
 # Storage Settings
 VECTOR_DB_PATH=$DATA_DIR/vectors
@@ -865,6 +940,28 @@ EOF
         echo -e "${GREEN}✓${RESET} Using existing api_keys.json file"
     fi
     
+    # Create default crawl profiles file if it doesn't exist
+    if [[ ! -f "$PROFILES_FILE" ]]; then
+        cat > "$PROFILES_FILE" << EOF
+{
+  "default": {
+    "wait": "networkidle",
+    "networkidle_cap": 5,
+    "timeout": 30,
+    "screenshots": "full",
+    "url_rules": [
+      {"pattern": "/(tag|tags|category|categories|author|archive)/", "weight": -2},
+      {"pattern": "([?&]page=[0-9]+|/page/[0-9]+)", "weight": -1.5},
+      {"pattern": "/(privacy|terms|cookies?|login|signin|signup|register|cart)([/?#]|$)", "weight": -3}
+    ]
+  }
+}
+EOF
+        echo -e "${GREEN}✓${RESET} Created profiles.json file"
+    else
+        echo -e "${GREEN}✓${RESET} Using existing profiles.json file"
+    fi
+    
     show_progress "Configuration files generated" 1
 }
 
@@ -929,17 +1026,24 @@ import logging
 import time
 from typing import List, Dict, Any, Optional, Union
 from pathlib import Path
-from datetime import datetime
+from datetime import datetime, timezone
 import random
 import socket
+import subprocess
 import traceback
 import argparse
 import urllib.parse
 from functools import wraps
-from contextlib import contextmanager
+from contextlib import contextmanager, asynccontextmanager, nullcontext, AsyncExitStack
+import itertools
+import collections
+import io
+import types
+import email.utils
 import re
 import signal
 import hashlib
+import hmac
 import base64
 import tempfile
 import shutil
@@ -949,6 +1053,15 @@ import concurrent.futures
 import threading
 import queue
 import uuid
+import heapq
+import gc
+import tracemalloc
+import bisect
+import math
+import gzip
+import importlib
+import xml.etree.ElementTree as ElementTree
+from html.parser import HTMLParser
 
 # Check Python version
 if sys.version_info < (3, 9):
@@ -972,7 +1085,9 @@ try:
     import requests
     from bs4 import BeautifulSoup
     import aiohttp
+    from aiohttp import web
     from playwright.async_api import async_playwright, Browser, Page, BrowserContext
+    from playwright.async_api import Error as PlaywrightError, TimeoutError as PlaywrightTimeoutError
     import pandas as pd
     import numpy as np
     from PIL import Image
@@ -992,7 +1107,15 @@ try:
             HAS_MLX = False
     except ImportError:
         HAS_MLX = False
-    
+
+    # Optional SciPy for sparse graph algorithms
+    try:
+        from scipy.sparse import csr_matrix
+        from scipy.sparse.csgraph import connected_components
+        HAS_SCIPY = True
+    except ImportError:
+        HAS_SCIPY = False
+
     # Try to import API clients
     try:
         import openai
@@ -1120,13 +1243,15 @@ class Configuration:
         self.env_file = os.path.join(self.config_dir, ".env")
         self.api_keys_file = os.path.join(self.config_dir, "api_keys.json")
         self.proxies_file = os.path.join(self.config_dir, "proxies.json")
-        self.data_dir = os.path.join(self.config_dir, "data")
+        self.profiles_file = os.path.join(self.config_dir, "profiles.json")
         self.models_dir = os.path.join(self.config_dir, "models")
         
         # Load configurations
         self.env = self._load_env()
+        self.data_dir = self.get("ELYSIAN_DATA_DIR", os.path.join(self.config_dir, "data"))
         self.api_keys = self._load_json(self.api_keys_file)
         self.proxies = self._load_json(self.proxies_file)
+        self.profiles = self._load_json(self.profiles_file)
         
         # Initialize API clients if keys are available
         self._init_api_clients()
@@ -1180,33 +1305,303 @@ class Configuration:
             json.dump(proxies, f, indent=2)
         self.proxies = proxies
 
+class ProxyPool:
+    """Health-scored proxy pool with O(log n) latency-weighted selection"""
+    
+    def __init__(self, alpha=0.3, max_failures=3, cooldown=30.0, default_latency=1.0):
+        self.alpha = alpha
+        self.max_failures = max_failures
+        self.cooldown = cooldown
+        self.default_latency = default_latency
+        
+        self.proxies = []       # index -> proxy URL
+        self.positions = {}     # proxy URL -> index
+        self.stats = []         # index -> health stats
+        self.weights = []       # index -> current selection weight
+        self.healthy = 0        # number of positive weights
+        self.tree = [0.0]       # Fenwick tree over weights (1-based)
+        self.cooldowns = []     # heap of (cooldown_until, index)
+        self.evicted = set()
+        self.eviction_listeners = []
+    
+    def __len__(self):
+        return len(self.proxies)
+    
+    def _prefix(self, i):
+        """Sum of the first i weights"""
+        total = 0.0
+        while i > 0:
+            total += self.tree[i]
+            i -= i & -i
+        return total
+    
+    def _set_weight(self, index, weight):
+        self.healthy += (weight > 0) - (self.weights[index] > 0)
+        if not self.healthy:
+            # Delta updates accumulate float error; start from exact zeros once nothing is selectable
+            self.weights[index] = 0.0
+            self.tree = [0.0] * len(self.tree)
+            return
+        
+        delta = weight - self.weights[index]
+        self.weights[index] = weight
+        i = index + 1
+        while i < len(self.tree):
+            self.tree[i] += delta
+            i += i & -i
+    
+    def _weight(self, stats):
+        # Faster proxies are picked more often; recent failures halve the weight
+        latency = max(stats["latency"], 0.05)
+        return 1.0 / latency / (1 << stats["failures"])
+    
+    def add(self, proxy, latency=None):
+        """Add a proxy to the pool (or refresh its latency if already present)"""
+        if proxy in self.positions:
+            if latency is not None:
+                self.report_success(proxy, latency)
+            return
+        
+        index = len(self.proxies)
+        stats = {
+            "latency": latency if latency is not None else self.default_latency,
+            "failures": 0,
+            "successes": 0,
+            "cooldown_until": 0.0,
+        }
+        self.proxies.append(proxy)
+        self.positions[proxy] = index
+        self.stats.append(stats)
+        self.weights.append(0.0)
+        
+        # Appending to a Fenwick tree: the new node covers (i - lowbit(i), i]
+        i = index + 1
+        self.tree.append(self._prefix(i - 1) - self._prefix(i - (i & -i)))
+        self._set_weight(index, self._weight(stats))
+    
+    def _restore_cooled(self):
+        """Re-enable proxies whose cooldown has expired"""
+        now = time.monotonic()
+        while self.cooldowns and self.cooldowns[0][0] <= now:
+            until, index = heapq.heappop(self.cooldowns)
+            stats = self.stats[index]
+            if self.proxies[index] not in self.evicted and stats["cooldown_until"] == until:
+                self._set_weight(index, self._weight(stats))
+    
+    def select(self):
+        """Pick a healthy proxy with probability proportional to its weight"""
+        self._restore_cooled()
+        
+        if not self.healthy:
+            return None
+        total = self._prefix(len(self.proxies))
+        
+        # Fenwick descent for the first index whose prefix sum exceeds the target
+        target = random.random() * total
+        position = 0
+        step = 1 << (len(self.proxies).bit_length())
+        while step:
+            nxt = position + step
+            if nxt < len(self.tree) and self.tree[nxt] <= target:
+                position = nxt
+                target -= self.tree[nxt]
+            step >>= 1
+        
+        # Rounding can land the descent on a zero-weight slot; take the next selectable one instead
+        index = min(position, len(self.proxies) - 1)
+        if self.weights[index] <= 0:
+            index = next(
+                (i for i in itertools.chain(range(index, len(self.weights)), range(index)) if self.weights[i] > 0)
+            )
+        return self.proxies[index]
+    
+    def report_success(self, proxy, latency):
+        """Fold a successful request's latency into the proxy's EWMA"""
+        index = self.positions.get(proxy)
+        if index is None:
+            return
+        
+        stats = self.stats[index]
+        stats["latency"] = self.alpha * latency + (1 - self.alpha) * stats["latency"]
+        stats["failures"] = 0
+        stats["successes"] += 1
+        if proxy not in self.evicted and stats["cooldown_until"] <= time.monotonic():
+            self._set_weight(index, self._weight(stats))
+    
+    def report_failure(self, proxy):
+        """Cool a failing proxy down, evicting it after repeated failures"""
+        index = self.positions.get(proxy)
+        if index is None or proxy in self.evicted:
+            return
+        
+        stats = self.stats[index]
+        stats["failures"] += 1
+        self._set_weight(index, 0.0)
+        
+        if stats["failures"] >= self.max_failures:
+            logger.info(f"Evicting proxy after {stats['failures']} failures: {proxy}")
+            self.evict(proxy)
+            return
+        
+        # Exponential cooldown per consecutive failure
+        stats["cooldown_until"] = time.monotonic() + self.cooldown * (2 ** (stats["failures"] - 1))
+        heapq.heappush(self.cooldowns, (stats["cooldown_until"], index))
+    
+    def evict(self, proxy):
+        """Remove a proxy from selection until it is restored"""
+        index = self.positions.get(proxy)
+        if index is None or proxy in self.evicted:
+            return
+        
+        self.evicted.add(proxy)
+        self._set_weight(index, 0.0)
+        for listener in self.eviction_listeners:
+            listener(proxy)
+    
+    def restore(self, proxy, latency):
+        """Bring an evicted proxy back after it passed re-verification"""
+        index = self.positions.get(proxy)
+        if index is None:
+            return
+        
+        self.evicted.discard(proxy)
+        stats = self.stats[index]
+        stats["failures"] = 0
+        stats["cooldown_until"] = 0.0
+        stats["latency"] = latency
+        self._set_weight(index, self._weight(stats))
+    
+    def is_available(self, proxy):
+        """Whether a proxy is currently eligible for selection"""
+        index = self.positions.get(proxy)
+        return index is not None and self.weights[index] > 0
+    
+    def healthy_count(self):
+        """Number of proxies currently eligible for selection"""
+        return self.healthy
+
 class ProxyManager:
     """Manages and rotates proxies for web scraping"""
     
-    def __init__(self, config):
+    def __init__(self, config, metrics=None):
         self.config = config
         self.proxies = config.proxies
-        self.current_index = 0
-        self.last_rotation = time.time()
         self.rotation_interval = int(config.get("PROXY_ROTATION_INTERVAL", 300))
         self.test_timeout = int(config.get("PROXY_TEST_TIMEOUT", 10))
         self.use_proxies = config.get("USE_PROXIES", "false").lower() == "true"
+        self.test_url = config.get("PROXY_TEST_URL", "https://httpbin.org/ip")
+        self.verify_concurrency = int(config.get("PROXY_VERIFY_CONCURRENCY", 200))
+        self.verify_target = int(config.get("PROXY_VERIFY_TARGET", 0))
+        self.reverify_interval = int(config.get("PROXY_REVERIFY_INTERVAL", 120))
+        self.proxy_latencies = {}
+        self.reverify_task = None
+        self.refresh_task = None
+        
+        # Proxy source lists and verification results are cached on disk
+        self.sources = [
+            "https://raw.githubusercontent.com/TheSpeedX/PROXY-List/master/http.txt",
+            "https://raw.githubusercontent.com/ShiftyTR/Proxy-List/master/https.txt",
+            "https://raw.githubusercontent.com/monosans/proxy-list/main/proxies/http.txt",
+        ]
+        self.cache_file = os.path.join(config.config_dir, "proxy_cache.json")
+        self.cache_ttl = int(config.get("PROXY_CACHE_TTL", 3600))
+        self.verify_ttl = int(config.get("PROXY_VERIFY_TTL", 1800))
+        self.cache = self._load_cache()
+        
+        self.pool = ProxyPool(
+            max_failures=int(config.get("PROXY_MAX_FAILURES", 3)),
+            cooldown=float(config.get("PROXY_COOLDOWN", 30)),
+            default_latency=float(self.test_timeout) / 2,
+        )
+        self._rebuild_pool()
+        
+        # Pool health is read at scrape time; request outcomes are counted as they happen
+        self.metrics = metrics or MetricsRegistry()
+        self.metrics.gauge("proxies", "Proxies in the pool by state", ["state"], collector=lambda: {
+            ("total",): len(self.pool),
+            ("healthy",): self.pool.healthy_count(),
+            ("evicted",): len(self.pool.evicted),
+        })
+        self.proxy_requests = self.metrics.counter("proxy_requests_total", "Requests through proxies by outcome", ["outcome"])
     
-    async def fetch_free_proxies(self):
-        """Fetch free proxies from various sources"""
+    def _rebuild_pool(self):
+        """Rebuild the selection pool from the current proxy lists"""
+        pool = ProxyPool(self.pool.alpha, self.pool.max_failures, self.pool.cooldown, self.pool.default_latency)
+        pool.eviction_listeners = self.pool.eviction_listeners
+        for proxy_type, proxy_list in self.proxies.items():
+            if proxy_type == "untested":
+                continue
+            for proxy in proxy_list:
+                pool.add(proxy, self.proxy_latencies.get(proxy))
+        self.pool = pool
+    
+    def _load_cache(self):
+        """Load the on-disk cache of fetched source lists and verification results"""
+        try:
+            with open(self.cache_file, 'r') as f:
+                cache = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            cache = {}
+        cache.setdefault("sources", {})
+        cache.setdefault("verified", {})
+        return cache
+    
+    def _save_cache(self):
+        """Atomically write the proxy cache to disk"""
+        tmp_file = f"{self.cache_file}.tmp"
+        with open(tmp_file, 'w') as f:
+            json.dump(self.cache, f)
+        os.replace(tmp_file, self.cache_file)
+    
+    @staticmethod
+    def _classify_source(source):
+        """Proxy scheme implied by a source list's file name"""
+        for proxy_type in ("https", "http", "socks4", "socks5"):
+            if source.endswith(f"{proxy_type}.txt"):
+                return proxy_type
+        return None
+    
+    def _is_fresh(self, timestamp, ttl):
+        return timestamp is not None and time.time() - timestamp < ttl
+    
+    async def fetch_free_proxies(self, force=False, show_progress=True):
+        """Fetch free proxies from the source lists, reusing cached lists within their TTL"""
         if not self.use_proxies:
             return
-            
-        logger.info("Fetching free proxies...")
         
-        with console.status("[bold blue]Fetching free proxies...", spinner="dots"):
+        stale_sources = [
+            source for source in self.sources
+            if force or not self._is_fresh(self.cache["sources"].get(source, {}).get("fetched_at"), self.cache_ttl)
+        ]
+        
+        status = console.status("[bold blue]Fetching free proxies...", spinner="dots") if show_progress else nullcontext()
+        with status:
             try:
-                # Proxy sources - simplified for the script
-                sources = [
-                    "https://raw.githubusercontent.com/TheSpeedX/PROXY-List/master/http.txt",
-                    "https://raw.githubusercontent.com/ShiftyTR/Proxy-List/master/https.txt",
-                    "https://raw.githubusercontent.com/monosans/proxy-list/main/proxies/http.txt",
-                ]
+                if stale_sources:
+                    logger.info(f"Fetching free proxies from {len(stale_sources)} sources...")
+                    
+                    async def fetch_source(session, source):
+                        try:
+                            async with session.get(source, timeout=aiohttp.ClientTimeout(total=10)) as response:
+                                if response.status != 200:
+                                    return
+                                text = await response.text()
+                        except Exception as e:
+                            logger.error(f"Error fetching proxies from {source}: {e}")
+                            return
+                        
+                        # Simple filtering for structure
+                        proxies = [line.strip() for line in text.strip().split("\n")]
+                        self.cache["sources"][source] = {
+                            "fetched_at": time.time(),
+                            "proxies": [proxy for proxy in proxies if proxy and ":" in proxy],
+                        }
+                    
+                    # All sources are fetched concurrently
+                    async with aiohttp.ClientSession() as session:
+                        await asyncio.gather(*(fetch_source(session, source) for source in stale_sources))
+                    
+                    self._save_cache()
                 
                 new_proxies = {
                     "http": [],
@@ -1214,29 +1609,11 @@ class ProxyManager:
                     "socks4": [],
                     "socks5": []
                 }
-                
-                async with aiohttp.ClientSession() as session:
-                    for source in sources:
-                        try:
-                            async with session.get(source, timeout=10) as response:
-                                if response.status == 200:
-                                    text = await response.text()
-                                    proxies = text.strip().split("\n")
-                                    # Simple filtering for structure
-                                    for proxy in proxies:
-                                        proxy = proxy.strip()
-                                        if proxy and ":" in proxy:
-                                            # Classify proxy type - simplified
-                                            if source.endswith("http.txt"):
-                                                new_proxies["http"].append(f"http://{proxy}")
-                                            elif source.endswith("https.txt"):
-                                                new_proxies["https"].append(f"https://{proxy}")
-                                            elif source.endswith("socks4.txt"):
-                                                new_proxies["socks4"].append(f"socks4://{proxy}")
-                                            elif source.endswith("socks5.txt"):
-                                                new_proxies["socks5"].append(f"socks5://{proxy}")
-                        except Exception as e:
-                            logger.error(f"Error fetching proxies from {source}: {e}")
+                for source in self.sources:
+                    proxy_type = self._classify_source(source)
+                    if proxy_type:
+                        for proxy in self.cache["sources"].get(source, {}).get("proxies", []):
+                            new_proxies[proxy_type].append(f"{proxy_type}://{proxy}")
                 
                 # Merge with existing proxies
                 for proxy_type, proxy_list in new_proxies.items():
@@ -1252,29 +1629,66 @@ class ProxyManager:
             except Exception as e:
                 logger.error(f"Failed to fetch free proxies: {e}")
     
-    async def test_proxy(self, proxy_url, test_url="https://httpbin.org/ip"):
-        """Test if a proxy is working"""
-        try:
-            proxy_type = proxy_url.split("://")[0] if "://" in proxy_url else "http"
-            proxies = {proxy_type: proxy_url}
-            
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    test_url,
-                    proxy=proxy_url,
-                    timeout=self.test_timeout
-                ) as response:
-                    if response.status == 200:
-                        return True
+    def load_cached_pool(self):
+        """Populate the pool from cached verification results; returns False if there are none"""
+        working = {}
+        for proxy, entry in self.cache["verified"].items():
+            if entry.get("latency") is not None:
+                proxy_type = proxy.split("://")[0] if "://" in proxy else "http"
+                working.setdefault(proxy_type, []).append(proxy)
+                self.proxy_latencies[proxy] = entry["latency"]
+        
+        if not working:
             return False
+        
+        self.proxies = working
+        self._rebuild_pool()
+        logger.info(f"Loaded {len(self.pool)} verified proxies from cache")
+        return True
+    
+    def start_background_refresh(self):
+        """Refresh stale source lists and verifications without blocking startup"""
+        if self.use_proxies and self.refresh_task is None:
+            self.refresh_task = asyncio.create_task(self._background_refresh())
+    
+    async def _background_refresh(self):
+        try:
+            await self.fetch_free_proxies(show_progress=False)
+            await self.verify_proxies(show_progress=False, update_pool=True)
+        except Exception as e:
+            logger.error(f"Background proxy refresh failed: {e}")
+    
+    async def measure_proxy(self, proxy_url, session=None, test_url=None):
+        """Return the round-trip latency of a request through a proxy, or None if it fails"""
+        test_url = test_url or self.test_url
+        timeout = aiohttp.ClientTimeout(total=self.test_timeout)
+        
+        try:
+            start_time = time.monotonic()
+            if session is None:
+                async with aiohttp.ClientSession(timeout=timeout) as own_session:
+                    async with own_session.get(test_url, proxy=proxy_url) as response:
+                        ok = response.status == 200
+            else:
+                async with session.get(test_url, proxy=proxy_url, timeout=timeout) as response:
+                    ok = response.status == 200
+            return time.monotonic() - start_time if ok else None
         except Exception:
-            return False
+            return None
+    
+    async def test_proxy(self, proxy_url, test_url=None, session=None):
+        """Test if a proxy is working"""
+        return await self.measure_proxy(proxy_url, session, test_url) is not None
     
-    async def verify_proxies(self):
-        """Verify and filter working proxies"""
+    async def verify_proxies(self, target_count=None, concurrency=None, test_url=None,
+                             show_progress=True, update_pool=False):
+        """Verify proxies concurrently, stopping early once target_count work"""
         if not self.use_proxies or not self.proxies:
             return
-            
+        
+        target_count = self.verify_target if target_count is None else target_count
+        concurrency = concurrency or self.verify_concurrency
+        
         logger.info("Verifying proxies...")
         working_proxies = {
             "http": [],
@@ -1283,69 +1697,474 @@ class ProxyManager:
             "socks5": []
         }
         
+        # Proxies verified within PROXY_VERIFY_TTL keep their cached result
+        verified = self.cache["verified"]
+        failed = []
+        working_count = 0
+        candidates = asyncio.Queue()
+        # Proxies left over when a previous run stopped at its target are tested like the rest
+        listed = [(proxy_type, proxy) for proxy_type, proxy_list in self.proxies.items() if proxy_type != "untested"
+                  for proxy in proxy_list]
+        listed += [(proxy.split("://")[0], proxy) for proxy in self.proxies.get("untested", [])]
+        seen = set()
+        untested = set()
+        unsupported = collections.Counter()
+        for proxy_type, proxy in listed:
+            if proxy_type not in working_proxies:
+                unsupported[proxy_type] += 1
+                continue
+            if proxy in seen:
+                continue
+            seen.add(proxy)
+            entry = verified.get(proxy)
+            if entry and self._is_fresh(entry.get("verified_at"), self.verify_ttl):
+                if entry.get("latency") is not None:
+                    working_proxies[proxy_type].append(proxy)
+                    self.proxy_latencies[proxy] = entry["latency"]
+                    working_count += 1
+                continue
+            candidates.put_nowait((proxy_type, proxy))
+            untested.add(proxy)
+        for proxy_type, count in unsupported.items():
+            logger.warning(f"Skipping {count} proxies of unsupported type: {proxy_type}")
+        total = candidates.qsize()
+        
+        enough = asyncio.Event()
+        if not total or (target_count and working_count >= target_count):
+            enough.set()
+        
         with Progress(
             SpinnerColumn(),
             TextColumn("[bold blue]Testing proxies..."),
             BarColumn(),
             TextColumn("[progress.percentage]{task.percentage:>3.0f}%"),
             TimeElapsedColumn(),
-            console=console
+            console=console,
+            disable=not show_progress
         ) as progress:
-            for proxy_type, proxy_list in self.proxies.items():
-                if not proxy_list:
-                    continue
-                    
-                task = progress.add_task(f"[cyan]Testing {proxy_type} proxies", total=len(proxy_list))
+            task = progress.add_task("[cyan]Testing proxies", total=total)
+            
+            # One shared connection pool bounds the number of sockets in flight
+            connector = aiohttp.TCPConnector(limit=concurrency, ttl_dns_cache=300)
+            async with aiohttp.ClientSession(connector=connector) as session:
                 
-                for proxy in proxy_list:
-                    is_working = await self.test_proxy(proxy)
-                    if is_working:
-                        working_proxies[proxy_type].append(proxy)
-                    progress.update(task, advance=1)
+                async def worker():
+                    nonlocal working_count
+                    while not enough.is_set():
+                        try:
+                            proxy_type, proxy = candidates.get_nowait()
+                        except asyncio.QueueEmpty:
+                            return
+                        
+                        latency = await self.measure_proxy(proxy, session, test_url)
+                        verified[proxy] = {"verified_at": time.time(), "latency": latency}
+                        untested.discard(proxy)
+                        if latency is None:
+                            failed.append(proxy)
+                        else:
+                            working_proxies[proxy_type].append(proxy)
+                            self.proxy_latencies[proxy] = latency
+                            working_count += 1
+                            if target_count and working_count >= target_count:
+                                enough.set()
+                        progress.update(task, advance=1)
+                
+                workers = [asyncio.create_task(worker()) for _ in range(min(concurrency, total) if total else 0)]
+                waiter = asyncio.create_task(enough.wait())
+                
+                # Finish when every worker is done or cancel the rest once enough proxies work
+                finished = asyncio.gather(*workers, return_exceptions=True)
+                await asyncio.wait([waiter, finished], return_when=asyncio.FIRST_COMPLETED)
+                for pending in workers + [waiter]:
+                    pending.cancel()
+                await asyncio.gather(finished, waiter, return_exceptions=True)
+                for worker_task in workers:
+                    if not worker_task.cancelled() and worker_task.exception():
+                        logger.error(f"Proxy verification worker failed: {worker_task.exception()!r}")
         
-        # Update proxies with working ones
+        # Update proxies with working ones; candidates an early stop left untested stay listed for the next run
+        if untested:
+            working_proxies["untested"] = sorted(untested)
         self.proxies = working_proxies
         self.config.save_proxies(working_proxies)
+        self._save_cache()
+        
+        if update_pool:
+            # Merge into the live pool so health stats of known proxies survive
+            for proxy_type, proxy_list in working_proxies.items():
+                if proxy_type == "untested":
+                    continue
+                for proxy in proxy_list:
+                    self.pool.add(proxy, self.proxy_latencies.get(proxy))
+            for proxy in failed:
+                self.pool.evict(proxy)
+        else:
+            self._rebuild_pool()
         
-        total_working = sum(len(proxies) for proxies in working_proxies.values())
-        logger.info(f"Verified {total_working} working proxies")
+        total_working = sum(len(proxies) for proxy_type, proxies in working_proxies.items() if proxy_type != "untested")
+        logger.info(f"Verified {total_working} working proxies, {len(untested)} left untested")
     
     def get_next_proxy(self):
-        """Get the next proxy in rotation"""
+        """Get a healthy proxy, weighted towards low latency"""
         if not self.use_proxies:
             return None
+        
+        return self.pool.select()
+    
+    def report_success(self, proxy, latency):
+        """Record a successful request through a proxy"""
+        if proxy:
+            self.pool.report_success(proxy, latency)
+            self.proxy_requests.inc(outcome="success")
+    
+    def report_failure(self, proxy):
+        """Record a failed request through a proxy"""
+        if proxy:
+            self.pool.report_failure(proxy)
+            self.proxy_requests.inc(outcome="failure")
+    
+    def start_reverification(self):
+        """Start re-verifying evicted proxies in the background"""
+        if self.use_proxies and self.reverify_task is None:
+            self.reverify_task = asyncio.create_task(self._reverify_loop())
+    
+    async def _reverify_loop(self):
+        """Periodically re-test evicted proxies and restore the ones that recovered"""
+        while True:
+            await asyncio.sleep(self.reverify_interval)
+            evicted = list(self.pool.evicted)
+            if not evicted:
+                continue
             
-        # Check if it's time for rotation
-        current_time = time.time()
-        if current_time - self.last_rotation >= self.rotation_interval:
-            self.last_rotation = current_time
-            self.current_index = 0
+            try:
+                connector = aiohttp.TCPConnector(limit=self.verify_concurrency)
+                async with aiohttp.ClientSession(connector=connector) as session:
+                    latencies = await asyncio.gather(
+                        *(self.measure_proxy(proxy, session) for proxy in evicted)
+                    )
+                
+                restored = 0
+                for proxy, latency in zip(evicted, latencies):
+                    if latency is not None:
+                        self.pool.restore(proxy, latency)
+                        restored += 1
+                
+                logger.info(f"Re-verified {len(evicted)} evicted proxies, restored {restored}")
+            except Exception as e:
+                logger.error(f"Error re-verifying proxies: {e}")
+    
+    async def close(self):
+        """Stop background proxy maintenance"""
+        for task in (self.reverify_task, self.refresh_task):
+            if task:
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+        self.reverify_task = None
+        self.refresh_task = None
+
+class HttpCache:
+    """Disk-backed LRU cache of static subresources keyed by URL, with validator-based revalidation"""
+    
+    # Hop-by-hop and encoding headers don't apply to a decoded body served from disk
+    DROP_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection", "keep-alive"}
+    
+    def __init__(self, config):
+        self.directory = config.get("HTTP_CACHE_DIR", os.path.join(config.data_dir, "cache/http"))
+        self.max_bytes = int(float(config.get("HTTP_CACHE_MAX_MB", 512)) * 1024 * 1024)
+        self.default_ttl = float(config.get("HTTP_CACHE_DEFAULT_TTL", 3600))
+        self.conn = None
+        self.total_bytes = 0
+        self._lock = threading.Lock()
+    
+    def _open(self):
+        if self.conn is None:
+            os.makedirs(self.directory, exist_ok=True)
+            self.conn = sqlite3.connect(os.path.join(self.directory, "index.db"), check_same_thread=False)
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                status INTEGER NOT NULL,
+                headers TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                expires_at REAL NOT NULL,
+                size INTEGER NOT NULL,
+                last_access REAL NOT NULL
+            )
+            """)
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_access ON entries (last_access)")
+            self.total_bytes = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        return self.conn
+    
+    @staticmethod
+    def key(url):
+        return hashlib.sha256(url.encode()).hexdigest()
+    
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], key)
+    
+    def freshness(self, headers):
+        """Seconds a response may be served without revalidation, or None if it must not be stored"""
+        cache_control = headers.get("cache-control", "").lower()
+        if "no-store" in cache_control:
+            return None
+        if "no-cache" in cache_control:
+            return 0.0
         
-        # Flatten all proxies into a single list
-        all_proxies = []
-        for proxy_list in self.proxies.values():
-            all_proxies.extend(proxy_list)
+        match = re.search(r"max-age=(\d+)", cache_control)
+        if match:
+            return float(match.group(1))
+        
+        if "expires" in headers:
+            try:
+                expires = email.utils.parsedate_to_datetime(headers["expires"]).timestamp()
+                return max(0.0, expires - time.time())
+            except (TypeError, ValueError):
+                return 0.0
         
-        if not all_proxies:
+        # Heuristic freshness for validator-only responses, as browsers do
+        if "last-modified" in headers:
+            try:
+                age = time.time() - email.utils.parsedate_to_datetime(headers["last-modified"]).timestamp()
+                return min(max(0.0, age * 0.1), 86400.0)
+            except (TypeError, ValueError):
+                pass
+        return self.default_ttl
+    
+    def get(self, url):
+        """Return the cached entry for a URL (without body), or None"""
+        with self._lock:
+            row = self._open().execute(
+                "SELECT key, status, headers, etag, last_modified, expires_at, size FROM entries WHERE key = ?",
+                (self.key(url),)
+            ).fetchone()
+        if row is None:
+            return None
+        key, status, headers, etag, last_modified, expires_at, size = row
+        return {
+            "key": key, "status": status, "headers": json.loads(headers), "etag": etag,
+            "last_modified": last_modified, "expires_at": expires_at, "size": size,
+            "fresh": expires_at > time.time(),
+        }
+    
+    def read(self, entry):
+        """Read an entry's body and mark it recently used; None if the file went missing"""
+        try:
+            with open(self._path(entry["key"]), "rb") as f:
+                body = f.read()
+        except FileNotFoundError:
+            self.delete(entry["key"])
             return None
+        with self._lock:
+            self._open().execute("UPDATE entries SET last_access = ? WHERE key = ?", (time.time(), entry["key"]))
+            self.conn.commit()
+        return body
+    
+    def refresh(self, entry, headers):
+        """Extend a revalidated entry's freshness from a 304 response"""
+        ttl = self.freshness({**entry["headers"], **headers}) or 0.0
+        with self._lock:
+            self._open().execute(
+                "UPDATE entries SET expires_at = ?, last_access = ? WHERE key = ?",
+                (time.time() + ttl, time.time(), entry["key"])
+            )
+            self.conn.commit()
+    
+    def put(self, url, status, headers, body):
+        """Store a response body if it is cacheable; returns True when stored"""
+        ttl = self.freshness(headers)
+        if ttl is None or status != 200 or len(body) > self.max_bytes // 10:
+            return False
+        
+        key = self.key(url)
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(body)
+        
+        stored_headers = {name: value for name, value in headers.items() if name.lower() not in self.DROP_HEADERS}
+        now = time.time()
+        with self._lock:
+            conn = self._open()
+            previous = conn.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+            conn.execute(
+                """INSERT OR REPLACE INTO entries (key, url, status, headers, etag, last_modified, expires_at, size, last_access)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                (key, url, status, json.dumps(stored_headers), headers.get("etag"), headers.get("last-modified"),
+                 now + ttl, len(body), now)
+            )
+            conn.commit()
+            self.total_bytes += len(body) - (previous[0] if previous else 0)
+        
+        if self.total_bytes > self.max_bytes:
+            self.evict()
+        return True
+    
+    def delete(self, key):
+        with self._lock:
+            row = self._open().execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+            if row:
+                self.conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self.conn.commit()
+                self.total_bytes -= row[0]
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+    
+    def evict(self):
+        """Drop least recently used entries until the cache is back under 90% of its budget"""
+        target = int(self.max_bytes * 0.9)
+        with self._lock:
+            conn = self._open()
+            victims = []
+            freed = 0
+            for key, size in conn.execute("SELECT key, size FROM entries ORDER BY last_access"):
+                if self.total_bytes - freed <= target:
+                    break
+                victims.append(key)
+                freed += size
+            conn.executemany("DELETE FROM entries WHERE key = ?", [(key,) for key in victims])
+            conn.commit()
+            self.total_bytes -= freed
         
-        # Get next proxy
-        proxy = all_proxies[self.current_index % len(all_proxies)]
-        self.current_index += 1
+        for key in victims:
+            try:
+                os.remove(self._path(key))
+            except FileNotFoundError:
+                pass
+        logger.debug(f"HTTP cache evicted {len(victims)} entries ({freed} bytes)")
+    
+    def close(self):
+        with self._lock:
+            if self.conn:
+                self.conn.close()
+                self.conn = None
+
+class ResponseArchive:
+    """SQLite archive of HTTP responses for recording a crawl and replaying it without network"""
+    
+    MODES = ("record", "replay")
+    
+    def __init__(self, path, mode):
+        if mode not in self.MODES:
+            raise ValueError(f"Unsupported archive mode: {mode}")
+        self.path = path
+        self.mode = mode
+        self.stats = {"recorded": 0, "replayed": 0, "missed": 0}
+        self._lock = threading.Lock()
+        
+        if mode == "replay" and not os.path.exists(path):
+            raise FileNotFoundError(f"Archive not found: {path}")
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""
+        CREATE TABLE IF NOT EXISTS responses (
+            key TEXT PRIMARY KEY,
+            method TEXT NOT NULL,
+            url TEXT NOT NULL,
+            base_url TEXT NOT NULL,
+            status INTEGER NOT NULL,
+            headers TEXT NOT NULL,
+            body BLOB NOT NULL,
+            recorded_at REAL NOT NULL
+        )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_base ON responses (method, base_url, recorded_at)")
+    
+    @staticmethod
+    def _base_url(url):
+        return url.split("#", 1)[0].split("?", 1)[0]
+    
+    def record(self, method, url, status, headers, body):
+        """Store a response, replacing any earlier recording of the same request"""
+        headers = {name: value for name, value in headers.items() if name.lower() not in HttpCache.DROP_HEADERS}
+        with self._lock:
+            self.conn.execute(
+                """INSERT OR REPLACE INTO responses (key, method, url, base_url, status, headers, body, recorded_at)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+                (f"{method} {url}", method, url, self._base_url(url), status, json.dumps(headers), body, time.time())
+            )
+            self.conn.commit()
+            self.stats["recorded"] += 1
+        return headers
+    
+    def lookup(self, method, url):
+        """Find a recorded response, falling back to the same URL with a different query string"""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT status, headers, body FROM responses WHERE key = ?", (f"{method} {url}",)
+            ).fetchone()
+            if row is None:
+                # Cache-busting parameters shouldn't break replay
+                row = self.conn.execute(
+                    """SELECT status, headers, body FROM responses WHERE method = ? AND base_url = ?
+                       ORDER BY recorded_at DESC LIMIT 1""",
+                    (method, self._base_url(url))
+                ).fetchone()
+            self.stats["replayed" if row else "missed"] += 1
         
-        return proxy
+        if row is None:
+            return None
+        return {"status": row[0], "headers": json.loads(row[1]), "body": row[2]}
+    
+    def close(self):
+        with self._lock:
+            self.conn.close()
 
 class BrowserTools:
     """Handles browser automation and stealth techniques"""
     
-    def __init__(self, config, proxy_manager=None):
+    def __init__(self, config, proxy_manager=None, metrics=None):
         self.config = config
         self.proxy_manager = proxy_manager
+        self.playwright = None
         self.browser = None
         self.context = None
         self.stealth_mode = config.get("STEALTH_MODE", "true").lower() == "true"
         self.default_user_agent = config.get("DEFAULT_USER_AGENT")
         
+        # One browser context per proxy so pages spread across many exits
+        self.max_contexts = int(config.get("BROWSER_MAX_CONTEXTS", 16))
+        self.device_scale_factor = float(config.get("DEVICE_SCALE_FACTOR", 2.0))
+        self.proxy_contexts = {}    # proxy -> {"proxy", "context", "created_at", "last_used", "leases", "retired"}
+        self.retired_contexts = []  # entries no longer leased out, closed once their pages are done
+        self.page_proxies = {}      # page -> proxy it was leased through
+        self.page_contexts = {}     # page -> context entry holding its lease
+        self.launch_proxy = None
+        self.direct_fallback = False
+        self._init_lock = asyncio.Lock()
+        self._context_lock = asyncio.Lock()
+        self._background_tasks = set()
+        
+        if proxy_manager:
+            proxy_manager.pool.eviction_listeners.append(self._on_proxy_evicted)
+        
+        # Shared disk cache for static subresources, with per-page counters
+        self.http_cache = HttpCache(config) if config.get("HTTP_CACHE", "true").lower() == "true" else None
+        self.cache_types = set(config.get("HTTP_CACHE_TYPES", "stylesheet,script,font,image").split(","))
+        self.page_cache_stats = {}  # page -> {"hits", "revalidated", "misses", "bytes_saved"}
+        
+        # Optional record/replay archive that takes over all routing
+        archive_mode = config.get("ARCHIVE_MODE", "off").lower()
+        self.archive = None
+        if archive_mode in ResponseArchive.MODES:
+            self.archive = ResponseArchive(
+                config.get("ARCHIVE_PATH", os.path.join(config.data_dir, "archives/crawl.db")), archive_mode
+            )
+        
+        # Browser-side metrics
+        self.metrics = metrics or MetricsRegistry()
+        self.response_bytes = self.metrics.counter(
+            "response_bytes_total", "Response body bytes received by pages, as transferred over the wire"
+        )
+        self.metrics.gauge("browser_pages_open", "Browser pages currently open", collector=lambda: len(self.page_cache_stats))
+        self.metrics.gauge("browser_contexts", "Browser contexts currently open", collector=lambda: self.open_contexts())
+        
         # User agents rotation
         self.user_agents = [
             "Mozilla/5.0 (Macintosh; Apple Silicon Mac OS X) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/118.0.0.0 Safari/537.36",
@@ -1355,58 +2174,191 @@ class BrowserTools:
             "Mozilla/5.0 (Macintosh; Apple Silicon Mac OS X) Gecko Firefox/121.0"
         ]
     
+    @property
+    def use_proxy_contexts(self):
+        return bool(self.proxy_manager and self.proxy_manager.use_proxies)
+    
     async def initialize(self):
         """Initialize browser and context"""
-        playwright = await async_playwright().start()
-        
-        # Setup browser launch options
-        browser_args = []
-        if self.stealth_mode:
-            browser_args.extend([
-                "--disable-blink-features=AutomationControlled",
-                "--disable-features=IsolateOrigins,site-per-process",
-                "--disable-site-isolation-trials",
-            ])
-        
-        # Setup proxy if available
-        proxy_options = {}
-        if self.proxy_manager and self.proxy_manager.use_proxies:
-            proxy = self.proxy_manager.get_next_proxy()
-            if proxy:
-                proxy_options = {"server": proxy}
-        
-        # Launch browser
-        self.browser = await playwright.chromium.launch(
-            headless=True,
-            args=browser_args,
-            proxy=proxy_options if proxy_options else None
-        )
-        
-        # Create browser context with stealth options
+        async with self._init_lock:
+            if self.browser:
+                return self.context
+            
+            self.playwright = await async_playwright().start()
+            
+            # Setup browser launch options
+            browser_args = []
+            if self.stealth_mode:
+                browser_args.extend([
+                    "--disable-blink-features=AutomationControlled",
+                    "--disable-features=IsolateOrigins,site-per-process",
+                    "--disable-site-isolation-trials",
+                ])
+            
+            # Proxies are set per context; Chromium on Windows needs a global placeholder for that to work
+            if self.use_proxy_contexts and sys.platform == "win32":
+                self.launch_proxy = {"server": "http://per-context"}
+            
+            # Launch browser
+            self.browser = await self.playwright.chromium.launch(
+                headless=True,
+                args=browser_args,
+                proxy=self.launch_proxy
+            )
+            
+            # Default context for direct (proxy-less) traffic
+            self.context = await self._create_context()
+            
+            return self.context
+    
+    async def _create_context(self, proxy=None):
+        """Create a browser context with stealth options, optionally bound to a proxy"""
         user_agent = random.choice(self.user_agents)
         
-        self.context = await self.browser.new_context(
+        context = await self.browser.new_context(
             user_agent=user_agent,
             viewport={"width": 1920, "height": 1080},
-            device_scale_factor=2.0,
+            device_scale_factor=self.device_scale_factor,
             locale="en-US",
             timezone_id="America/New_York",
-            color_scheme="light"
+            color_scheme="light",
+            proxy=self._context_proxy(proxy)
         )
         
         # Apply additional stealth techniques
         if self.stealth_mode:
-            await self._apply_stealth_techniques()
+            await self._apply_stealth_techniques(context)
+        
+        return context
+    
+    def _context_proxy(self, proxy):
+        """Context proxy option; direct contexts must override the launch placeholder explicitly"""
+        if proxy:
+            return {"server": proxy}
+        return {"server": "direct://"} if self.launch_proxy else None
+    
+    def open_contexts(self):
+        """Number of proxy contexts open, including retired ones still serving pages"""
+        return len(self.proxy_contexts) + len(self.retired_contexts)
+    
+    async def _get_proxy_context(self, proxy):
+        """Lease a context for a proxy; returns (entry, context) for the proxy actually used"""
+        async with self._context_lock:
+            now = time.monotonic()
+            entry = self.proxy_contexts.get(proxy)
+            
+            # Recycle idle contexts that outlived the rotation interval
+            if entry and not entry["leases"] and now - entry["created_at"] >= self.proxy_manager.rotation_interval:
+                await self._close_entry(self._retire(entry))
+                entry = None
+            
+            if entry is None and len(self.proxy_contexts) >= self.max_contexts:
+                # Make room by closing the least recently used idle context; when every context
+                # is busy, share the least loaded one rather than going over the limit
+                idle = [e for e in self.proxy_contexts.values() if not e["leases"]]
+                if idle:
+                    await self._close_entry(self._retire(min(idle, key=lambda e: e["last_used"])))
+                else:
+                    entry = min(self.proxy_contexts.values(), key=lambda e: (e["leases"], e["last_used"]))
+            
+            if entry is None:
+                entry = {
+                    "proxy": proxy,
+                    "context": await self._create_context(proxy),
+                    "created_at": now,
+                    "last_used": now,
+                    "leases": 0,
+                    "retired": False,
+                }
+                self.proxy_contexts[proxy] = entry
+            
+            entry["leases"] += 1
+            entry["last_used"] = now
+            return entry, entry["context"]
+    
+    def _retire(self, entry):
+        """Stop leasing out a context; it stays open until its pages are done"""
+        if self.proxy_contexts.get(entry["proxy"]) is entry:
+            del self.proxy_contexts[entry["proxy"]]
+        if not entry["retired"]:
+            entry["retired"] = True
+            self.retired_contexts.append(entry)
+        return entry
+    
+    def _release_page(self, page):
+        """Return a page's lease, tearing down its context if it was retired"""
+        self.page_proxies.pop(page, None)
+        entry = self.page_contexts.pop(page, None)
+        if not entry:
+            return
         
-        return self.context
+        entry["leases"] -= 1
+        if entry["retired"] and not entry["leases"]:
+            self._spawn(self._close_retired(entry))
+    
+    def _on_proxy_evicted(self, proxy):
+        """Retire the context of an evicted proxy once its pages are done"""
+        entry = self.proxy_contexts.get(proxy)
+        if not entry:
+            return
+        
+        self._retire(entry)
+        if not entry["leases"]:
+            self._spawn(self._close_retired(entry))
+    
+    async def _close_retired(self, entry):
+        async with self._context_lock:
+            await self._close_entry(entry)
+    
+    async def _close_entry(self, entry):
+        """Close a retired context unless pages still hold leases on it; callers hold the context lock"""
+        if entry["leases"] or entry not in self.retired_contexts:
+            return
+        self.retired_contexts.remove(entry)
+        try:
+            await entry["context"].close()
+        except Exception as e:
+            logger.debug(f"Error closing context for proxy {entry['proxy']}: {e}")
     
-    async def _apply_stealth_techniques(self):
+    async def recycle_contexts(self):
+        """Replace every browser context; contexts with open pages close once those pages are done"""
+        recycled = 0
+        async with self._context_lock:
+            for entry in list(self.proxy_contexts.values()):
+                recycled += 1
+                await self._close_entry(self._retire(entry))
+            
+            if self.context:
+                old_context, self.context = self.context, await self._create_context()
+                self._spawn(self._close_when_idle(old_context))
+                recycled += 1
+        return recycled
+    
+    async def _close_when_idle(self, context, poll=0.5):
+        while context.pages:
+            await asyncio.sleep(poll)
+        try:
+            await context.close()
+        except Exception as e:
+            logger.debug(f"Error closing recycled context: {e}")
+    
+    def _spawn(self, coro):
+        """Run a coroutine in the background, keeping a reference until it finishes"""
+        task = asyncio.create_task(coro)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+    
+    def proxy_for_page(self, page):
+        """Proxy a page was leased through (None for direct traffic)"""
+        return self.page_proxies.get(page)
+    
+    async def _apply_stealth_techniques(self, context):
         """Apply additional stealth techniques to avoid detection"""
-        if not self.context:
+        if not context:
             raise ValueError("Browser context not initialized")
         
         # Evaluate stealth script in context
-        await self.context.add_init_script("""
+        await context.add_init_script("""
         () => {
             // Overwrite navigator properties
             Object.defineProperty(navigator, 'webdriver', {
@@ -1460,16 +2412,138 @@ class BrowserTools:
     
     async def new_page(self):
         """Create a new page with stealth setup"""
-        if not self.context:
+        if not self.browser:
             await self.initialize()
         
-        page = await self.context.new_page()
+        # Lease the page from the context of a proxy chosen by the pool
+        proxy = self.proxy_manager.get_next_proxy() if self.use_proxy_contexts else None
+        if proxy:
+            self.direct_fallback = False
+            entry, context = await self._get_proxy_context(proxy)
+            try:
+                page = await context.new_page()
+            except Exception:
+                entry["leases"] -= 1
+                if entry["retired"] and not entry["leases"]:
+                    self._spawn(self._close_retired(entry))
+                raise
+            self.page_proxies[page] = entry["proxy"]
+            self.page_contexts[page] = entry
+            page.on("close", self._release_page)
+        else:
+            if self.use_proxy_contexts and not self.direct_fallback:
+                logger.warning("No healthy proxy available; falling back to direct connections")
+                self.direct_fallback = True
+            page = await self.context.new_page()
         
-        # Add random delay between actions
-        await page.route("**/*", self._add_random_delay)
+        # Route all requests through the cache and random delay
+        self.page_cache_stats[page] = {"hits": 0, "revalidated": 0, "misses": 0, "bytes_saved": 0}
+        page.on("close", lambda closed: self.page_cache_stats.pop(closed, None))
+        page.on("requestfinished", self._count_response_bytes)
+        await page.route("**/*", lambda route, request: self._handle_route(page, route, request))
         
         return page
     
+    async def _count_response_bytes(self, request):
+        """Count the transferred body size, which chunked and compressed responses don't advertise"""
+        try:
+            size = (await request.sizes()).get("responseBodySize", -1)
+            if size < 0:
+                # No network transfer size (e.g. fulfilled from the cache); fall back to the decoded body
+                response = await request.response()
+                size = len(await response.body()) if response else 0
+        except Exception as e:
+            logger.debug(f"Could not measure response size for {request.url}: {e}")
+            return
+        if size > 0:
+            self.response_bytes.inc(size)
+    
+    async def _handle_route(self, page, route, request):
+        """Serve cacheable subresources from the disk cache; everything else goes to the network"""
+        if self.archive:
+            await self._handle_archived_route(route, request)
+            return
+        
+        if self.http_cache and request.method == "GET" and request.resource_type in self.cache_types:
+            if await self._serve_from_cache(page, route, request):
+                return
+        await self._add_random_delay(route, request)
+    
+    async def _serve_from_cache(self, page, route, request):
+        """Fulfill a request from the cache, revalidating or filling it; returns True if handled"""
+        stats = self.page_cache_stats.get(page, {})
+        entry = await asyncio.to_thread(self.http_cache.get, request.url)
+        
+        if entry and entry["fresh"]:
+            body = await asyncio.to_thread(self.http_cache.read, entry)
+            if body is not None:
+                await route.fulfill(status=entry["status"], headers=entry["headers"], body=body)
+                stats["hits"] = stats.get("hits", 0) + 1
+                stats["bytes_saved"] = stats.get("bytes_saved", 0) + len(body)
+                return True
+            entry = None
+        
+        headers = dict(request.headers)
+        if entry:
+            if entry["etag"]:
+                headers["if-none-match"] = entry["etag"]
+            if entry["last_modified"]:
+                headers["if-modified-since"] = entry["last_modified"]
+        
+        try:
+            response = await route.fetch(headers=headers)
+        except Exception:
+            # Let the browser report network errors the usual way
+            return False
+        
+        if entry and response.status == 304:
+            body = await asyncio.to_thread(self.http_cache.read, entry)
+            if body is not None:
+                await asyncio.to_thread(self.http_cache.refresh, entry, response.headers)
+                await route.fulfill(status=entry["status"], headers=entry["headers"], body=body)
+                stats["revalidated"] = stats.get("revalidated", 0) + 1
+                stats["bytes_saved"] = stats.get("bytes_saved", 0) + len(body)
+                return True
+        
+        body = await response.body()
+        await asyncio.to_thread(self.http_cache.put, request.url, response.status, response.headers, body)
+        await route.fulfill(
+            status=response.status,
+            headers={name: value for name, value in response.headers.items() if name.lower() not in HttpCache.DROP_HEADERS},
+            body=body,
+        )
+        stats["misses"] = stats.get("misses", 0) + 1
+        return True
+    
+    async def _handle_archived_route(self, route, request):
+        """Record every response into the archive, or replay it with no network access"""
+        if self.archive.mode == "replay":
+            entry = await asyncio.to_thread(self.archive.lookup, request.method, request.url)
+            if entry is None:
+                await route.abort("internetdisconnected")
+            else:
+                await route.fulfill(status=entry["status"], headers=entry["headers"], body=entry["body"])
+            return
+        
+        await asyncio.sleep(random.uniform(0.1, 0.5))
+        try:
+            # Record redirects as their own responses so replay follows the same chain
+            response = await route.fetch(max_redirects=0)
+            body = await response.body()
+        except Exception as e:
+            logger.debug(f"Not recording {request.url}: {e}")
+            await route.abort("failed")
+            return
+        
+        headers = await asyncio.to_thread(
+            self.archive.record, request.method, request.url, response.status, response.headers, body
+        )
+        await route.fulfill(status=response.status, headers=headers, body=body)
+    
+    def cache_stats(self, page):
+        """HTTP cache counters for a page"""
+        return dict(self.page_cache_stats.get(page, {}))
+    
     async def _add_random_delay(self, route, request):
         """Add random delay to requests for more human-like behavior"""
         delay = random.uniform(100, 500)  # 100-500ms
@@ -1481,25 +2555,2123 @@ class BrowserTools:
         await page.screenshot(path=output_path, full_page=True)
         return output_path
     
-    async def close(self):
-        """Close browser and clean up resources"""
-        if self.browser:
-            await self.browser.close()
-            self.browser = None
-            self.context = None
-
-class Scraper:
-    """Main scraper class with advanced features"""
-    
-    def __init__(self, config, proxy_manager=None, browser_tools=None):
-        self.config = config
-        self.proxy_manager = proxy_manager
-        self.browser_tools = browser_tools or BrowserTools(config, proxy_manager)
+    async def capture_screenshot(self, page, scope="full", max_height=0, image_type="png", quality=None, scale="css"):
+        """Capture a screenshot into memory, optionally capped to max_height CSS pixels"""
+        options = {"type": image_type, "scale": scale}
+        if image_type == "jpeg" and quality:
+            options["quality"] = quality
+        
+        if scope == "viewport":
+            return await page.screenshot(full_page=False, **options)
+        
+        if max_height:
+            width, height = await page.evaluate(
+                "() => [document.documentElement.clientWidth, document.documentElement.scrollHeight]"
+            )
+            if height > max_height:
+                return await page.screenshot(
+                    full_page=True, clip={"x": 0, "y": 0, "width": width, "height": max_height}, **options
+                )
+        return await page.screenshot(full_page=True, **options)
+    
+    @staticmethod
+    def _write_file(data, path):
+        with open(path, "wb") as f:
+            f.write(data)
+        return len(data)
+    
+    async def capture_tiles(self, page, output_dir, max_height=50000, image_type="png", quality=None,
+                            extension=None, write_tile=None):
+        """Scroll through a page capturing viewport tiles straight to disk; returns (manifest_path, bytes)"""
+        os.makedirs(output_dir, exist_ok=True)
+        write_tile = write_tile or self._write_file
+        extension = extension or ("jpg" if image_type == "jpeg" else image_type)
+        viewport = page.viewport_size or {"width": 1920, "height": 1080}
+        options = {"type": image_type, "scale": "css"}
+        if image_type == "jpeg" and quality:
+            options["quality"] = quality
+        
+        tiles = []
+        written = 0
+        pending = None
+        y = 0
+        page_height = await page.evaluate("() => document.documentElement.scrollHeight")
+        
+        try:
+            while y < min(page_height, max_height):
+                # scrollTo clamps at the bottom, so the last tile may start above y
+                scroll_y = await page.evaluate("(y) => { window.scrollTo(0, y); return window.scrollY; }", y)
+                await page.evaluate("() => new Promise(r => requestAnimationFrame(() => requestAnimationFrame(r)))")
+                offset = max(0, y - int(scroll_y))
+                height = min(viewport["height"] - offset, max_height - y)
+                if height <= 0:
+                    break
+                
+                data = await page.screenshot(full_page=False, **options)
+                
+                # At most one tile is held in memory while the previous one is written
+                if pending:
+                    written += await pending
+                path = os.path.join(output_dir, f"tile_{len(tiles):04d}.{extension}")
+                pending = asyncio.ensure_future(asyncio.to_thread(write_tile, data, path))
+                del data
+                tiles.append({"file": os.path.basename(path), "y": y, "offset": offset, "height": height})
+                
+                if len(tiles) == 1:
+                    # Fixed headers and banners would otherwise repeat in every tile
+                    await page.evaluate('''() => {
+                        for (const el of document.querySelectorAll('body *')) {
+                            const position = getComputedStyle(el).position;
+                            if (position === 'fixed' || position === 'sticky') {
+                                el.setAttribute('data-elysian-hidden', el.style.visibility);
+                                el.style.visibility = 'hidden';
+                            }
+                        }
+                    }''')
+                
+                y += height
+                
+                # Infinite-scroll pages grow as we go
+                page_height = await page.evaluate("() => document.documentElement.scrollHeight")
+            
+            if pending:
+                written += await pending
+                pending = None
+        finally:
+            if pending:
+                await asyncio.gather(pending, return_exceptions=True)
+            await page.evaluate('''() => {
+                for (const el of document.querySelectorAll('[data-elysian-hidden]')) {
+                    el.style.visibility = el.getAttribute('data-elysian-hidden');
+                    el.removeAttribute('data-elysian-hidden');
+                }
+                window.scrollTo(0, 0);
+            }''')
+        
+        manifest = {
+            "url": page.url,
+            "width": viewport["width"],
+            "tile_height": viewport["height"],
+            "total_height": y,
+            "truncated": page_height > y,
+            "tiles": tiles,
+        }
+        manifest_path = os.path.join(output_dir, "manifest.json")
+        await asyncio.to_thread(self._write_file, json.dumps(manifest, indent=2).encode(), manifest_path)
+        return manifest_path, written
+    
+    @staticmethod
+    def preview_image(screenshot_path):
+        """Image file to display for a stored screenshot: the first tile of a tiled capture"""
+        if not screenshot_path or os.path.basename(screenshot_path) != "manifest.json":
+            return screenshot_path
+        try:
+            with open(screenshot_path, 'r') as f:
+                tiles = json.load(f)["tiles"]
+        except (OSError, ValueError, KeyError):
+            return None
+        return os.path.join(os.path.dirname(screenshot_path), tiles[0]["file"]) if tiles else None
+    
+    @staticmethod
+    def stitch_tiles(manifest_path, output_path=None):
+        """Stitch a tile manifest into a single image on demand"""
+        with open(manifest_path, 'r') as f:
+            manifest = json.load(f)
+        
+        base_dir = os.path.dirname(manifest_path)
+        canvas = None
+        for tile in manifest["tiles"]:
+            with Image.open(os.path.join(base_dir, tile["file"])) as image:
+                if canvas is None:
+                    # Tiles may be scaled relative to CSS pixels; size the canvas from the first tile
+                    ratio = image.width / manifest["width"]
+                    canvas = Image.new("RGB", (image.width, round(manifest["total_height"] * ratio)), "white")
+                top = round(tile["offset"] * ratio)
+                crop = image.crop((0, top, image.width, top + round(tile["height"] * ratio)))
+                canvas.paste(crop, (0, round(tile["y"] * ratio)))
+        
+        if canvas is None:
+            return None
+        output_path = output_path or os.path.join(base_dir, "stitched.png")
+        canvas.save(output_path)
+        return output_path
+    
+    async def close(self):
+        """Close browser and clean up resources"""
+        for entry in list(self.proxy_contexts.values()) + self.retired_contexts:
+            try:
+                await entry["context"].close()
+            except Exception as e:
+                logger.debug(f"Error closing context for proxy {entry['proxy']}: {e}")
+        self.proxy_contexts.clear()
+        self.retired_contexts.clear()
+        self.page_proxies.clear()
+        self.page_contexts.clear()
+        
+        if self.browser:
+            await self.browser.close()
+            self.browser = None
+            self.context = None
+        
+        if self.playwright:
+            await self.playwright.stop()
+            self.playwright = None
+        
+        if self.http_cache:
+            self.http_cache.close()
+        
+        if self.archive:
+            logger.info(f"Archive {self.archive.path} ({self.archive.mode}): {self.archive.stats}")
+            self.archive.close()
+            self.archive = None
+
+class _TextBlockParser(HTMLParser):
+    """Streaming HTML parser that splits visible text into blocks with link density"""
+    
+    SKIP_TAGS = {
+        "script", "style", "noscript", "template", "svg", "iframe", "head", "title",
+        "nav", "header", "footer", "aside", "form", "button", "select", "option",
+    }
+    BLOCK_TAGS = {
+        "p", "div", "section", "article", "main", "li", "ul", "ol", "dl", "dt", "dd",
+        "h1", "h2", "h3", "h4", "h5", "h6", "table", "tr", "td", "th", "blockquote",
+        "pre", "br", "hr", "figcaption", "caption", "address", "details", "summary",
+    }
+    VOID_TAGS = {"br", "hr", "img", "input", "meta", "link", "source", "wbr", "area", "col", "embed", "base", "param", "track"}
+    HEAD_TAGS = {"title", "meta", "link", "style", "script", "base", "noscript", "template"}
+    # Elements whose end tag HTML lets authors leave out, as tag -> (open tags it closes, tags that stop the search)
+    SCOPE_TAGS = {"html", "table", "td", "th", "caption", "button", "template", "object"}
+    IMPLIED_END_TAGS = {
+        "li": ({"li"}, {"ul", "ol"} | SCOPE_TAGS),
+        "dt": ({"dt", "dd"}, {"dl"} | SCOPE_TAGS),
+        "dd": ({"dt", "dd"}, {"dl"} | SCOPE_TAGS),
+        "option": ({"option"}, {"select", "datalist", "optgroup"} | SCOPE_TAGS),
+        "optgroup": ({"optgroup", "option"}, {"select"} | SCOPE_TAGS),
+        "tr": ({"tr", "td", "th"}, {"table", "thead", "tbody", "tfoot"}),
+        "td": ({"td", "th"}, {"tr", "table"}),
+        "th": ({"td", "th"}, {"tr", "table"}),
+        "thead": ({"thead", "tbody", "tfoot", "tr", "td", "th"}, {"table"}),
+        "tbody": ({"thead", "tbody", "tfoot", "tr", "td", "th"}, {"table"}),
+        "tfoot": ({"thead", "tbody", "tfoot", "tr", "td", "th"}, {"table"}),
+        "a": ({"a"}, SCOPE_TAGS),
+    }
+    # Block-level start tags that end an open paragraph
+    CLOSES_P = (BLOCK_TAGS | {"nav", "header", "footer", "aside", "form", "figure", "fieldset", "menu"}) - {
+        "br", "td", "th", "tr", "li", "dt", "dd", "summary", "figcaption", "caption"
+    }
+    BOILERPLATE_PATTERN = re.compile(
+        r"(^|[\s_-])(nav|navbar|menu|footer|header|sidebar|breadcrumbs?|cookie|consent|banner|"
+        r"share|social|advert|ads|promo|newsletter|related|comments?)($|[\s_-])",
+        re.IGNORECASE
+    )
+    
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.blocks = []
+        self.current = []
+        self.link_chars = 0
+        self.link_depth = 0
+        # Open elements as (tag, skipped) so omitted end tags can be closed by what follows them
+        self.stack = []
+        self.skip_depth = 0
+    
+    def _flush(self):
+        text = " ".join("".join(self.current).split())
+        if text:
+            self.blocks.append((text, self.link_chars))
+        self.current = []
+        self.link_chars = 0
+    
+    def _pop_to(self, index):
+        """Close every open element from the top of the stack down to index"""
+        while len(self.stack) > index:
+            tag, skipped = self.stack.pop()
+            if skipped:
+                self.skip_depth -= 1
+            elif self.skip_depth:
+                continue
+            elif tag in self.BLOCK_TAGS:
+                self._flush()
+            elif tag == "a" and self.link_depth:
+                self.link_depth -= 1
+    
+    def _close_implied(self, closes, stops):
+        for index in range(len(self.stack) - 1, -1, -1):
+            tag = self.stack[index][0]
+            if tag in closes:
+                self._pop_to(index)
+                return
+            if tag in stops:
+                return
+    
+    def _find(self, tag):
+        for index in range(len(self.stack) - 1, -1, -1):
+            if self.stack[index][0] == tag:
+                return index
+        return None
+    
+    def handle_starttag(self, tag, attrs):
+        # Content after the head (or an explicit body) ends a head whose end tag was left out
+        if tag not in self.HEAD_TAGS and tag not in ("html", "head"):
+            head = self._find("head")
+            if head is not None:
+                self._pop_to(head)
+        if tag in self.IMPLIED_END_TAGS:
+            self._close_implied(*self.IMPLIED_END_TAGS[tag])
+        if tag in self.CLOSES_P:
+            self._close_implied({"p"}, self.SCOPE_TAGS)
+        
+        skipped = not self.skip_depth and (tag in self.SKIP_TAGS or self._is_boilerplate(attrs))
+        if tag in self.VOID_TAGS:
+            if tag in self.BLOCK_TAGS and not self.skip_depth:
+                self._flush()
+            return
+        
+        if skipped:
+            self._flush()
+            self.skip_depth += 1
+        elif self.skip_depth:
+            pass
+        elif tag in self.BLOCK_TAGS:
+            self._flush()
+        elif tag == "a":
+            self.link_depth += 1
+        self.stack.append((tag, skipped))
+    
+    def handle_endtag(self, tag):
+        index = self._find(tag)
+        if index is not None:
+            self._pop_to(index)
+        elif tag in self.BLOCK_TAGS and not self.skip_depth:
+            # Stray end tags (</p>, </br>) still end a block
+            self._flush()
+    
+    def handle_data(self, data):
+        if self.skip_depth:
+            return
+        self.current.append(data)
+        if self.link_depth:
+            self.link_chars += len(data.strip())
+    
+    def _is_boilerplate(self, attrs):
+        for name, value in attrs:
+            if name in ("class", "id", "role") and value and self.BOILERPLATE_PATTERN.search(value):
+                return True
+        return False
+    
+    def close(self):
+        super().close()
+        self._flush()
+
+def extract_text_from_html(html_content, max_link_density=0.5):
+    """Extract the main visible text of an HTML document with boilerplate removed"""
+    parser = _TextBlockParser()
+    try:
+        parser.feed(html_content or "")
+        parser.close()
+    except Exception as e:
+        logger.debug(f"HTML parser stopped early: {e}")
+        parser._flush()
+    
+    # Drop link-dominated blocks such as menus and tag clouds
+    kept = [text for text, link_chars in parser.blocks if link_chars <= max_link_density * len(text)]
+    return "\n".join(kept)
+
+def _timed_extract(html_content):
+    """Process pool worker: extract text and report CPU seconds spent"""
+    start = time.process_time()
+    text = extract_text_from_html(html_content)
+    return text, time.process_time() - start
+
+class ContentExtractor:
+    """Runs offline HTML-to-text extraction in a process pool"""
+    
+    def __init__(self, config):
+        self.workers = int(config.get("EXTRACTION_WORKERS", 0)) or os.cpu_count() or 1
+        self.batch_size = int(config.get("EXTRACTION_BATCH_SIZE", 200))
+        self.executor = None
+    
+    def _get_executor(self):
+        """Create the process pool on first use"""
+        if self.executor is None:
+            self.executor = concurrent.futures.ProcessPoolExecutor(max_workers=self.workers)
+        return self.executor
+    
+    async def extract(self, html_content):
+        """Extract text from a single HTML document without blocking the event loop"""
+        loop = asyncio.get_running_loop()
+        text, _ = await loop.run_in_executor(self._get_executor(), _timed_extract, html_content)
+        return text
+    
+    def reextract(self, db_path, session_ids=None, on_batch=None):
+        """Re-extract text for stored HTML of the given sessions (all sessions if None)"""
+        executor = self._get_executor()
+        chunksize = max(1, self.batch_size // (self.workers * 4))
+        
+        query = """SELECT pc.id, pc.page_id, pc.content FROM page_content pc
+                   JOIN pages p ON p.id = pc.page_id
+                   WHERE pc.content_type = 'html' AND pc.id > ?"""
+        params = []
+        if session_ids:
+            query += f" AND p.session_id IN ({','.join('?' * len(session_ids))})"
+            params = list(session_ids)
+        query += " ORDER BY pc.id LIMIT ?"
+        
+        metadata = json.dumps({"extracted_from": "html", "extractor": "offline"})
+        stats = {"pages": 0, "bytes": 0, "cpu_seconds": 0.0, "workers": self.workers}
+        start_time = time.time()
+        last_id = 0
+        
+        conn = sqlite3.connect(db_path)
+        try:
+            while True:
+                # Keyset pagination keeps memory bounded on very large sessions
+                rows = conn.execute(query, [last_id] + params + [self.batch_size]).fetchall()
+                if not rows:
+                    break
+                last_id = rows[-1][0]
+                
+                results = list(executor.map(_timed_extract, [row[2] for row in rows], chunksize=chunksize))
+                
+                cursor = conn.cursor()
+                for (_, page_id, html_content), (text, cpu_seconds) in zip(rows, results):
+                    cursor.execute(
+                        "DELETE FROM page_content WHERE page_id = ? AND content_type = 'text'",
+                        (page_id,)
+                    )
+                    cursor.execute(
+                        "INSERT INTO page_content (page_id, content_type, content, metadata) VALUES (?, ?, ?, ?)",
+                        (page_id, "text", text, metadata)
+                    )
+                    stats["bytes"] += len(html_content)
+                    stats["cpu_seconds"] += cpu_seconds
+                conn.commit()
+                
+                stats["pages"] += len(rows)
+                if on_batch:
+                    on_batch(stats["pages"])
+        finally:
+            conn.close()
+        
+        elapsed = time.time() - start_time
+        stats["elapsed"] = elapsed
+        stats["pages_per_second"] = stats["pages"] / elapsed if elapsed else 0.0
+        # Per-core throughput is measured against CPU time actually spent in the workers
+        stats["pages_per_core_second"] = stats["pages"] / stats["cpu_seconds"] if stats["cpu_seconds"] else 0.0
+        stats["mb_per_second"] = stats["bytes"] / 1e6 / elapsed if elapsed else 0.0
+        
+        logger.info(f"Re-extracted {stats['pages']} pages in {elapsed:.2f}s "
+                    f"({stats['pages_per_core_second']:.1f} pages/s per core)")
+        return stats
+    
+    def close(self):
+        """Shut down the process pool"""
+        if self.executor:
+            self.executor.shutdown(wait=True, cancel_futures=True)
+            self.executor = None
+
+class DatabaseWriter:
+    """Serializes SQLite writes through one long-lived connection on a background thread"""
+    
+    def __init__(self, db_path, batch_size=64):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.queue = queue.Queue()
+        self.thread = None
+        self._lock = threading.Lock()
+    
+    def start(self):
+        """Start the writer thread if it is not running"""
+        with self._lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self._run, name="elysian-db-writer", daemon=True)
+                self.thread.start()
+    
+    def submit(self, fn, *args):
+        """Queue fn(conn, *args) for the writer thread and return a concurrent future"""
+        self.start()
+        future = concurrent.futures.Future()
+        self.queue.put((fn, args, future))
+        return future
+    
+    async def run(self, fn, *args):
+        """Run fn(conn, *args) on the writer thread and await its result"""
+        return await asyncio.wrap_future(self.submit(fn, *args))
+    
+    def _run(self):
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        
+        try:
+            while True:
+                job = self.queue.get()
+                if job is None:
+                    return
+                
+                # Group whatever is already queued into a single transaction
+                jobs = [job]
+                while len(jobs) < self.batch_size:
+                    try:
+                        job = self.queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if job is None:
+                        self.queue.put(None)
+                        break
+                    jobs.append(job)
+                
+                results = []
+                conn.execute("BEGIN")
+                for fn, args, future in jobs:
+                    if not future.set_running_or_notify_cancel():
+                        continue
+                    conn.execute("SAVEPOINT job")
+                    try:
+                        results.append((future, fn(conn, *args), None))
+                        conn.execute("RELEASE SAVEPOINT job")
+                    except Exception as e:
+                        conn.execute("ROLLBACK TO SAVEPOINT job")
+                        conn.execute("RELEASE SAVEPOINT job")
+                        results.append((future, None, e))
+                
+                # Results are only published once they are durable
+                try:
+                    conn.execute("COMMIT")
+                except Exception as e:
+                    if conn.in_transaction:
+                        conn.execute("ROLLBACK")
+                    results = [(future, None, e) for future, _, _ in results]
+                
+                for future, result, error in results:
+                    if error is not None:
+                        future.set_exception(error)
+                    else:
+                        future.set_result(result)
+        finally:
+            conn.close()
+    
+    def pending(self):
+        """Number of writes waiting in the queue"""
+        return self.queue.qsize()
+    
+    def close(self):
+        """Flush pending writes and stop the writer thread"""
+        if self.thread and self.thread.is_alive():
+            self.queue.put(None)
+            self.thread.join()
+        self.thread = None
+
+class JobQueue:
+    """Persistent priority job queue in SQLite with leased, crash-safe claims"""
+    
+    def __init__(self, config, db_path):
+        self.db_path = db_path
+        self.lease_seconds = float(config.get("JOB_LEASE_SECONDS", 60))
+        self.max_attempts = int(config.get("JOB_MAX_ATTEMPTS", 3))
+        self.retry_delay = float(config.get("JOB_RETRY_DELAY", 30))
+    
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        try:
+            yield conn
+        finally:
+            conn.close()
+    
+    @contextmanager
+    def _transaction(self, conn):
+        # IMMEDIATE takes the write lock up front so concurrent claimers serialize instead of racing
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+    
+    def enqueue(self, job_type, params, priority=0, max_attempts=None, delay=0):
+        """Add a job and return its ID"""
+        return self.enqueue_many([(job_type, params)], priority, max_attempts, delay)[0]
+    
+    def enqueue_many(self, jobs, priority=0, max_attempts=None, delay=0):
+        """Add (type, params) jobs in one transaction and return their IDs"""
+        now = time.time()
+        max_attempts = max_attempts or self.max_attempts
+        with self._connect() as conn, self._transaction(conn):
+            return [
+                conn.execute(
+                    """INSERT INTO jobs (type, params, priority, max_attempts, available_at, created_at)
+                       VALUES (?, ?, ?, ?, ?, ?)""",
+                    (job_type, json.dumps(params), priority, max_attempts, now + delay, now)
+                ).lastrowid
+                for job_type, params in jobs
+            ]
+    
+    def reclaim_expired(self, conn, now):
+        """Requeue running jobs whose lease ran out; fail them once out of attempts"""
+        expired = conn.execute(
+            "SELECT id, attempts, max_attempts FROM jobs WHERE status = 'running' AND lease_expires_at < ?",
+            (now,)
+        ).fetchall()
+        for job in expired:
+            if job["attempts"] >= job["max_attempts"]:
+                conn.execute(
+                    """UPDATE jobs SET status = 'failed', lease_owner = NULL, finished_at = ?,
+                       error = 'lease expired' WHERE id = ?""",
+                    (now, job["id"])
+                )
+            else:
+                conn.execute(
+                    """UPDATE jobs SET status = 'queued', lease_owner = NULL, available_at = ?,
+                       error = 'lease expired' WHERE id = ?""",
+                    (now, job["id"])
+                )
+        return len(expired)
+    
+    def claim(self, worker_id, job_types=None):
+        """Atomically lease the highest-priority available job, or return None"""
+        now = time.time()
+        with self._connect() as conn, self._transaction(conn):
+            reclaimed = self.reclaim_expired(conn, now)
+            if reclaimed:
+                logger.warning(f"Reclaimed {reclaimed} jobs with expired leases")
+            
+            query = "SELECT * FROM jobs WHERE status = 'queued' AND available_at <= ?"
+            args = [now]
+            if job_types:
+                query += f" AND type IN ({','.join('?' * len(job_types))})"
+                args.extend(job_types)
+            job = conn.execute(query + " ORDER BY priority DESC, id LIMIT 1", args).fetchone()
+            if job is None:
+                return None
+            
+            conn.execute(
+                """UPDATE jobs SET status = 'running', lease_owner = ?, lease_expires_at = ?,
+                   attempts = attempts + 1, started_at = ? WHERE id = ?""",
+                (worker_id, now + self.lease_seconds, now, job["id"])
+            )
+        
+        job = dict(job)
+        job["params"] = json.loads(job["params"])
+        job["attempts"] += 1
+        return job
+    
+    def heartbeat(self, job_id, worker_id):
+        """Extend a lease; returns False if the worker no longer owns the job"""
+        with self._connect() as conn:
+            return conn.execute(
+                """UPDATE jobs SET lease_expires_at = ?
+                   WHERE id = ? AND lease_owner = ? AND status = 'running'""",
+                (time.time() + self.lease_seconds, job_id, worker_id)
+            ).rowcount == 1
+    
+    def complete(self, job_id, worker_id, result=None):
+        """Mark a leased job as completed; returns False if the lease was lost"""
+        with self._connect() as conn:
+            return conn.execute(
+                """UPDATE jobs SET status = 'completed', lease_owner = NULL, finished_at = ?,
+                   result = ?, error = NULL WHERE id = ? AND lease_owner = ? AND status = 'running'""",
+                (time.time(), json.dumps(result), job_id, worker_id)
+            ).rowcount == 1
+    
+    def release(self, job_id, worker_id):
+        """Return a leased job to the queue without spending an attempt"""
+        with self._connect() as conn:
+            return conn.execute(
+                """UPDATE jobs SET status = 'queued', lease_owner = NULL, available_at = ?,
+                   attempts = MAX(attempts - 1, 0) WHERE id = ? AND lease_owner = ? AND status = 'running'""",
+                (time.time(), job_id, worker_id)
+            ).rowcount == 1
+    
+    def fail(self, job_id, worker_id, error):
+        """Requeue a leased job with a delay, or fail it once out of attempts"""
+        now = time.time()
+        with self._connect() as conn:
+            return conn.execute(
+                """UPDATE jobs SET
+                       status = CASE WHEN attempts >= max_attempts THEN 'failed' ELSE 'queued' END,
+                       finished_at = CASE WHEN attempts >= max_attempts THEN ? ELSE NULL END,
+                       available_at = ? + ? * attempts,
+                       lease_owner = NULL, error = ?
+                   WHERE id = ? AND lease_owner = ? AND status = 'running'""",
+                (now, now, self.retry_delay, str(error), job_id, worker_id)
+            ).rowcount == 1
+    
+    def counts(self):
+        """Number of jobs per status"""
+        with self._connect() as conn:
+            return dict(conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+
+def parse_interval(value):
+    """Seconds in an interval such as 90, 30m, 6h, 1d or 2w"""
+    value = str(value).strip().lower()
+    units = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+    if value and value[-1] in units:
+        return float(value[:-1]) * units[value[-1]]
+    return float(value)
+
+class ChangeMonitor:
+    """Watched URLs with per-URL recrawl schedules and content-hash change events"""
+    
+    def __init__(self, config, db_path):
+        self.db_path = db_path
+        self.default_interval = parse_interval(config.get("MONITOR_DEFAULT_INTERVAL", "1d"))
+        self.batch_size = int(config.get("MONITOR_BATCH_SIZE", 100))
+    
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        try:
+            yield conn
+        finally:
+            conn.close()
+    
+    @contextmanager
+    def _transaction(self, conn):
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+    
+    def watch(self, urls, interval=None, label=None):
+        """Watch URLs (or update their schedule); new URLs are due immediately"""
+        interval = parse_interval(interval) if interval is not None else self.default_interval
+        now = time.time()
+        with self._connect() as conn, self._transaction(conn):
+            conn.executemany(
+                """INSERT INTO watched_urls (url, label, interval_seconds, next_due, created_at)
+                   VALUES (?, ?, ?, ?, ?)
+                   ON CONFLICT (url) DO UPDATE SET interval_seconds = excluded.interval_seconds,
+                       label = COALESCE(excluded.label, label),
+                       next_due = MIN(next_due, ?)""",
+                [(url, label, interval, now, now, (now + interval)) for url in urls]
+            )
+        return len(urls)
+    
+    def unwatch(self, urls):
+        """Stop watching URLs; their change history is kept"""
+        with self._connect() as conn, self._transaction(conn):
+            return sum(conn.execute("DELETE FROM watched_urls WHERE url = ?", (url,)).rowcount for url in urls)
+    
+    def watched(self):
+        with self._connect() as conn:
+            return [dict(row) for row in conn.execute("SELECT * FROM watched_urls ORDER BY next_due, url")]
+    
+    def due(self, now=None, limit=None):
+        """URLs whose next check is due, most overdue first"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT url FROM watched_urls WHERE next_due <= ? ORDER BY next_due LIMIT ?",
+                (now or time.time(), limit or self.batch_size)
+            )
+            return [row["url"] for row in rows]
+    
+    def next_due_at(self):
+        with self._connect() as conn:
+            return conn.execute("SELECT MIN(next_due) FROM watched_urls").fetchone()[0]
+    
+    def record_check(self, session_id, urls):
+        """Compare the URLs crawled in a session with their last known hashes, store change events and reschedule"""
+        now = time.time()
+        detected_at = datetime.now().isoformat()
+        with self._connect() as conn, self._transaction(conn):
+            conn.execute(
+                "CREATE TEMP TABLE IF NOT EXISTS monitor_checked (url TEXT PRIMARY KEY, outcome TEXT, content_hash TEXT)"
+            )
+            conn.execute("DELETE FROM monitor_checked")
+            conn.executemany("INSERT OR IGNORE INTO monitor_checked (url) VALUES (?)", [(url,) for url in urls])
+            
+            # Only a stored 404/410 means a page is gone; timeouts, server errors and URLs the
+            # crawl never reached leave the outcome NULL and their last known hash untouched
+            conn.execute(
+                """UPDATE monitor_checked SET (outcome, content_hash) = (
+                       SELECT CASE WHEN p.status_code IN (404, 410) THEN 'gone'
+                                   WHEN p.status_code >= 400 THEN NULL
+                                   ELSE 'ok' END,
+                              p.content_hash
+                       FROM pages p WHERE p.session_id = ? AND p.url = monitor_checked.url
+                       ORDER BY p.id DESC LIMIT 1)""",
+                (session_id,)
+            )
+            
+            # First sightings and changed hashes, then pages that are gone
+            conn.execute(
+                """INSERT INTO change_events (url, session_id, previous_session_id, change_type, old_hash, new_hash, detected_at)
+                   SELECT w.url, ?, w.last_session_id,
+                          CASE WHEN w.last_content_hash IS NULL THEN 'added' ELSE 'changed' END,
+                          w.last_content_hash, c.content_hash, ?
+                   FROM monitor_checked c
+                   JOIN watched_urls w ON w.url = c.url
+                   WHERE c.outcome = 'ok' AND w.last_content_hash IS NOT c.content_hash""",
+                (session_id, detected_at)
+            )
+            conn.execute(
+                """INSERT INTO change_events (url, session_id, previous_session_id, change_type, old_hash, new_hash, detected_at)
+                   SELECT w.url, ?, w.last_session_id, 'removed', w.last_content_hash, NULL, ?
+                   FROM monitor_checked c
+                   JOIN watched_urls w ON w.url = c.url
+                   WHERE c.outcome = 'gone' AND w.last_content_hash IS NOT NULL""",
+                (session_id, detected_at)
+            )
+            
+            conn.execute(
+                """UPDATE watched_urls SET last_checked = ?, next_due = ? + interval_seconds
+                   WHERE url IN (SELECT url FROM monitor_checked)""",
+                (now, now)
+            )
+            conn.execute(
+                """UPDATE watched_urls SET
+                       last_session_id = ?,
+                       last_content_hash = (
+                           SELECT CASE WHEN c.outcome = 'ok' THEN c.content_hash END
+                           FROM monitor_checked c WHERE c.url = watched_urls.url)
+                   WHERE url IN (SELECT url FROM monitor_checked WHERE outcome IS NOT NULL)""",
+                (session_id,)
+            )
+            
+            return [dict(row) for row in conn.execute(
+                "SELECT url, change_type, old_hash, new_hash FROM change_events WHERE session_id = ? ORDER BY id",
+                (session_id,)
+            )]
+    
+    def diff_sessions(self, old_session_id, new_session_id, record=False):
+        """Added, removed and changed pages between two sessions, computed with set operations on indexed columns"""
+        params = {"old": old_session_id, "new": new_session_id}
+        # Like record_check, only a 404/410 in the new session means removed: a URL the new crawl didn't
+        # reach (depth or page budget, link order) or failed on is unknown, and error pages never count as changed
+        pages = """WITH old_ok AS (SELECT url, content_hash FROM pages
+                                   WHERE session_id = :old AND (status_code IS NULL OR status_code < 400)),
+                        new_ok AS (SELECT url, content_hash FROM pages
+                                   WHERE session_id = :new AND (status_code IS NULL OR status_code < 400))"""
+        with self._connect() as conn:
+            added = conn.execute(
+                pages + """SELECT url, content_hash AS new_hash FROM new_ok WHERE url IN (
+                               SELECT url FROM new_ok EXCEPT SELECT url FROM old_ok)""",
+                params
+            ).fetchall()
+            removed = conn.execute(
+                pages + """SELECT url, content_hash AS old_hash FROM old_ok WHERE url IN (
+                               SELECT url FROM pages WHERE session_id = :new AND status_code IN (404, 410)
+                               EXCEPT SELECT url FROM new_ok)""",
+                params
+            ).fetchall()
+            changed = conn.execute(
+                pages + """SELECT n.url, o.content_hash AS old_hash, n.content_hash AS new_hash FROM (
+                               SELECT url, content_hash FROM new_ok EXCEPT SELECT url, content_hash FROM old_ok) n
+                           JOIN old_ok o ON o.url = n.url""",
+                params
+            ).fetchall()
+            
+            diff = {
+                "old_session_id": old_session_id,
+                "new_session_id": new_session_id,
+                "added": [dict(row) for row in added],
+                "removed": [dict(row) for row in removed],
+                "changed": [dict(row) for row in changed],
+            }
+            
+            if record:
+                detected_at = datetime.now().isoformat()
+                with self._transaction(conn):
+                    conn.executemany(
+                        """INSERT INTO change_events (url, session_id, previous_session_id, change_type, old_hash, new_hash, detected_at)
+                           VALUES (?, ?, ?, ?, ?, ?, ?)""",
+                        [
+                            (row["url"], new_session_id, old_session_id, change_type,
+                             row.get("old_hash"), row.get("new_hash"), detected_at)
+                            for change_type in ("added", "removed", "changed") for row in diff[change_type]
+                        ]
+                    )
+        return diff
+    
+    def changes(self, url=None, limit=100):
+        """Most recent change events, optionally for one URL"""
+        query = "SELECT * FROM change_events"
+        params = []
+        if url:
+            query += " WHERE url = ?"
+            params.append(url)
+        query += " ORDER BY id DESC LIMIT ?"
+        params.append(limit)
+        with self._connect() as conn:
+            return [dict(row) for row in conn.execute(query, params)]
+
+class SimHashIndex:
+    """LSH index of 64-bit SimHash signatures for near-duplicate lookups"""
+    
+    BITS = 64
+    
+    def __init__(self, max_distance=3):
+        self.max_distance = max_distance
+        
+        # Pigeonhole: signatures within max_distance bits agree exactly on at least one band
+        num_bands = max_distance + 1
+        widths = [self.BITS // num_bands + (1 if i < self.BITS % num_bands else 0) for i in range(num_bands)]
+        self.bands = []
+        shift = 0
+        for width in widths:
+            self.bands.append((shift, (1 << width) - 1))
+            shift += width
+        
+        self.buckets = [{} for _ in self.bands]
+        self.size = 0
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def signature(text, min_tokens=20, shingle_size=3):
+        """Compute the SimHash of a text over weighted word shingles"""
+        tokens = re.findall(r"\w+", text.lower())
+        if len(tokens) < min_tokens:
+            return None
+        
+        shingles = {}
+        for i in range(max(1, len(tokens) - shingle_size + 1)):
+            shingle = " ".join(tokens[i:i + shingle_size])
+            shingles[shingle] = shingles.get(shingle, 0) + 1
+        
+        hashes = np.fromiter(
+            (int.from_bytes(hashlib.blake2b(s.encode(), digest_size=8).digest(), "big") for s in shingles),
+            dtype=np.uint64, count=len(shingles)
+        )
+        weights = np.fromiter(shingles.values(), dtype=np.int64, count=len(shingles))
+        
+        # Weighted vote per bit position: +w where the bit is set, -w otherwise
+        bits = (hashes[:, None] >> np.arange(SimHashIndex.BITS, dtype=np.uint64)) & np.uint64(1)
+        votes = (bits.astype(np.int64) * 2 - 1).T @ weights
+        
+        signature = 0
+        for position in np.nonzero(votes > 0)[0]:
+            signature |= 1 << int(position)
+        return signature
+    
+    @staticmethod
+    def to_hex(signature):
+        """Format a signature for storage, or None if there is none"""
+        return None if signature is None else f"{signature:016x}"
+    
+    def add(self, signature, key):
+        """Index a signature under the given key"""
+        with self._lock:
+            self._add(signature, key)
+    
+    def _add(self, signature, key):
+        for bucket, (shift, mask) in zip(self.buckets, self.bands):
+            bucket.setdefault((signature >> shift) & mask, []).append((signature, key))
+        self.size += 1
+    
+    def remove(self, signature, key):
+        """Drop a signature indexed under the given key"""
+        with self._lock:
+            removed = False
+            for bucket, (shift, mask) in zip(self.buckets, self.bands):
+                entries = bucket.get((signature >> shift) & mask, [])
+                if (signature, key) in entries:
+                    entries.remove((signature, key))
+                    removed = True
+            self.size -= removed
+    
+    def query_or_add(self, signature, key):
+        """Return the closest match like query, or index the signature under key if there is none"""
+        with self._lock:
+            match = self._query(signature)
+            if match is None:
+                self._add(signature, key)
+            return match
+    
+    def query(self, signature):
+        """Return (key, distance) of the closest indexed signature within range, or None"""
+        with self._lock:
+            return self._query(signature)
+    
+    def _query(self, signature):
+        best = None
+        for bucket, (shift, mask) in zip(self.buckets, self.bands):
+            for candidate, key in bucket.get((signature >> shift) & mask, ()):
+                distance = bin(candidate ^ signature).count("1")
+                if distance <= self.max_distance and (best is None or distance < best[1]):
+                    best = (key, distance)
+        return best
+
+class RetryableStatusError(Exception):
+    """Raised for HTTP responses that ask the client to come back later"""
+    
+    def __init__(self, status, retry_after=None):
+        super().__init__(f"HTTP {status}")
+        self.status = status
+        self.retry_after = retry_after
+
+def parse_retry_after(value):
+    """Seconds to wait from a Retry-After header in either delay-seconds or HTTP-date form, or None"""
+    value = (value or "").strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        # HTTP dates are always GMT
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, retry_at.timestamp() - time.time())
+
+def classify_scrape_error(error):
+    """Classify a page failure as timeout, throttled, network or fatal"""
+    if isinstance(error, RetryableStatusError):
+        return "throttled"
+    if isinstance(error, (PlaywrightTimeoutError, asyncio.TimeoutError)):
+        return "timeout"
+    if isinstance(error, (aiohttp.ClientError, requests.ConnectionError, ConnectionError)):
+        return "network"
+    if isinstance(error, PlaywrightError) and "net::ERR_" in str(error):
+        # Resolution failures won't fix themselves on retry
+        return "fatal" if "ERR_NAME_NOT_RESOLVED" in str(error) else "network"
+    return "fatal"
+
+# Navigation errors the proxy itself causes; DNS, TLS and HTTP errors from the target say nothing about it
+PROXY_ERROR_CODES = (
+    "ERR_PROXY_", "ERR_TUNNEL_CONNECTION_FAILED", "ERR_SOCKS_CONNECTION_FAILED",
+    "ERR_CONNECTION_REFUSED", "ERR_CONNECTION_RESET",
+)
+
+def is_proxy_error(error):
+    """Whether a navigation failure should count against the proxy that carried it"""
+    return isinstance(error, PlaywrightError) and any(f"net::{code}" in str(error) for code in PROXY_ERROR_CODES)
+
+class HostConcurrencyController:
+    """Per-host AIMD concurrency limits driven by latency, throttling and timeouts"""
+    
+    def __init__(self, config):
+        self.enabled = config.get("ADAPTIVE_CONCURRENCY", "true").lower() == "true"
+        self.initial_limit = float(config.get("HOST_INITIAL_CONCURRENCY", 2))
+        self.max_limit = float(config.get("HOST_MAX_CONCURRENCY", 16))
+        self.decrease_factor = float(config.get("HOST_DECREASE_FACTOR", 0.5))
+        self.latency_factor = float(config.get("HOST_LATENCY_FACTOR", 2.0))
+        self.min_interval = float(config.get("DEFAULT_CRAWL_DELAY", 2))
+        self.min_limit = 1.0
+        self.hosts = {}
+    
+    def _state(self, host):
+        state = self.hosts.get(host)
+        if state is None:
+            state = self.hosts[host] = {
+                "limit": self.initial_limit if self.enabled else self.min_limit,
+                "in_flight": 0,
+                "latency": None,
+                "baseline": None,
+                "increases": 0,
+                "decreases": 0,
+                "last_decrease": 0.0,
+                "next_start": 0.0,
+                "waiters": collections.deque(),
+            }
+        return state
+    
+    def _wake(self, state):
+        free = int(state["limit"]) - state["in_flight"]
+        while free > 0 and state["waiters"]:
+            waiter = state["waiters"].popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                free -= 1
+    
+    @asynccontextmanager
+    async def slot(self, host):
+        """Hold one of the host's concurrency slots"""
+        state = self._state(host)
+        while state["in_flight"] >= int(state["limit"]):
+            waiter = asyncio.get_running_loop().create_future()
+            state["waiters"].append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                # Pass a wakeup we may have consumed on to the next waiter
+                self._wake(state)
+                raise
+        
+        state["in_flight"] += 1
+        try:
+            # The crawl delay stays a minimum spacing between request starts to the same host
+            if self.enabled and self.min_interval > 0:
+                now = time.monotonic()
+                start = max(now, state["next_start"])
+                state["next_start"] = start + self.min_interval
+                if start > now:
+                    await asyncio.sleep(start - now)
+            yield state
+        finally:
+            state["in_flight"] -= 1
+            self._wake(state)
+    
+    def record(self, host, latency=None, error_class=None, status_code=None):
+        """Feed one page outcome into the host's limit"""
+        if not self.enabled:
+            return
+        state = self._state(host)
+        
+        # Server errors are an overload signal, not a healthy latency sample
+        if status_code is not None and status_code >= 500:
+            error_class = "server_error"
+        
+        if error_class in ("throttled", "timeout", "server_error"):
+            self._decrease(state)
+            return
+        if error_class or latency is None:
+            # Network and fatal errors say nothing about the host's capacity
+            return
+        
+        state["latency"] = latency if state["latency"] is None else 0.7 * state["latency"] + 0.3 * latency
+        if state["baseline"] is None:
+            state["baseline"] = state["latency"]
+        else:
+            # The baseline tracks the fastest latency seen but slowly follows a host that got slower for good
+            state["baseline"] = min(state["latency"], state["baseline"] + 0.005 * (state["latency"] - state["baseline"]))
+        
+        if state["latency"] > state["baseline"] * self.latency_factor:
+            self._decrease(state)
+        elif state["limit"] < self.max_limit:
+            # Additive increase of about one slot per window of healthy responses
+            previous = int(state["limit"])
+            state["limit"] = min(self.max_limit, state["limit"] + 1.0 / state["limit"])
+            if int(state["limit"]) > previous:
+                state["increases"] += 1
+                self._wake(state)
+    
+    def _decrease(self, state):
+        # Cut at most once per latency window so a burst of concurrent failures counts as one signal
+        now = time.monotonic()
+        if now - state["last_decrease"] < max(1.0, state["latency"] or 1.0):
+            return
+        state["limit"] = max(self.min_limit, state["limit"] * self.decrease_factor)
+        state["decreases"] += 1
+        state["last_decrease"] = now
+    
+    def limit(self, host):
+        return int(self._state(host)["limit"])
+    
+    def snapshot(self, hosts=None):
+        """Current limits and latency per host"""
+        return {
+            host: {
+                "limit": round(state["limit"], 2),
+                "in_flight": state["in_flight"],
+                "latency": None if state["latency"] is None else round(state["latency"], 3),
+                "increases": state["increases"],
+                "decreases": state["decreases"],
+            }
+            for host, state in self.hosts.items()
+            if hosts is None or host in hosts
+        }
+
+class CrawlProfiles:
+    """Per-domain crawl profiles (wait strategy, timeout, screenshot policy) from profiles.json"""
+    
+    WAIT_STRATEGIES = ("domcontentloaded", "load", "selector", "networkidle")
+    SCREENSHOT_POLICIES = ("full", "viewport", "tiled", "none")
+    
+    def __init__(self, config):
+        self.defaults = {
+            "wait": config.get("WAIT_STRATEGY", "networkidle").lower(),
+            "selector": None,
+            "networkidle_cap": float(config.get("NETWORKIDLE_CAP", 5)),
+            "timeout": float(config.get("REQUEST_TIMEOUT", 30)),
+            "screenshots": "full",
+            "screenshot_max_height": None,
+        }
+        self.defaults.update(getattr(config, "profiles", {}).get("default", {}))
+        self.domains = {
+            domain.lower(): profile
+            for domain, profile in getattr(config, "profiles", {}).items()
+            if domain != "default"
+        }
+        self._resolved = {}
+    
+    def for_url(self, url):
+        """Resolve the profile for a URL's host, falling back to parent domains and defaults"""
+        host = urllib.parse.urlparse(url).hostname or ""
+        profile = self._resolved.get(host)
+        if profile is not None:
+            return profile
+        
+        profile = dict(self.defaults)
+        labels = host.split(".")
+        for i in range(len(labels)):
+            match = self.domains.get(".".join(labels[i:]))
+            if match:
+                profile.update(match)
+                break
+        
+        if profile["wait"] not in self.WAIT_STRATEGIES or (profile["wait"] == "selector" and not profile["selector"]):
+            logger.warning(f"Invalid wait strategy {profile['wait']!r} for {host}; using 'load'")
+            profile["wait"] = "load"
+        if profile["screenshots"] not in self.SCREENSHOT_POLICIES:
+            profile["screenshots"] = "full" if profile["screenshots"] else "none"
+        
+        self._resolved[host] = profile
+        return profile
+
+class UrlScorer:
+    """Default link scorer for the priority frontier; higher scores are crawled first"""
+    
+    WEIGHTS = {"depth": 1.0, "inlinks": 0.5, "sitemap": 2.0, "anchor": 1.0, "query": 0.25}
+    BOILERPLATE_ANCHORS = {
+        "next", "previous", "prev", "more", "read more", "home", "top", "back", "login", "log in", "sign in",
+        "sign up", "register", "privacy", "privacy policy", "terms", "cookies", "contact", "share",
+    }
+    
+    def __init__(self, config, profiles=None):
+        self.profiles = profiles or CrawlProfiles(config)
+        self._rules = {}  # host -> compiled (pattern, weight) rules
+    
+    def _host_rules(self, url):
+        host = urllib.parse.urlparse(url).hostname or ""
+        rules = self._rules.get(host)
+        if rules is None:
+            rules = []
+            for rule in self.profiles.for_url(url).get("url_rules", []):
+                pattern, weight = (rule["pattern"], rule["weight"]) if isinstance(rule, dict) else rule
+                try:
+                    rules.append((re.compile(pattern, re.IGNORECASE), float(weight)))
+                except re.error as e:
+                    logger.warning(f"Invalid url_rules pattern {pattern!r}: {e}")
+            self._rules[host] = rules
+        return rules
+    
+    def _anchor_score(self, text):
+        text = " ".join((text or "").split()).lower()
+        if not text or text.isdigit() or text in self.BOILERPLATE_ANCHORS or len(text) <= 2:
+            return -1.0
+        # Descriptive anchors (a headline, a product name) usually point at content
+        words = len(text.split())
+        return 1.0 if 3 <= words <= 15 else 0.0
+    
+    def __call__(self, candidate):
+        weights = {**self.WEIGHTS, **self.profiles.for_url(candidate["url"]).get("score_weights", {})}
+        url = candidate["url"]
+        score = -weights["depth"] * candidate["depth"]
+        score += weights["inlinks"] * math.log1p(candidate["inlinks"])
+        score += weights["anchor"] * self._anchor_score(candidate["anchor_text"])
+        score -= weights["query"] * len(urllib.parse.parse_qsl(urllib.parse.urlparse(url).query))
+        if candidate["sitemap_priority"] is not None:
+            score += weights["sitemap"] * (candidate["sitemap_priority"] - 0.5)
+        for pattern, weight in self._host_rules(url):
+            if pattern.search(url):
+                score += weight
+        return score
+
+def load_url_scorer(config, profiles=None):
+    """Scorer selected by FRONTIER_ORDER: None for plain BFS, the default UrlScorer, or a "module:callable" plugin"""
+    order = config.get("FRONTIER_ORDER", "bfs")
+    if order.lower() == "bfs":
+        return None
+    if order.lower() == "priority":
+        return UrlScorer(config, profiles)
+    
+    # Plugins are either a scoring function or a factory class taking the configuration
+    module_name, _, attribute = order.partition(":")
+    try:
+        scorer = getattr(importlib.import_module(module_name), attribute or "score")
+    except (ImportError, AttributeError) as e:
+        logger.error(f"Could not load URL scorer {order!r} ({e}); falling back to BFS")
+        return None
+    return scorer(config) if isinstance(scorer, type) else scorer
+
+class StageTimer:
+    """Accumulates wall-clock time per named stage of a page scrape"""
+    
+    def __init__(self):
+        self.durations = {}
+    
+    @contextmanager
+    def stage(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.durations[name] = self.durations.get(name, 0.0) + time.perf_counter() - started
+    
+    def store(self, conn, session_id, page_id, url):
+        """Write one page_timings row per stage"""
+        domain = urllib.parse.urlparse(url).netloc
+        conn.executemany(
+            "INSERT INTO page_timings (session_id, page_id, domain, stage, seconds) VALUES (?, ?, ?, ?, ?)",
+            [(session_id, page_id, domain, name, seconds) for name, seconds in self.durations.items()]
+        )
+
+class StageHistogram:
+    """Fixed-bucket latency histogram (cumulative buckets, in seconds)"""
+    
+    BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+    
+    def __init__(self):
+        self.counts = [0] * (len(self.BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+    
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.BUCKETS, value)] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+    
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-th observation"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.BUCKETS, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+    
+    def to_dict(self):
+        cumulative = list(itertools.accumulate(self.counts))
+        return {
+            "count": self.count,
+            "total": round(self.total, 4),
+            "mean": round(self.total / self.count, 4) if self.count else None,
+            "p50": self.quantile(0.50),
+            "p95": self.quantile(0.95),
+            "max": round(self.max, 4),
+            "buckets": {**{str(bound): n for bound, n in zip(self.BUCKETS, cumulative)}, "+Inf": self.count},
+        }
+
+class Metric:
+    """One named metric family; samples are keyed by label values"""
+    
+    def __init__(self, name, kind, help_text, labels=(), buckets=None):
+        self.name = name
+        self.kind = kind
+        self.help_text = help_text
+        self.labels = tuple(labels)
+        self.buckets = buckets
+        self.samples = {}       # label values -> float or StageHistogram
+        self.collector = None   # callable returning a value or {label values: value}
+        self._lock = threading.Lock()
+    
+    def _key(self, labels):
+        return tuple(str(labels.get(label, "")) for label in self.labels)
+    
+    def inc(self, amount=1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self.samples[key] = self.samples.get(key, 0.0) + amount
+    
+    def dec(self, amount=1.0, **labels):
+        self.inc(-amount, **labels)
+    
+    def set(self, value, **labels):
+        with self._lock:
+            self.samples[self._key(labels)] = float(value)
+    
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            histogram = self.samples.get(key)
+            if histogram is None:
+                histogram = self.samples[key] = StageHistogram()
+            histogram.observe(value)
+    
+    def remove(self, **labels):
+        with self._lock:
+            self.samples.pop(self._key(labels), None)
+    
+    def collect(self):
+        """Current samples as {label values: value}, evaluating the collector if there is one"""
+        if self.collector is None:
+            with self._lock:
+                return dict(self.samples)
+        try:
+            value = self.collector()
+        except Exception as e:
+            logger.debug(f"Metric collector {self.name} failed: {e}")
+            return {}
+        return value if isinstance(value, dict) else {(): value}
+
+class MetricsRegistry:
+    """Process-wide counters, gauges and histograms rendered in the Prometheus text format"""
+    
+    def __init__(self, prefix="elysian"):
+        self.prefix = prefix
+        self.metrics = {}
+        self._lock = threading.Lock()
+    
+    def _register(self, name, kind, help_text, labels=(), buckets=None):
+        name = f"{self.prefix}_{name}"
+        with self._lock:
+            metric = self.metrics.get(name)
+            if metric is None:
+                metric = self.metrics[name] = Metric(name, kind, help_text, labels, buckets)
+                # Unlabelled counters start at zero so rate() has a baseline
+                if kind == "counter" and not metric.labels:
+                    metric.samples[()] = 0.0
+            return metric
+    
+    def counter(self, name, help_text, labels=()):
+        return self._register(name, "counter", help_text, labels)
+    
+    def gauge(self, name, help_text, labels=(), collector=None):
+        """A gauge that is either set directly or computed by a collector at scrape time"""
+        metric = self._register(name, "gauge", help_text, labels)
+        if collector is not None:
+            metric.collector = collector
+        return metric
+    
+    def histogram(self, name, help_text, labels=()):
+        return self._register(name, "histogram", help_text, labels, StageHistogram.BUCKETS)
+    
+    @staticmethod
+    def _format_labels(names, values, extra=()):
+        pairs = list(zip(names, values)) + list(extra)
+        if not pairs:
+            return ""
+        escaped = []
+        for name, value in pairs:
+            value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+            escaped.append(f'{name}="{value}"')
+        return "{" + ",".join(escaped) + "}"
+    
+    @staticmethod
+    def _format_value(value):
+        if math.isnan(value):
+            return "NaN"
+        if math.isinf(value):
+            return "+Inf" if value > 0 else "-Inf"
+        return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+    
+    def render(self):
+        """Prometheus text exposition format (version 0.0.4)"""
+        with self._lock:
+            metrics = sorted(self.metrics.values(), key=lambda metric: metric.name)
+        
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help_text}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for key, value in sorted(metric.collect().items()):
+                if metric.kind == "histogram":
+                    cumulative = 0
+                    for bound, count in zip(metric.buckets, value.counts):
+                        cumulative += count
+                        labels = self._format_labels(metric.labels, key, [("le", bound)])
+                        lines.append(f"{metric.name}_bucket{labels} {cumulative}")
+                    labels = self._format_labels(metric.labels, key, [("le", "+Inf")])
+                    lines.append(f"{metric.name}_bucket{labels} {value.count}")
+                    labels = self._format_labels(metric.labels, key)
+                    lines.append(f"{metric.name}_sum{labels} {self._format_value(value.total)}")
+                    lines.append(f"{metric.name}_count{labels} {value.count}")
+                else:
+                    lines.append(f"{metric.name}{self._format_labels(metric.labels, key)} {self._format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+class MetricsServer:
+    """Serves a MetricsRegistry at /metrics for Prometheus to scrape"""
+    
+    CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+    
+    def __init__(self, registry, host="127.0.0.1", port=9464):
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self.runner = None
+    
+    async def handle_metrics(self, request):
+        body = self.registry.render()
+        return web.Response(body=body.encode(), headers={"Content-Type": self.CONTENT_TYPE})
+    
+    async def start(self):
+        web_app = web.Application()
+        web_app.add_routes([web.get("/metrics", self.handle_metrics)])
+        self.runner = web.AppRunner(web_app, access_log=None)
+        await self.runner.setup()
+        await web.TCPSite(self.runner, self.host, self.port).start()
+        logger.info(f"Metrics available at http://{self.host}:{self.port}/metrics")
+    
+    async def stop(self):
+        if self.runner:
+            await self.runner.cleanup()
+            self.runner = None
+
+class LoopLagMonitor:
+    """Samples event-loop scheduling delay; a watchdog thread captures the loop's stack while it is stalled"""
+    
+    def __init__(self, config, metrics=None):
+        self.enabled = config.get("LOOP_LAG_MONITOR", "true").lower() == "true"
+        self.interval = float(config.get("LOOP_LAG_INTERVAL", 0.1))
+        self.threshold = float(config.get("LOOP_LAG_THRESHOLD", 0.25))
+        self.max_hotspots = int(config.get("LOOP_LAG_MAX_HOTSPOTS", 10))
+        
+        self.metrics = metrics or MetricsRegistry()
+        self.lag_histogram = self.metrics.histogram("event_loop_lag_seconds", "Event loop scheduling delay")
+        self.stalls_counter = self.metrics.counter("event_loop_stalls_total", "Event loop stalls over the lag threshold")
+        
+        self.windows = {}       # key -> lag samples, stalls and hotspots observed while the window is open
+        self.task = None
+        self.watchdog = None
+        self._beat = None       # (sequence, monotonic time) of the sampler's last tick
+        self._captures = {}     # sequence -> stack captured while that tick was overdue
+        self._loop_thread = None
+        self._stop = threading.Event()
+    
+    def start(self):
+        """Start sampling on the running loop (idempotent)"""
+        if not self.enabled or (self.task and not self.task.done()):
+            return
+        self._loop_thread = threading.get_ident()
+        self._stop.clear()
+        self.task = asyncio.create_task(self._sample())
+        self.watchdog = threading.Thread(target=self._watch, name="elysian-loop-watchdog", daemon=True)
+        self.watchdog.start()
+    
+    async def stop(self):
+        self._stop.set()
+        if self.task:
+            self.task.cancel()
+            await asyncio.gather(self.task, return_exceptions=True)
+            self.task = None
+        if self.watchdog:
+            await asyncio.to_thread(self.watchdog.join)
+            self.watchdog = None
+    
+    async def _sample(self):
+        for sequence in itertools.count():
+            self._beat = (sequence, time.monotonic())
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, time.monotonic() - self._beat[1] - self.interval)
+            self._record(lag, self._captures.pop(sequence, None))
+            if self._captures:
+                # Captures for ticks that finished before the watchdog stored them
+                self._captures = {key: stack for key, stack in self._captures.items() if key > sequence}
+    
+    def _watch(self):
+        """Grab the loop thread's stack once per stall, while the blocking call is still on it"""
+        while not self._stop.wait(self.threshold / 2):
+            beat = self._beat
+            if beat is None or beat[0] in self._captures:
+                continue
+            if time.monotonic() - beat[1] - self.interval > self.threshold:
+                frame = sys._current_frames().get(self._loop_thread)
+                if frame is not None:
+                    self._captures[beat[0]] = traceback.extract_stack(frame)
+    
+    @staticmethod
+    def _hotspot(stack):
+        """Innermost frame of our own code (where the blocking call was made) and the innermost frame overall"""
+        ours = [frame for frame in stack if frame.filename == __file__]
+        site = ours[-1] if ours else stack[-1]
+        call = stack[-1]
+        return (
+            f"{os.path.basename(site.filename)}:{site.lineno} in {site.name}",
+            f"{os.path.basename(call.filename)}:{call.lineno} in {call.name}",
+            [f"{os.path.basename(frame.filename)}:{frame.lineno} in {frame.name}: {frame.line}" for frame in stack[-8:]],
+        )
+    
+    def _record(self, lag, stack):
+        self.lag_histogram.observe(lag)
+        stalled = lag > self.threshold
+        hotspot = None
+        if stalled:
+            self.stalls_counter.inc()
+            if stack:
+                hotspot = self._hotspot(stack)
+                logger.warning(f"Event loop blocked for {lag:.3f}s at {hotspot[0]} ({hotspot[1]})")
+        
+        for window in self.windows.values():
+            window["lags"].append(lag)
+            if not stalled:
+                continue
+            window["stalls"] += 1
+            window["stalled_seconds"] += lag
+            if hotspot:
+                location, call, frames = hotspot
+                entry = window["hotspots"].setdefault(location, {
+                    "location": location, "call": call, "count": 0, "total_lag": 0.0, "max_lag": 0.0, "stack": frames
+                })
+                entry["count"] += 1
+                entry["total_lag"] += lag
+                if lag > entry["max_lag"]:
+                    entry.update(max_lag=lag, call=call, stack=frames)
+    
+    def begin(self, key):
+        """Open a window (e.g. one crawl session) that collects lag samples until end()"""
+        self.windows[key] = {
+            "lags": collections.deque(maxlen=100000), "stalls": 0, "stalled_seconds": 0.0, "hotspots": {}
+        }
+    
+    def end(self, key):
+        """Close a window and summarize it; None if it was not open"""
+        window = self.windows.pop(key, None)
+        if window is None:
+            return None
+        
+        lags = sorted(window["lags"])
+        
+        def percentile(q):
+            return round(lags[min(len(lags) - 1, int(q * len(lags)))], 4) if lags else None
+        
+        hotspots = sorted(window["hotspots"].values(), key=lambda entry: entry["total_lag"], reverse=True)
+        return {
+            "samples": len(lags),
+            "interval": self.interval,
+            "threshold": self.threshold,
+            "p50": percentile(0.50),
+            "p95": percentile(0.95),
+            "p99": percentile(0.99),
+            "max": round(lags[-1], 4) if lags else None,
+            "stalls": window["stalls"],
+            "stalled_seconds": round(window["stalled_seconds"], 3),
+            "hotspots": [
+                {**entry, "total_lag": round(entry["total_lag"], 3), "max_lag": round(entry["max_lag"], 3)}
+                for entry in hotspots[:self.max_hotspots]
+            ],
+        }
+
+def _process_table():
+    """Map of pid -> (parent pid, current RSS in bytes) for every visible process, or None if unavailable"""
+    table = {}
+    if os.path.isdir("/proc"):
+        page_size = os.sysconf("SC_PAGE_SIZE")
+        for entry in os.listdir("/proc"):
+            if not entry.isdigit():
+                continue
+            try:
+                with open(f"/proc/{entry}/stat", 'r') as f:
+                    # The command name may contain spaces; fields resume after its closing paren
+                    ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+                with open(f"/proc/{entry}/statm", 'r') as f:
+                    table[int(entry)] = (ppid, int(f.read().split()[1]) * page_size)
+            except (OSError, IndexError, ValueError):
+                continue
+        return table
+    
+    # No procfs (macOS, BSD): ps reports current RSS in KB, unlike ru_maxrss which only ever grows
+    try:
+        output = subprocess.run(["ps", "-A", "-o", "pid=,ppid=,rss="], capture_output=True, text=True, timeout=10).stdout
+    except (OSError, subprocess.SubprocessError):
+        return None
+    for line in output.splitlines():
+        try:
+            pid, ppid, rss = (int(field) for field in line.split())
+        except ValueError:
+            continue
+        table[pid] = (ppid, rss * 1024)
+    return table or None
+
+def process_tree_rss(pid=None, exclude=()):
+    """Current resident set size in bytes of a process and its descendants (skipping excluded subtrees), or None"""
+    pid = pid or os.getpid()
+    table = _process_table()
+    if table is None:
+        return None
+    
+    children = collections.defaultdict(list)
+    for child, (ppid, _) in table.items():
+        children[ppid].append(child)
+    
+    total = 0
+    stack = [pid]
+    while stack:
+        current = stack.pop()
+        if current in exclude:
+            continue
+        stack.extend(children.get(current, ()))
+        total += table.get(current, (None, 0))[1]
+    return total
+
+class MemoryGuard:
+    """Optional tracemalloc snapshots every N pages and soft/hard RSS budgets for long crawls"""
+    
+    LEVELS = ("ok", "soft", "hard")
+    
+    def __init__(self, config, metrics=None):
+        self.profile = config.get("MEMORY_PROFILE", "false").lower() == "true"
+        self.snapshot_every = int(config.get("MEMORY_SNAPSHOT_EVERY", 500))
+        self.top_allocators = int(config.get("MEMORY_TOP_ALLOCATORS", 15))
+        self.trace_frames = int(config.get("MEMORY_TRACE_FRAMES", 1))
+        self.soft_limit = float(config.get("MEMORY_SOFT_LIMIT_MB", 0)) * 1024 * 1024
+        self.hard_limit = float(config.get("MEMORY_HARD_LIMIT_MB", 0)) * 1024 * 1024
+        self.check_interval = float(config.get("MEMORY_CHECK_INTERVAL", 5))
+        
+        self.rss = 0
+        self._checked_at = None
+        self._pages = 0
+        self._previous = None
+        
+        self.metrics = metrics or MetricsRegistry()
+        self.metrics.gauge("memory_rss_bytes", "Last measured RSS of the crawler and its browser", collector=lambda: self.rss)
+        self.limit_hits = self.metrics.counter("memory_limit_hits_total", "Memory budget crossings by level", ["level"])
+    
+    @property
+    def enabled(self):
+        return self.profile or bool(self.soft_limit or self.hard_limit)
+    
+    def start(self):
+        if self.profile and not tracemalloc.is_tracing():
+            tracemalloc.start(self.trace_frames)
+    
+    def stop(self):
+        if self.profile and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self._previous = None
+    
+    async def check(self, force=False):
+        """Budget level ("ok", "soft" or "hard") of the process tree, re-measured at most every check_interval"""
+        if not self.enabled:
+            return "ok"
+        
+        now = time.monotonic()
+        if force or self._checked_at is None or now - self._checked_at >= self.check_interval:
+            rss = await asyncio.to_thread(process_tree_rss)
+            if rss is None:
+                if self.soft_limit or self.hard_limit:
+                    logger.warning("Current RSS is not measurable on this system; memory budgets are disabled")
+                    self.soft_limit = self.hard_limit = 0
+                return "ok"
+            self.rss = rss
+            self._checked_at = now
+        
+        if self.hard_limit and self.rss >= self.hard_limit:
+            return "hard"
+        if self.soft_limit and self.rss >= self.soft_limit:
+            return "soft"
+        return "ok"
+    
+    async def relieve(self, browser_tools):
+        """Give memory back: collect garbage and recycle browser contexts"""
+        collected = gc.collect()
+        recycled = await browser_tools.recycle_contexts()
+        logger.info(f"Memory relief: collected {collected} objects, recycled {recycled} browser contexts")
+    
+    def page_done(self):
+        """Count a finished page; True when a tracemalloc snapshot is due"""
+        self._pages += 1
+        return self.profile and self.snapshot_every > 0 and self._pages % self.snapshot_every == 0
+    
+    async def snapshot(self):
+        """Top allocators by line, as growth since the previous snapshot when there is one"""
+        if not tracemalloc.is_tracing():
+            return None
+        
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap*"),
+        ))
+        previous, self._previous = self._previous, snapshot
+        
+        def top():
+            if previous is None:
+                statistics = snapshot.statistics("lineno")
+            else:
+                statistics = snapshot.compare_to(previous, "lineno")
+            return [
+                {
+                    "location": f"{os.path.basename(stat.traceback[0].filename)}:{stat.traceback[0].lineno}",
+                    "size_kb": round(stat.size / 1024, 1),
+                    "size_diff_kb": round(getattr(stat, "size_diff", stat.size) / 1024, 1),
+                    "count": stat.count,
+                }
+                for stat in statistics[:self.top_allocators]
+            ]
+        
+        current, peak = tracemalloc.get_traced_memory()
+        rss = await asyncio.to_thread(process_tree_rss)
+        return {
+            "pages": self._pages,
+            "rss_mb": None if rss is None else round(rss / (1024 * 1024), 1),
+            "traced_mb": round(current / (1024 * 1024), 1),
+            "traced_peak_mb": round(peak / (1024 * 1024), 1),
+            "top": await asyncio.to_thread(top),
+        }
+
+class ScreenshotPipeline:
+    """Screenshot capture with format/scale options, perceptual-hash dedup and off-loop encoding"""
+    
+    FORMATS = {"png": "png", "jpeg": "jpg", "webp": "webp"}
+    
+    def __init__(self, config, browser_tools):
+        self.browser_tools = browser_tools
+        self.directory = os.path.join(config.data_dir, "exports/screenshots")
+        self.format = config.get("SCREENSHOT_FORMAT", "jpeg").lower()
+        if self.format not in self.FORMATS:
+            logger.warning(f"Unsupported screenshot format {self.format!r}; using png")
+            self.format = "png"
+        self.quality = int(config.get("SCREENSHOT_QUALITY", 80))
+        self.scale = float(config.get("SCREENSHOT_SCALE", 1.0))
+        self.max_height = int(config.get("SCREENSHOT_MAX_HEIGHT", 10000))
+        self.dedup_distance = int(config.get("SCREENSHOT_DEDUP_DISTANCE", 4))
+        self.tile_max_height = int(config.get("SCREENSHOT_TILE_MAX_HEIGHT", 50000))
+        self.indexes = {}
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def dhash(image):
+        """64-bit difference hash of an image"""
+        pixels = np.asarray(image.convert("L").resize((9, 8), Image.BILINEAR), dtype=np.int16)
+        bits = (pixels[:, 1:] > pixels[:, :-1]).ravel()
+        return int.from_bytes(np.packbits(bits).tobytes(), "big")
+    
+    async def capture(self, page, url, session_id, scope="full", max_height=None):
+        """Capture, dedup, encode and write a page screenshot; returns (path, info)"""
+        if scope == "tiled":
+            return await self._capture_tiled(page, url, max_height)
+        
+        # Capture at device pixels only when asked to scale up; everything else is resized from CSS pixels
+        device = self.scale > 1.0
+        capture_scale = self.browser_tools.device_scale_factor if device else 1.0
+        resize = self.scale / capture_scale
+        
+        # Let Chromium encode JPEG directly when no resize is needed
+        native = self.format == "jpeg" and abs(resize - 1.0) < 0.01
+        data = await self.browser_tools.capture_screenshot(
+            page,
+            scope=scope,
+            max_height=self.max_height if max_height is None else max_height,
+            image_type="jpeg" if native else "png",
+            quality=self.quality if native else None,
+            scale="device" if device else "css",
+        )
+        return await asyncio.to_thread(self._process, data, url, session_id, resize, native)
+    
+    async def _capture_tiled(self, page, url, max_height=None):
+        """Stream a tall page to disk as tiles; the returned path is the tile manifest"""
+        domain = urllib.parse.urlparse(url).netloc
+        directory = os.path.join(self.directory, "tiles", f"{domain}_{hashlib.md5(url.encode()).hexdigest()[:10]}")
+        native = self.format in ("png", "jpeg")
+        
+        def write_tile(data, path):
+            if native:
+                return BrowserTools._write_file(data, path)
+            with Image.open(io.BytesIO(data)) as image:
+                image.convert("RGB").save(path, self.format.upper(), quality=self.quality)
+            return os.path.getsize(path)
+        
+        manifest_path, written = await self.browser_tools.capture_tiles(
+            page,
+            directory,
+            max_height=max_height or self.tile_max_height,
+            image_type=self.format if native else "png",
+            quality=self.quality if self.format == "jpeg" else None,
+            extension=self.FORMATS[self.format],
+            write_tile=write_tile,
+        )
+        return manifest_path, {"deduplicated": False, "bytes": written}
+    
+    def _process(self, data, url, session_id, resize, native):
+        image = Image.open(io.BytesIO(data))
+        if native:
+            # A reduced JPEG decode is plenty for hashing
+            image.draft("L", (image.width // 8, image.height // 8))
+        
+        domain = urllib.parse.urlparse(url).netloc
+        filename = f"{domain}_{hashlib.md5(url.encode()).hexdigest()[:10]}.{self.FORMATS[self.format]}"
+        path = os.path.join(self.directory, filename)
+        
+        if self.dedup_distance >= 0:
+            fingerprint = self.dhash(image)
+            with self._lock:
+                index = self.indexes.setdefault(session_id, SimHashIndex(self.dedup_distance))
+                match = index.query(fingerprint)
+                if match:
+                    return match[0], {"deduplicated": True, "bytes": 0}
+                # Claim the fingerprint before writing so concurrent captures of the same template dedup
+                index.add(fingerprint, path)
+        
+        os.makedirs(self.directory, exist_ok=True)
+        
+        if native:
+            encoded = data
+        else:
+            image = Image.open(io.BytesIO(data))
+            if abs(resize - 1.0) >= 0.01:
+                image = image.resize((max(1, round(image.width * resize)), max(1, round(image.height * resize))), Image.LANCZOS)
+            buffer = io.BytesIO()
+            if self.format == "png":
+                image.save(buffer, "PNG")
+            else:
+                image.convert("RGB").save(buffer, self.format.upper(), quality=self.quality)
+            encoded = buffer.getvalue()
+        
+        with open(path, "wb") as f:
+            f.write(encoded)
+        return path, {"deduplicated": False, "bytes": len(encoded)}
+    
+    def discard(self, session_id):
+        """Drop a finished session's dedup index"""
+        with self._lock:
+            self.indexes.pop(session_id, None)
+
+class CrawlFrontier:
+    """URL frontier with an in-memory hot heap and a cold SQLite segment on disk"""
+    
+    # Entries are ordered by (priority, seq); with equal priorities that is FIFO, i.e. BFS. When the hot
+    # heap outgrows twice its size everything past the best hot_size entries is spilled in one batch,
+    # and the best cold entries are paged back in whenever they would be next. Every URL ever queued is
+    # recorded in a seen table on disk, so a URL is queued once and only re-queued at a better priority.
+    
+    def __init__(self, path, hot_size=50000, batch_size=5000):
+        self.path = path
+        self.hot_size = hot_size
+        self.batch_size = batch_size
+        self.hot = []           # heap of (priority, seq, url, depth), possibly holding superseded entries
+        self.hot_seq = {}       # url -> seq of its live hot entry
+        self.duplicates = 0
+        self.seq = itertools.count()
+        self.cold_count = 0
+        self.cold_best = None   # (priority, seq) of the best cold entry
+        self.spilled = 0
+        self.loaded = 0
+        self.conn = None
+    
+    def __len__(self):
+        return len(self.hot_seq) + self.cold_count
+    
+    def _connect(self):
+        if self.conn is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self.conn = sqlite3.connect(self.path, check_same_thread=False)
+            self.conn.execute("PRAGMA journal_mode=OFF")
+            self.conn.execute("PRAGMA synchronous=OFF")
+            self.conn.execute("DROP TABLE IF EXISTS frontier")
+            self.conn.execute(
+                "CREATE TABLE frontier (seq INTEGER PRIMARY KEY, priority REAL NOT NULL, url TEXT NOT NULL UNIQUE, depth INTEGER NOT NULL)"
+            )
+            self.conn.execute("CREATE INDEX idx_frontier_order ON frontier (priority, seq)")
+            self.conn.execute("DROP TABLE IF EXISTS seen")
+            self.conn.execute("CREATE TABLE seen (url TEXT PRIMARY KEY, priority REAL NOT NULL) WITHOUT ROWID")
+            self.conn.execute("DROP TABLE IF EXISTS inlinks")
+            self.conn.execute("CREATE TABLE inlinks (url TEXT PRIMARY KEY, count INTEGER NOT NULL) WITHOUT ROWID")
+        return self.conn
+    
+    async def count_inlinks(self, urls):
+        """Record one more in-link for each URL and return the running totals (kept on disk, not in RAM)"""
+        return await asyncio.to_thread(self._count_inlinks, urls)
+    
+    def _count_inlinks(self, urls):
+        conn = self._connect()
+        counts = {}
+        with conn:
+            conn.executemany(
+                "INSERT INTO inlinks (url, count) VALUES (?, 1) ON CONFLICT (url) DO UPDATE SET count = count + 1",
+                [(url,) for url in urls]
+            )
+            unique = list(dict.fromkeys(urls))
+            for i in range(0, len(unique), 500):
+                chunk = unique[i:i + 500]
+                counts.update(conn.execute(
+                    f"SELECT url, count FROM inlinks WHERE url IN ({', '.join('?' * len(chunk))})", chunk
+                ))
+        return [counts.get(url, 0) for url in urls]
+    
+    async def push_many(self, items):
+        """Queue (url, depth, priority) entries; lower priority values are crawled first"""
+        # Keep the best sighting of each URL in the batch, at the position of its first one
+        best = {}
+        for url, depth, priority in items:
+            if url not in best or priority < best[url][1]:
+                best[url] = (depth, priority)
+        self.duplicates += len(items) - len(best)
+        if not best:
+            return 0
+        
+        new, improved = await asyncio.to_thread(self._record_seen, best)
+        # An improved URL that is neither cold nor hot any more was already popped and stays crawled once
+        improved = [(url, depth, priority) for url, depth, priority, was_cold in improved if was_cold or url in self.hot_seq]
+        queued = new + improved
+        self.duplicates += len(best) - len(queued)
+        for url, depth, priority in queued:
+            seq = next(self.seq)
+            heapq.heappush(self.hot, (priority, seq, url, depth))
+            self.hot_seq[url] = seq
+        
+        if len(self.hot) > 2 * self.hot_size:
+            await asyncio.to_thread(self._spill)
+        return len(queued)
+    
+    def _record_seen(self, best):
+        """Record URLs in the seen table; returns new (url, depth, priority) and improved (..., was_cold) entries"""
+        conn = self._connect()
+        urls = list(best)
+        known = {}
+        for i in range(0, len(urls), 500):
+            chunk = urls[i:i + 500]
+            known.update(conn.execute(
+                f"SELECT url, priority FROM seen WHERE url IN ({', '.join('?' * len(chunk))})", chunk
+            ))
+        
+        new, improved = [], []
+        with conn:
+            for url, (depth, priority) in best.items():
+                if url not in known:
+                    new.append((url, depth, priority))
+                elif priority < known[url]:
+                    # A better sighting replaces the queued entry; a cold one is dropped and re-queued hot
+                    deleted = conn.execute("DELETE FROM frontier WHERE url = ?", (url,)).rowcount
+                    self.cold_count -= deleted
+                    improved.append((url, depth, priority, deleted > 0))
+            conn.executemany("INSERT INTO seen (url, priority) VALUES (?, ?)", [(url, priority) for url, _, priority in new])
+            conn.executemany("UPDATE seen SET priority = ? WHERE url = ?", [(priority, url) for url, _, priority, _ in improved])
+        return new, improved
+    
+    async def shrink(self, keep):
+        """Spill all but the best keep hot entries to disk (used under memory pressure)"""
+        if len(self.hot) > keep:
+            await asyncio.to_thread(self._spill, keep)
+    
+    def _spill(self, keep=None):
+        """Move everything but the best keep (default hot_size) entries to the cold segment"""
+        keep = self.hot_size if keep is None else keep
+        # Superseded entries are dropped rather than spilled
+        live = sorted(entry for entry in self.hot if self.hot_seq.get(entry[2]) == entry[1])
+        spill = live[keep:]
+        self.hot = live[:keep]  # a sorted list is a valid heap
+        for _, _, url, _ in spill:
+            del self.hot_seq[url]
+        if not spill:
+            return
+        
+        conn = self._connect()
+        with conn:
+            conn.executemany("INSERT INTO frontier (seq, priority, url, depth) VALUES (?, ?, ?, ?)",
+                             [(seq, priority, url, depth) for priority, seq, url, depth in spill])
+        self.cold_count += len(spill)
+        self.spilled += len(spill)
+        best = spill[0][:2]
+        if self.cold_best is None or best < self.cold_best:
+            self.cold_best = best
+    
+    def _load(self):
+        """Page the best batch of cold entries back into the hot heap"""
+        conn = self._connect()
+        with conn:
+            rows = conn.execute(
+                "SELECT priority, seq, url, depth FROM frontier ORDER BY priority, seq LIMIT ?", (self.batch_size,)
+            ).fetchall()
+            conn.executemany("DELETE FROM frontier WHERE seq = ?", [(row[1],) for row in rows])
+            following = conn.execute("SELECT priority, seq FROM frontier ORDER BY priority, seq LIMIT 1").fetchone()
+        
+        for row in rows:
+            heapq.heappush(self.hot, tuple(row))
+            self.hot_seq[row[2]] = row[1]
+        self.cold_count -= len(rows)
+        self.loaded += len(rows)
+        self.cold_best = tuple(following) if following else None
+    
+    async def pop(self):
+        """Best (url, depth) in the frontier, or None when it is empty"""
+        while True:
+            if self.cold_best is not None and (not self.hot or self.cold_best < self.hot[0][:2]):
+                await asyncio.to_thread(self._load)
+            if not self.hot:
+                return None
+            _, seq, url, depth = heapq.heappop(self.hot)
+            if self.hot_seq.get(url) == seq:
+                del self.hot_seq[url]
+                return url, depth
+    
+    def stats(self):
+        return {
+            "queued": len(self), "cold": self.cold_count, "spilled": self.spilled, "loaded": self.loaded,
+            "duplicates": self.duplicates,
+        }
+    
+    def close(self):
+        """Drop the cold segment"""
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+        for suffix in ("", "-journal"):
+            try:
+                os.remove(self.path + suffix)
+            except FileNotFoundError:
+                pass
+
+class Scraper:
+    """Main scraper class with advanced features"""
+    
+    def __init__(self, config, proxy_manager=None, browser_tools=None, metrics=None):
+        self.config = config
+        self.proxy_manager = proxy_manager
+        self.metrics = metrics or MetricsRegistry()
+        self.browser_tools = browser_tools or BrowserTools(config, proxy_manager, self.metrics)
         self.max_retries = int(config.get("MAX_RETRIES", 3))
+        self.retry_base_delay = float(config.get("RETRY_BASE_DELAY", 2))
+        self.retry_max_delay = float(config.get("RETRY_MAX_DELAY", 60))
         self.request_timeout = int(config.get("REQUEST_TIMEOUT", 30))
         self.crawl_delay = float(config.get("DEFAULT_CRAWL_DELAY", 2))
         self.db_path = config.get("SCRAPE_DB_PATH", os.path.join(config.data_dir, "scraped/scrapedata.db"))
         
+        # Frontier: hot entries in memory, the overflow spilled to per-session files on disk
+        self.frontier_dir = config.get("FRONTIER_DIR", os.path.join(config.data_dir, "frontier"))
+        self.frontier_hot_size = int(config.get("FRONTIER_HOT_SIZE", 50000))
+        self.frontier_batch_size = int(config.get("FRONTIER_BATCH_SIZE", 5000))
+        
+        # Optional priority order: links are scored (depth, anchor text, URL rules, in-links, sitemap priority)
+        # so page and time budgets go to the most valuable pages first
+        self.time_budget = float(config.get("CRAWL_TIME_BUDGET", 0))
+        self.use_sitemaps = config.get("FRONTIER_SITEMAP", "true").lower() == "true"
+        self.sitemap_max_files = int(config.get("FRONTIER_SITEMAP_MAX_FILES", 10))
+        
+        # Near-duplicate detection (flag, skip or off)
+        self.near_duplicate_mode = config.get("NEAR_DUPLICATE_MODE", "flag").lower()
+        self.near_duplicate_distance = int(config.get("NEAR_DUPLICATE_DISTANCE", 3))
+        self.near_duplicate_min_tokens = int(config.get("NEAR_DUPLICATE_MIN_TOKENS", 20))
+        self.near_duplicate_indexes = {}
+        
+        # Text extraction: "offline" parses stored HTML in a process pool, "browser" uses innerText
+        self.text_extraction = config.get("TEXT_EXTRACTION", "offline").lower()
+        self.content_extractor = ContentExtractor(config)
+        
+        # Optional semaphore shared by concurrent sessions to bound pages in flight
+        self.page_slots = None
+        
+        # Adaptive per-host concurrency shared by all sessions
+        self.host_limits = HostConcurrencyController(config)
+        
+        # Per-domain wait strategies; a sample of pages also waits for full network idle to measure the savings
+        self.profiles = CrawlProfiles(config)
+        self.url_scorer = load_url_scorer(config, self.profiles)
+        self.wait_baseline_sample_rate = float(config.get("WAIT_BASELINE_SAMPLE_RATE", 0.05))
+        self.wait_baseline_max_wait = float(config.get("WAIT_BASELINE_MAX_WAIT", 10))
+        
+        # Screenshot encoding and dedup
+        self.screenshots = ScreenshotPipeline(config, self.browser_tools)
+        
+        # Single writer thread that owns all crawl-time SQLite writes
+        self.db_writer = DatabaseWriter(self.db_path)
+        
+        # Live crawl metrics; gauges read the frontiers of running sessions at scrape time
+        self.active_sessions = {}  # session_id -> {"frontier", "retries", "in_flight"}
+        self.recent_pages = collections.deque(maxlen=10000)  # completion times for pages/s
+        self.pages_counter = self.metrics.counter("pages_total", "Pages finished by outcome", ["outcome"])
+        self.errors_counter = self.metrics.counter("page_errors_total", "Page attempts that failed by error class", ["error_class"])
+        self.retries_counter = self.metrics.counter("page_retries_total", "Failed pages scheduled for a retry")
+        self.page_duration = self.metrics.histogram("page_duration_seconds", "Time to scrape one page")
+        self.metrics.gauge("pages_per_second", "Pages scraped per second over the last minute", collector=self._pages_per_second)
+        self.metrics.gauge("frontier_urls", "URLs queued or awaiting retry across running sessions", collector=lambda: sum(
+            len(session["frontier"]) + len(session["retries"]) for session in self.active_sessions.values()
+        ))
+        self.metrics.gauge("pages_in_flight", "Pages being scraped across running sessions", collector=lambda: sum(
+            len(session["in_flight"]) for session in self.active_sessions.values()
+        ))
+        self.metrics.gauge("sessions_running", "Scrape sessions in progress", collector=lambda: len(self.active_sessions))
+        self.metrics.gauge("db_writer_queue", "Writes waiting for the database writer thread", collector=self.db_writer.pending)
+        
+        # Event-loop lag sampling with stack capture of blocking calls, summarized per session
+        self.loop_monitor = LoopLagMonitor(config, self.metrics)
+        
+        # Memory budgets and optional allocation profiling
+        self.memory_guard = MemoryGuard(config, self.metrics)
+        
         # Initialize database
         self._init_database()
     
@@ -1534,6 +4706,8 @@ class Scraper:
             content_type TEXT,
             timestamp TEXT NOT NULL,
             screenshot_path TEXT,
+            simhash TEXT,
+            near_duplicate_of INTEGER,
             FOREIGN KEY (session_id) REFERENCES scrape_sessions (id)
         )
         ''')
@@ -1572,199 +4746,738 @@ class Scraper:
             FOREIGN KEY (page_id) REFERENCES pages (id)
         )
         ''')
+
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS page_metrics (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            session_id INTEGER NOT NULL,
+            page_id INTEGER,
+            url TEXT NOT NULL,
+            in_degree INTEGER NOT NULL DEFAULT 0,
+            out_degree INTEGER NOT NULL DEFAULT 0,
+            pagerank REAL NOT NULL DEFAULT 0,
+            click_depth INTEGER,
+            is_orphan BOOLEAN NOT NULL DEFAULT 0,
+            component_id INTEGER,
+            computed_at TEXT NOT NULL,
+            FOREIGN KEY (session_id) REFERENCES scrape_sessions (id),
+            FOREIGN KEY (page_id) REFERENCES pages (id)
+        )
+        ''')
+
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS page_failures (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            session_id INTEGER NOT NULL,
+            url TEXT NOT NULL,
+            attempt INTEGER NOT NULL,
+            error_class TEXT NOT NULL,
+            status_code INTEGER,
+            error TEXT,
+            final BOOLEAN NOT NULL DEFAULT 0,
+            timestamp TEXT NOT NULL,
+            FOREIGN KEY (session_id) REFERENCES scrape_sessions (id)
+        )
+        ''')
+
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            type TEXT NOT NULL,
+            params TEXT NOT NULL,
+            priority INTEGER NOT NULL DEFAULT 0,
+            status TEXT NOT NULL DEFAULT 'queued',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            max_attempts INTEGER NOT NULL DEFAULT 3,
+            available_at REAL NOT NULL,
+            lease_owner TEXT,
+            lease_expires_at REAL,
+            created_at REAL NOT NULL,
+            started_at REAL,
+            finished_at REAL,
+            result TEXT,
+            error TEXT
+        )
+        ''')
+
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS page_timings (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            session_id INTEGER NOT NULL,
+            page_id INTEGER NOT NULL,
+            domain TEXT NOT NULL,
+            stage TEXT NOT NULL,
+            seconds REAL NOT NULL,
+            FOREIGN KEY (session_id) REFERENCES scrape_sessions (id),
+            FOREIGN KEY (page_id) REFERENCES pages (id)
+        )
+        ''')
+
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS watched_urls (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            url TEXT NOT NULL UNIQUE,
+            label TEXT,
+            interval_seconds REAL NOT NULL,
+            next_due REAL NOT NULL,
+            last_checked REAL,
+            last_session_id INTEGER,
+            last_content_hash TEXT,
+            created_at REAL NOT NULL
+        )
+        ''')
+        
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS change_events (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            url TEXT NOT NULL,
+            session_id INTEGER NOT NULL,
+            previous_session_id INTEGER,
+            change_type TEXT NOT NULL,
+            old_hash TEXT,
+            new_hash TEXT,
+            detected_at TEXT NOT NULL,
+            FOREIGN KEY (session_id) REFERENCES scrape_sessions (id)
+        )
+        ''')
+
+        # Upgrade tables created by earlier versions
+        self._ensure_columns(cursor, "scrape_sessions", {
+            "stats": "TEXT",
+        })
+        self._ensure_columns(cursor, "pages", {
+            "simhash": "TEXT",
+            "near_duplicate_of": "INTEGER",
+        })
+
+        # Indexes for per-session graph loads
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_pages_session ON pages (session_id)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_links_source ON links (source_page_id)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_page_metrics_session ON page_metrics (session_id, pagerank)")
+        
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_page_failures_session ON page_failures (session_id, url)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_page_timings_session ON page_timings (session_id, domain)")
         
+        # Covering index for session diffs and monitor checks (set operations on url/content_hash)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_pages_session_url_hash ON pages (session_id, url, content_hash)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_watched_urls_due ON watched_urls (next_due)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_change_events_url ON change_events (url, id)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_change_events_session ON change_events (session_id)")
+        
+        # Indexes for job claims and lease expiry scans
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_jobs_claim ON jobs (status, priority DESC, available_at, id)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_jobs_lease ON jobs (status, lease_expires_at)")
+
         conn.commit()
         conn.close()
+
+    def _pages_per_second(self, window=60.0):
+        cutoff = time.monotonic() - window
+        return sum(1 for finished in reversed(self.recent_pages) if finished >= cutoff) / window
+    
+    def _ensure_columns(self, cursor, table, columns):
+        """Add columns that are missing from a table created by an older version"""
+        existing = {row[1] for row in cursor.execute(f"PRAGMA table_info({table})")}
+        for name, definition in columns.items():
+            if name not in existing:
+                cursor.execute(f"ALTER TABLE {table} ADD COLUMN {name} {definition}")
     
-    async def scrape_url(self, url, depth=1, max_pages=10, take_screenshots=True, extract_pdf=True):
+    @asynccontextmanager
+    async def _page_slot(self, limits=()):
+        """Hold one slot of each caller limit and of the shared page budget while a page is being scraped"""
+        # Narrowest limits first, so a session waiting on its own cap doesn't hold a slot others could use
+        async with AsyncExitStack() as stack:
+            for limit in (*limits, self.page_slots):
+                if limit is not None:
+                    await stack.enter_async_context(limit)
+            yield
+    
+    async def scrape_url(self, url, depth=1, max_pages=10, take_screenshots=True, extract_pdf=True, on_progress=None,
+                         seeds=None, page_limits=()):
         """Scrape a URL with the specified depth"""
         logger.info(f"Starting scrape of {url} with depth {depth}")
+        emit = on_progress or (lambda event: None)
         
         # Create a new session in the database
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute(
+        session_id = await self.db_writer.run(lambda conn: conn.execute(
             "INSERT INTO scrape_sessions (url, timestamp, status) VALUES (?, ?, ?)",
             (url, datetime.now().isoformat(), "in_progress")
-        )
-        session_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
+        ).lastrowid)
+        
+        emit({"event": "session_started", "session_id": session_id, "url": url})
+        self.loop_monitor.start()
+        self.loop_monitor.begin(session_id)
+        self.memory_guard.start()
         
         try:
             # Initialize browser if needed
             if not self.browser_tools.browser:
                 await self.browser_tools.initialize()
             
-            # Crawl with BFS
-            visited_urls = set()
-            to_visit = [(url, 0)]  # (url, current_depth)
+            # Crawl BFS-ordered with pages in flight under per-host adaptive limits;
+            # failed pages wait in a delayed retry heap without blocking the frontier. The frontier
+            # yields each URL once, so no visited set has to be kept in memory
+            frontier = CrawlFrontier(
+                os.path.join(self.frontier_dir, f"session_{session_id}.db"),
+                self.frontier_hot_size, self.frontier_batch_size,
+            )
+            await frontier.push_many([(seed, 0, 0.0) for seed in seeds or [url]])
+            sitemap_priorities = {}
+            if self.url_scorer is not None and self.use_sitemaps:
+                sitemap_priorities = await self._sitemap_priorities(url)
+            deadline = time.monotonic() + self.time_budget if self.time_budget > 0 else None
+            retries = []  # (ready_at, seq, url, current_depth, attempt)
+            retry_seq = itertools.count()
+            in_flight = {}  # task -> (url, current_depth, attempt)
+            hosts = set()
             pages_scraped = 0
+            near_duplicates = 0
+            stats = {
+                "retries": 0,
+                "failed": 0,
+                "errors": {},
+                "wait_strategies": {},
+                "screenshots": {"stored": 0, "deduplicated": 0, "bytes": 0},
+                "http_cache": {"hits": 0, "revalidated": 0, "misses": 0, "bytes_saved": 0},
+            }
+            stage_histograms = collections.defaultdict(StageHistogram)
+            stats["memory"] = {"peak_rss_mb": None, "soft_limit_hits": 0, "hard_limit_hits": 0, "stopped": False, "snapshots": []}
+            memory_level = "ok"
+            self.active_sessions[session_id] = {"frontier": frontier, "retries": retries, "in_flight": in_flight}
+            
+            async def next_item():
+                if retries and retries[0][0] <= time.monotonic():
+                    _, _, item_url, item_depth, attempt = heapq.heappop(retries)
+                    return item_url, item_depth, attempt
+                item = await frontier.pop()
+                if item is None:
+                    return None
+                item_url, item_depth = item
+                return item_url, item_depth, 1
+            
+            async def fetch(page_url):
+                host = urllib.parse.urlparse(page_url).netloc
+                async with self.host_limits.slot(host):
+                    try:
+                        async with self._page_slot(page_limits):
+                            started = time.monotonic()
+                            page_data = await self._scrape_page(page_url, session_id, take_screenshots) or {}
+                            page_data["duration"] = time.monotonic() - started
+                    except Exception as e:
+                        self.host_limits.record(host, error_class=classify_scrape_error(e))
+                        raise
+                    self.host_limits.record(
+                        host, latency=page_data.get("navigation_time"), status_code=page_data.get("status_code")
+                    )
+                    
+                    # Without adaptive limits keep one page per host and the fixed politeness delay
+                    if not self.host_limits.enabled:
+                        await asyncio.sleep(self.crawl_delay)
+                return page_data
             
-            while to_visit and pages_scraped < max_pages:
-                current_url, current_depth = to_visit.pop(0)
+            async def record_failure(page_url, current_depth, attempt, e):
+                error_class = classify_scrape_error(e)
+                stats["errors"][error_class] = stats["errors"].get(error_class, 0) + 1
+                self.errors_counter.inc(error_class=error_class)
+                delay = self._retry_delay(e, attempt) if error_class != "fatal" and attempt <= self.max_retries else None
                 
-                if current_url in visited_urls:
-                    continue
+                await self.db_writer.run(lambda conn: conn.execute(
+                    """INSERT INTO page_failures (session_id, url, attempt, error_class, status_code, error, final, timestamp)
+                       VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+                    (session_id, page_url, attempt, error_class, getattr(e, "status", None),
+                     str(e)[:1000], delay is None, datetime.now().isoformat())
+                ))
                 
-                visited_urls.add(current_url)
+                if delay is None:
+                    stats["failed"] += 1
+                    self.pages_counter.inc(outcome="failed")
+                    logger.error(f"Error scraping {page_url} ({error_class}, attempt {attempt}): {e}")
+                else:
+                    stats["retries"] += 1
+                    self.retries_counter.inc()
+                    heapq.heappush(retries, (time.monotonic() + delay, next(retry_seq), page_url, current_depth, attempt + 1))
+                    logger.warning(f"Retrying {page_url} in {delay:.1f}s ({error_class}, attempt {attempt}): {e}")
                 
-                # Scrape the page
-                try:
-                    page_data = await self._scrape_page(current_url, session_id, take_screenshots)
-                    pages_scraped += 1
+                emit({
+                    "event": "page_error",
+                    "session_id": session_id,
+                    "url": page_url,
+                    "error": str(e),
+                    "error_class": error_class,
+                    "attempt": attempt,
+                    "retry_in": None if delay is None else round(delay, 3),
+                })
+            
+            try:
+                while True:
+                    # Over the soft memory budget run one page at a time; over the hard budget launch nothing
+                    # until in-flight pages drain, and stop the session if that doesn't bring memory back down
+                    level = await self.memory_guard.check()
+                    if self.memory_guard.rss:
+                        stats["memory"]["peak_rss_mb"] = max(
+                            stats["memory"]["peak_rss_mb"] or 0, round(self.memory_guard.rss / (1024 * 1024), 1)
+                        )
+                    if level != memory_level:
+                        if MemoryGuard.LEVELS.index(level) > MemoryGuard.LEVELS.index(memory_level):
+                            stats["memory"][f"{level}_limit_hits"] += 1
+                            self.memory_guard.limit_hits.inc(level=level)
+                            logger.warning(f"Memory over the {level} limit ({self.memory_guard.rss / (1024 * 1024):.0f} MB); "
+                                           f"throttling session {session_id}")
+                            await self.memory_guard.relieve(self.browser_tools)
+                            await frontier.shrink(self.frontier_batch_size)
+                        memory_level = level
+                    if memory_level == "hard" and not in_flight:
+                        await self.memory_guard.relieve(self.browser_tools)
+                        memory_level = await self.memory_guard.check(force=True)
+                        if memory_level == "hard":
+                            stats["memory"]["stopped"] = True
+                            logger.error(f"Stopping session {session_id}: memory still over the hard limit "
+                                         f"({self.memory_guard.rss / (1024 * 1024):.0f} MB) with no pages in flight")
+                            break
+                    launch_limit = {"ok": self.host_limits.max_limit, "soft": 1, "hard": 0}[memory_level]
                     
-                    # Extract PDF if requested and it's a PDF link
-                    if extract_pdf and current_url.lower().endswith('.pdf'):
-                        await self._extract_pdf(current_url, session_id)
+                    # Out of time: finish the pages in flight and stop
+                    if deadline is not None and time.monotonic() >= deadline:
+                        if not stats.get("time_budget_exhausted"):
+                            stats["time_budget_exhausted"] = True
+                            logger.info(f"Time budget of {self.time_budget}s used up for session {session_id}")
+                        if not in_flight:
+                            break
+                        launch_limit = 0
                     
-                    # Store links for further crawling
-                    if current_depth < depth:
-                        extracted_links = page_data.get("links", [])
-                        for link in extracted_links:
-                            if link["is_internal"] and link["target_url"] not in visited_urls:
-                                to_visit.append((link["target_url"], current_depth + 1))
+                    # Launch pages while the session has budget; host slots throttle them inside fetch()
+                    while pages_scraped + len(in_flight) < max_pages and len(in_flight) < launch_limit:
+                        item = await next_item()
+                        if item is None:
+                            break
+                        hosts.add(urllib.parse.urlparse(item[0]).netloc)
+                        in_flight[asyncio.create_task(fetch(item[0]))] = item
                     
-                    # Random delay between requests to be polite
-                    await asyncio.sleep(self.crawl_delay)
+                    if not in_flight:
+                        if not retries or pages_scraped >= max_pages:
+                            break
+                        # Only retries are left; wait for the earliest one
+                        await asyncio.sleep(max(0.0, retries[0][0] - time.monotonic()))
+                        continue
                     
-                except Exception as e:
-                    logger.error(f"Error scraping {current_url}: {e}")
+                    timeout = max(0.0, retries[0][0] - time.monotonic()) if retries else None
+                    done, _ = await asyncio.wait(in_flight, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                    
+                    for task in done:
+                        current_url, current_depth, attempt = in_flight.pop(task)
+                        try:
+                            page_data = task.result()
+                        except Exception as e:
+                            await record_failure(current_url, current_depth, attempt, e)
+                            continue
+                        
+                        pages_scraped += 1
+                        self.pages_counter.inc(outcome="scraped")
+                        self.page_duration.observe(page_data["duration"])
+                        self.recent_pages.append(time.monotonic())
+                        if self.memory_guard.page_done():
+                            snapshot = await self.memory_guard.snapshot()
+                            if snapshot:
+                                stats["memory"]["snapshots"].append(snapshot)
+                                logger.info(f"Memory after {snapshot['pages']} pages: {snapshot['rss_mb']} MB RSS, "
+                                            f"{snapshot['traced_mb']} MB traced; top: "
+                                            + ", ".join(f"{entry['location']} {entry['size_diff_kb']:+.0f} KB"
+                                                        for entry in snapshot["top"][:3]))
+                        if page_data.get("near_duplicate_of"):
+                            near_duplicates += 1
+                        if page_data.get("wait_strategy"):
+                            self._record_wait(stats["wait_strategies"], page_data)
+                        if page_data.get("screenshot"):
+                            screenshot = page_data["screenshot"]
+                            stats["screenshots"]["deduplicated" if screenshot["deduplicated"] else "stored"] += 1
+                            stats["screenshots"]["bytes"] += screenshot["bytes"]
+                        for counter, value in (page_data.get("http_cache") or {}).items():
+                            stats["http_cache"][counter] += value
+                        for stage, seconds in (page_data.get("timings") or {}).items():
+                            stage_histograms[stage].observe(seconds)
+                        
+                        host = urllib.parse.urlparse(current_url).netloc
+                        emit({
+                            "event": "page",
+                            "session_id": session_id,
+                            "url": current_url,
+                            "status_code": page_data.get("status_code"),
+                            "near_duplicate_of": page_data.get("near_duplicate_of"),
+                            "host_limit": self.host_limits.limit(host),
+                            "duration": round(page_data["duration"], 4),
+                        })
+                        
+                        # Extract PDF if requested and it's a PDF link
+                        if extract_pdf and current_url.lower().endswith('.pdf'):
+                            try:
+                                await self._extract_pdf(current_url, session_id)
+                            except Exception as e:
+                                logger.error(f"Error extracting PDF {current_url}: {e}")
+                        
+                        # Store links for further crawling
+                        if current_depth < depth:
+                            links = [link for link in page_data.get("links", []) if link["is_internal"]]
+                            await frontier.push_many(
+                                await self._score_links(frontier, links, current_url, current_depth + 1, sitemap_priorities)
+                            )
+            finally:
+                for task in in_flight:
+                    task.cancel()
+                if in_flight:
+                    await asyncio.gather(*in_flight, return_exceptions=True)
+                stats["frontier"] = frontier.stats()
+                frontier.close()
+            
+            stats["host_limits"] = self.host_limits.snapshot(hosts)
+            stats["stages"] = {stage: histogram.to_dict() for stage, histogram in stage_histograms.items()}
+            stats["event_loop"] = self.loop_monitor.end(session_id)
+            for strategy in stats["wait_strategies"].values():
+                if strategy["sampled"]:
+                    strategy["estimated_saved_seconds"] = round(
+                        strategy["baseline_extra_seconds"] / strategy["sampled"] * strategy["pages"], 3
+                    )
             
             # Update session status
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            cursor.execute(
-                "UPDATE scrape_sessions SET completed = 1, pages_scraped = ?, status = ? WHERE id = ?",
-                (pages_scraped, "completed", session_id)
-            )
-            conn.commit()
-            conn.close()
+            await self.db_writer.run(lambda conn: conn.execute(
+                "UPDATE scrape_sessions SET completed = 1, pages_scraped = ?, status = ?, stats = ? WHERE id = ?",
+                (pages_scraped, "completed", json.dumps(stats), session_id)
+            ))
             
-            logger.info(f"Scraping completed. Session ID: {session_id}, Pages scraped: {pages_scraped}")
-            return {"session_id": session_id, "pages_scraped": pages_scraped}
+            logger.info(f"Scraping completed. Session ID: {session_id}, Pages scraped: {pages_scraped}, "
+                        f"Near-duplicates: {near_duplicates}, Retries: {stats['retries']}, Failed: {stats['failed']}")
+            result = {
+                "session_id": session_id,
+                "pages_scraped": pages_scraped,
+                "near_duplicates": near_duplicates,
+                "stats": stats,
+            }
+            emit({"event": "session_completed", "url": url, **result})
+            return result
             
         except Exception as e:
             logger.error(f"Error during scraping session: {e}")
+            emit({"event": "session_failed", "session_id": session_id, "url": url, "error": str(e)})
             
             # Update session status to failed
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            cursor.execute(
+            await self.db_writer.run(lambda conn: conn.execute(
                 "UPDATE scrape_sessions SET status = ? WHERE id = ?",
                 ("failed", session_id)
-            )
-            conn.commit()
-            conn.close()
+            ))
             
             raise
+        
+        except asyncio.CancelledError:
+            # Cancelled jobs (shutdown, a lost worker lease) must not leave the session in_progress;
+            # the write is queued without awaiting so a repeated cancel can't skip it
+            logger.warning(f"Scraping session {session_id} cancelled")
+            emit({"event": "session_cancelled", "session_id": session_id, "url": url})
+            self.db_writer.submit(lambda conn: conn.execute(
+                "UPDATE scrape_sessions SET status = ? WHERE id = ?",
+                ("cancelled", session_id)
+            ))
+            raise
+        
+        finally:
+            self.loop_monitor.end(session_id)
+            self.active_sessions.pop(session_id, None)
+            self.near_duplicate_indexes.pop(session_id, None)
+            self.screenshots.discard(session_id)
+    
+    async def _score_links(self, frontier, links, source_url, depth, sitemap_priorities):
+        """Frontier entries for newly found links, scored by the URL scorer when one is configured"""
+        if self.url_scorer is None:
+            return [(link["target_url"], depth, 0.0) for link in links]
+        
+        inlinks = await frontier.count_inlinks([link["target_url"] for link in links])
+        entries = []
+        for link, count in zip(links, inlinks):
+            candidate = {
+                "url": link["target_url"],
+                "depth": depth,
+                "anchor_text": link.get("text", ""),
+                "inlinks": count,
+                "sitemap_priority": sitemap_priorities.get(link["target_url"]),
+                "source_url": source_url,
+            }
+            try:
+                score = float(self.url_scorer(candidate))
+            except Exception as e:
+                logger.debug(f"URL scorer failed for {candidate['url']}: {e}")
+                score = 0.0
+            entries.append((link["target_url"], depth, -score))
+        return entries
+    
+    async def _sitemap_priorities(self, url, limit=100000):
+        """URL -> <priority> from the site's sitemaps (robots.txt Sitemap: lines, else /sitemap.xml)"""
+        parsed = urllib.parse.urlparse(url)
+        origin = f"{parsed.scheme}://{parsed.netloc}"
+        headers = {"User-Agent": random.choice(self.browser_tools.user_agents)}
+        
+        pending = []
+        try:
+            robots = await self._http_get(f"{origin}/robots.txt", headers)
+            if robots.status_code == 200:
+                pending = [
+                    line.split(":", 1)[1].strip() for line in robots.content.decode(errors="ignore").splitlines()
+                    if line.lower().startswith("sitemap:")
+                ]
+        except Exception as e:
+            logger.debug(f"Could not read robots.txt for {origin}: {e}")
+        pending = pending or [f"{origin}/sitemap.xml"]
+        
+        def local(tag):
+            return tag.rsplit("}", 1)[-1]
+        
+        priorities = {}
+        fetched = 0
+        while pending and fetched < self.sitemap_max_files and len(priorities) < limit:
+            sitemap_url = pending.pop(0)
+            fetched += 1
+            try:
+                response = await self._http_get(sitemap_url, headers)
+                if response.status_code != 200:
+                    continue
+                content = response.content
+                if content[:2] == b"\x1f\x8b":
+                    content = gzip.decompress(content)
+                root = await asyncio.to_thread(ElementTree.fromstring, content)
+            except Exception as e:
+                logger.debug(f"Could not read sitemap {sitemap_url}: {e}")
+                continue
+            
+            for element in root:
+                fields = {local(child.tag): (child.text or "").strip() for child in element}
+                if not fields.get("loc"):
+                    continue
+                if local(root.tag) == "sitemapindex":
+                    pending.append(fields["loc"])
+                    continue
+                try:
+                    priorities[fields["loc"]] = float(fields.get("priority") or 0.5)
+                except ValueError:
+                    priorities[fields["loc"]] = 0.5
+        
+        logger.info(f"Loaded {len(priorities)} sitemap priorities for {origin} from {fetched} sitemaps")
+        return priorities
+    
+    async def _time_to_network_idle(self, page, timeout):
+        """Seconds until the page's network goes idle, or the timeout if it never does"""
+        start = time.monotonic()
+        try:
+            await page.wait_for_load_state("networkidle", timeout=timeout * 1000)
+        except PlaywrightTimeoutError:
+            pass
+        except Exception as e:
+            logger.debug(f"Network idle sample failed: {e}")
+            return None
+        return time.monotonic() - start
+    
+    async def _wait_for_page(self, page, profile):
+        """Apply a profile's wait strategy after navigation; caps and missing selectors are not errors"""
+        try:
+            if profile["wait"] == "selector":
+                await page.wait_for_selector(profile["selector"], state="attached", timeout=profile["timeout"] * 1000)
+            elif profile["wait"] == "networkidle":
+                await page.wait_for_load_state("networkidle", timeout=min(profile["networkidle_cap"], profile["timeout"]) * 1000)
+        except PlaywrightTimeoutError:
+            logger.debug(f"{profile['wait']} wait capped for {page.url}")
+    
+    @staticmethod
+    def _record_wait(strategies, page_data):
+        """Accumulate per-strategy wait time and sampled time-to-network-idle"""
+        strategy = strategies.setdefault(page_data["wait_strategy"], {
+            "pages": 0, "wait_seconds": 0.0, "sampled": 0, "baseline_extra_seconds": 0.0,
+        })
+        strategy["pages"] += 1
+        strategy["wait_seconds"] = round(strategy["wait_seconds"] + page_data["wait_time"], 3)
+        if page_data.get("baseline_extra") is not None:
+            strategy["sampled"] += 1
+            strategy["baseline_extra_seconds"] = round(strategy["baseline_extra_seconds"] + page_data["baseline_extra"], 3)
+    
+    def _retry_delay(self, error, attempt):
+        """Exponential backoff with jitter, stretched to any Retry-After the server sent"""
+        backoff = min(self.retry_max_delay, self.retry_base_delay * (2 ** (attempt - 1)))
+        delay = backoff / 2 + random.uniform(0, backoff / 2)
+        retry_after = getattr(error, "retry_after", None)
+        if retry_after:
+            delay = max(delay, min(retry_after, self.retry_max_delay))
+        return delay
     
     async def _scrape_page(self, url, session_id, take_screenshots=True):
         """Scrape a single page and store the data"""
         logger.info(f"Scraping page: {url}")
         
-        page = await self.browser_tools.new_page()
+        # Per-stage timings, stored in page_timings and aggregated per session
+        timer = StageTimer()
+        with timer.stage("new_page"):
+            page = await self.browser_tools.new_page()
+        simhash = None
+        reservation = None
+        baseline = None
         
         try:
-            # Navigate to the page
-            response = await page.goto(url, timeout=self.request_timeout * 1000, wait_until="networkidle")
+            # Navigate to the page, feeding the outcome back into proxy health stats
+            profile = self.profiles.for_url(url)
+            proxy = self.browser_tools.proxy_for_page(page)
+            nav_start = time.monotonic()
+            try:
+                with timer.stage("goto"):
+                    response = await page.goto(
+                        url,
+                        timeout=profile["timeout"] * 1000,
+                        wait_until="load" if profile["wait"] == "load" else "domcontentloaded",
+                    )
+            except Exception as e:
+                if self.proxy_manager and is_proxy_error(e):
+                    self.proxy_manager.report_failure(proxy)
+                raise
             
             if not response:
                 logger.warning(f"No response from {url}")
                 return None
             
+            navigation_time = time.monotonic() - nav_start
             status_code = response.status
+            
+            # Throttled or temporarily unavailable pages go back to the retry queue instead of being stored;
+            # a throttled exit IP counts against its proxy, an overloaded target doesn't count either way
+            if status_code in (429, 503):
+                if self.proxy_manager and status_code == 429:
+                    self.proxy_manager.report_failure(proxy)
+                raise RetryableStatusError(status_code, parse_retry_after(response.headers.get("retry-after")))
+            
+            if self.proxy_manager:
+                # Time to the first response byte measures the proxy hop; the full load mostly measures the page
+                response_start = response.request.timing.get("responseStart", -1)
+                self.proxy_manager.report_success(proxy, response_start / 1000 if response_start >= 0 else navigation_time)
+            
             content_type = response.headers.get("content-type", "")
             
             # Skip non-HTML responses except PDFs
             if "text/html" not in content_type and "application/pdf" not in content_type:
                 logger.info(f"Skipping non-HTML content: {content_type} at {url}")
-                return {"url": url, "status_code": status_code, "content_type": content_type}
+                return {"url": url, "status_code": status_code, "content_type": content_type,
+                        "navigation_time": navigation_time, "timings": timer.durations}
             
-            # Wait for the page to be fully loaded
-            await page.wait_for_load_state("networkidle")
+            # Wait according to the domain's profile
+            with timer.stage("wait"):
+                await self._wait_for_page(page, profile)
+            wait_time = time.monotonic() - nav_start
             
-            # Extract page title
-            title = await page.title()
+            # On a sample of pages keep waiting for full network idle alongside extraction to see what
+            # the strategy saved; the sample starts where the strategy stopped and is capped
+            if profile["wait"] != "networkidle" or profile["networkidle_cap"] < profile["timeout"]:
+                if random.random() < self.wait_baseline_sample_rate:
+                    baseline = asyncio.create_task(
+                        self._time_to_network_idle(page, min(profile["timeout"], self.wait_baseline_max_wait))
+                    )
             
-            # Take a screenshot if requested
-            screenshot_path = None
-            if take_screenshots:
-                screenshots_dir = os.path.join(self.config.data_dir, "exports/screenshots")
-                os.makedirs(screenshots_dir, exist_ok=True)
-                
-                domain = urllib.parse.urlparse(url).netloc
-                filename = f"{domain}_{hashlib.md5(url.encode()).hexdigest()[:10]}.png"
-                screenshot_path = os.path.join(screenshots_dir, filename)
-                
-                await self.browser_tools.take_full_page_screenshot(page, screenshot_path)
+            # Extract page title
+            with timer.stage("title"):
+                title = await page.title()
             
             # Get page content
-            html_content = await page.content()
+            with timer.stage("content"):
+                html_content = await page.content()
             content_hash = hashlib.md5(html_content.encode()).hexdigest()
             
             # Extract text content
-            text_content = await page.evaluate('''() => {
-                return document.body.innerText;
-            }''')
-            
-            # Extract links
-            links = await page._extract_links(page, url)
-            
-            # Extract images
-            images = await self._extract_images(page, url)
-            
-            # Store in database
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+            with timer.stage("text"):
+                if self.text_extraction == "browser":
+                    text_content = await page.evaluate('''() => {
+                        return document.body.innerText;
+                    }''')
+                    text_metadata = {"extracted_from": "body"}
+                else:
+                    text_content = await self.content_extractor.extract(html_content)
+                    text_metadata = {"extracted_from": "html", "extractor": "offline"}
             
-            # Store page info
-            cursor.execute(
-                """INSERT INTO pages (session_id, url, title, content_hash, status_code, 
-                                     content_type, timestamp, screenshot_path) 
-                   VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
-                (session_id, url, title, content_hash, status_code, 
-                 content_type, datetime.now().isoformat(), screenshot_path)
-            )
-            page_id = cursor.lastrowid
+            # Check for near-duplicates before doing any further render work
+            duplicate_of = None
+            if self.near_duplicate_mode != "off":
+                with timer.stage("simhash"):
+                    simhash = await asyncio.to_thread(SimHashIndex.signature, text_content or "", self.near_duplicate_min_tokens)
+                if simhash is not None:
+                    with timer.stage("canonical_wait"):
+                        reservation, duplicate_of, distance = await self._reserve_canonical(session_id, simhash)
+                    if duplicate_of is not None:
+                        logger.info(f"Near-duplicate of page {duplicate_of} (distance {distance}): {url}")
             
-            # Store content
-            cursor.execute(
-                "INSERT INTO page_content (page_id, content_type, content, metadata) VALUES (?, ?, ?, ?)",
-                (page_id, "html", html_content, json.dumps({"content_type": content_type}))
-            )
+            skip_duplicate = duplicate_of is not None and self.near_duplicate_mode == "skip"
             
-            cursor.execute(
-                "INSERT INTO page_content (page_id, content_type, content, metadata) VALUES (?, ?, ?, ?)",
-                (page_id, "text", text_content, json.dumps({"extracted_from": "body"}))
-            )
+            # Take a screenshot if requested
+            screenshot_path = None
+            screenshot_info = None
+            if take_screenshots and profile["screenshots"] != "none" and not skip_duplicate:
+                with timer.stage("screenshot"):
+                    screenshot_path, screenshot_info = await self.screenshots.capture(
+                        page, url, session_id, profile["screenshots"], profile.get("screenshot_max_height")
+                    )
             
-            # Store links
+            # Extract links and images (a skipped duplicate shares its template's links)
+            links = []
+            images = []
+            if not skip_duplicate:
+                with timer.stage("links"):
+                    links = await self._extract_links(page, url)
+                with timer.stage("images"):
+                    images = await self._extract_images(page, url)
+            
+            # Classify links as internal or external
             base_domain = tldextract.extract(url).registered_domain
             for link in links:
-                link_url = link["url"]
-                link_text = link.get("text", "")
-                
-                # Determine if internal or external
-                link_domain = tldextract.extract(link_url).registered_domain
-                is_internal = link_domain == base_domain
+                link["target_url"] = link["url"]
+                link["is_internal"] = tldextract.extract(link["url"]).registered_domain == base_domain
+            
+            # Store in database through the shared writer thread
+            def store(conn):
+                cursor = conn.cursor()
                 
+                # Store page info
                 cursor.execute(
+                    """INSERT INTO pages (session_id, url, title, content_hash, status_code, 
+                                         content_type, timestamp, screenshot_path, simhash, near_duplicate_of) 
+                       VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                    (session_id, url, title, content_hash, status_code, 
+                     content_type, datetime.now().isoformat(), screenshot_path,
+                     SimHashIndex.to_hex(simhash), duplicate_of)
+                )
+                page_id = cursor.lastrowid
+                
+                if not skip_duplicate:
+                    # Store content
+                    cursor.executemany(
+                        "INSERT INTO page_content (page_id, content_type, content, metadata) VALUES (?, ?, ?, ?)",
+                        [
+                            (page_id, "html", html_content, json.dumps({"content_type": content_type})),
+                            (page_id, "text", text_content, json.dumps(text_metadata)),
+                        ]
+                    )
+                
+                # Store links
+                cursor.executemany(
                     "INSERT INTO links (source_page_id, target_url, link_text, is_internal) VALUES (?, ?, ?, ?)",
-                    (page_id, link_url, link_text, is_internal)
+                    [(page_id, link["target_url"], link.get("text", ""), link["is_internal"]) for link in links]
                 )
-            
-            # Store images
-            for image in images:
-                cursor.execute(
+                
+                # Store images
+                cursor.executemany(
                     """INSERT INTO images (page_id, url, alt_text, filename, width, height) 
                        VALUES (?, ?, ?, ?, ?, ?)""",
-                    (page_id, image["url"], image.get("alt_text", ""), 
-                     image.get("filename", ""), image.get("width", 0), image.get("height", 0))
+                    [(page_id, image["url"], image.get("alt_text", ""), 
+                      image.get("filename", ""), image.get("width", 0), image.get("height", 0)) for image in images]
                 )
+                
+                return page_id
             
-            conn.commit()
-            conn.close()
+            with timer.stage("db_write"):
+                page_id = await self.db_writer.run(store)
+            if reservation is not None:
+                reservation.set_result(page_id)
+            
+            baseline_extra = await baseline if baseline else None
+            
+            await self.db_writer.run(timer.store, session_id, page_id, url)
             
             result = {
                 "page_id": page_id,
@@ -1772,6 +5485,14 @@ class Scraper:
                 "title": title,
                 "status_code": status_code,
                 "content_type": content_type,
+                "near_duplicate_of": duplicate_of,
+                "navigation_time": navigation_time,
+                "screenshot": screenshot_info,
+                "http_cache": self.browser_tools.cache_stats(page),
+                "wait_strategy": profile["wait"],
+                "wait_time": wait_time,
+                "baseline_extra": baseline_extra,
+                "timings": timer.durations,
                 "links": links,
                 "images": images
             }
@@ -1783,8 +5504,36 @@ class Scraper:
             raise
             
         finally:
+            if baseline and not baseline.done():
+                baseline.cancel()
+                await asyncio.gather(baseline, return_exceptions=True)
+            
+            # A page that failed before it was stored gives up its reservation; waiting copies store as distinct
+            if reservation is not None and not reservation.done():
+                index = self.near_duplicate_indexes.get(session_id)
+                if index is not None:
+                    index.remove(simhash, reservation)
+                reservation.set_result(None)
             await page.close()
     
+    async def _reserve_canonical(self, session_id, simhash):
+        """Reserve a canonical index entry or wait for the page this one duplicates; (reservation, duplicate_of, distance)"""
+        index = self.near_duplicate_indexes.setdefault(session_id, SimHashIndex(self.near_duplicate_distance))
+        loop = asyncio.get_running_loop()
+        while True:
+            # A distinct page reserves its entry in the same step as the query, so concurrent copies
+            # of it wait for its page id instead of all becoming canonical
+            reservation = loop.create_future()
+            match = index.query_or_add(simhash, reservation)
+            if match is None:
+                return reservation, None, None
+            
+            canonical, distance = match
+            duplicate_of = await canonical
+            if duplicate_of is not None:
+                return None, duplicate_of, distance
+            # The canonical copy failed before it was stored and withdrew its entry; try again in its place
+    
     async def _extract_links(self, page, base_url):
         """Extract all links from a page"""
         links = await page.evaluate('''(baseUrl) => {
@@ -1825,12 +5574,26 @@ class Scraper:
         
         return images
     
+    async def _http_get(self, url, headers):
+        """GET outside the browser, through the record/replay archive when one is active"""
+        archive = self.browser_tools.archive
+        if archive and archive.mode == "replay":
+            entry = await asyncio.to_thread(archive.lookup, "GET", url)
+            if entry is None:
+                raise requests.ConnectionError(f"{url} is not in the archive")
+            return types.SimpleNamespace(status_code=entry["status"], headers=entry["headers"], content=entry["body"])
+        
+        response = await asyncio.to_thread(requests.get, url, headers=headers, timeout=self.request_timeout)
+        if archive:
+            await asyncio.to_thread(archive.record, "GET", url, response.status_code, dict(response.headers), response.content)
+        return response
+    
     async def _extract_pdf(self, url, session_id):
         """Extract content from a PDF file"""
         try:
             # Download the PDF
             headers = {"User-Agent": random.choice(self.browser_tools.user_agents)}
-            response = requests.get(url, headers=headers, timeout=self.request_timeout)
+            response = await self._http_get(url, headers)
             
             if response.status_code != 200:
                 logger.warning(f"Failed to download PDF from {url}: {response.status_code}")
@@ -1889,33 +5652,519 @@ class Scraper:
     
     async def close(self):
         """Close the scraper and release resources"""
+        await self.loop_monitor.stop()
+        self.memory_guard.stop()
         if self.browser_tools:
             await self.browser_tools.close()
+        self.content_extractor.close()
+        await asyncio.to_thread(self.db_writer.close)
+
+class LinkGraph:
+    """Internal link graph of a scraping session in compressed sparse row (CSR) form"""
+
+    def __init__(self, urls, indptr, indices, page_ids=None, root=None):
+        self.urls = urls
+        self.indptr = indptr
+        self.indices = indices
+        self.page_ids = page_ids if page_ids is not None else np.full(len(urls), -1, dtype=np.int64)
+        self.root = root
+
+    @property
+    def num_nodes(self):
+        return len(self.urls)
+
+    @property
+    def num_edges(self):
+        return len(self.indices)
+
+    @classmethod
+    def from_edges(cls, urls, src, dst, page_ids=None, root=None):
+        """Build a CSR graph from parallel source/target node index arrays"""
+        n = len(urls)
+        src = np.asarray(src, dtype=np.int64)
+        dst = np.asarray(dst, dtype=np.int64)
+
+        # Drop self-loops and duplicate edges
+        keep = src != dst
+        src, dst = src[keep], dst[keep]
+        if len(src):
+            keys = np.unique(src * n + dst)
+            src, dst = keys // n, keys % n
+
+        # np.unique sorts by key, so edges are already grouped by source
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(src, minlength=n), out=indptr[1:])
+        indices = dst.astype(np.int64)
+
+        return cls(urls, indptr, indices, page_ids, root)
+
+    @classmethod
+    def from_session(cls, db_path, session_id):
+        """Load the internal links of a scraping session into a CSR graph"""
+        conn = sqlite3.connect(db_path)
+        try:
+            session = conn.execute("SELECT url FROM scrape_sessions WHERE id = ?", (session_id,)).fetchone()
+            if not session:
+                return None
+
+            pages = pd.read_sql_query(
+                "SELECT id, url FROM pages WHERE session_id = ?",
+                conn, params=(session_id,)
+            )
+            links = pd.read_sql_query(
+                """SELECT p.url AS source_url, l.target_url
+                   FROM links l JOIN pages p ON p.id = l.source_page_id
+                   WHERE p.session_id = ? AND l.is_internal = 1""",
+                conn, params=(session_id,)
+            )
+        finally:
+            conn.close()
+
+        # Fragments point at the same document
+        page_urls = pages["url"].str.split("#", n=1).str[0]
+        source_urls = links["source_url"].str.split("#", n=1).str[0]
+        target_urls = links["target_url"].str.split("#", n=1).str[0]
+        root_url = session[0].split("#", 1)[0]
+
+        # Factorize all URLs into dense node indices in one vectorized pass
+        all_urls = pd.concat([pd.Series([root_url]), page_urls, source_urls, target_urls], ignore_index=True)
+        codes, uniques = pd.factorize(all_urls)
+
+        n_pages = len(page_urls)
+        n_links = len(links)
+        page_codes = codes[1:1 + n_pages]
+        src = codes[1 + n_pages:1 + n_pages + n_links]
+        dst = codes[1 + n_pages + n_links:]
+
+        page_ids = np.full(len(uniques), -1, dtype=np.int64)
+        page_ids[page_codes] = pages["id"].to_numpy(dtype=np.int64)
+
+        return cls.from_edges(np.asarray(uniques, dtype=object), src, dst, page_ids, root=int(codes[0]))
+
+    def out_degree(self):
+        """Number of distinct internal links leaving each node"""
+        return np.diff(self.indptr)
+
+    def in_degree(self):
+        """Number of distinct internal links pointing at each node"""
+        return np.bincount(self.indices, minlength=self.num_nodes)
+
+    def pagerank(self, damping=0.85, max_iter=100, tol=1e-8):
+        """Compute PageRank by power iteration over the CSR arrays"""
+        n = self.num_nodes
+        if n == 0:
+            return np.zeros(0)
+
+        out_degree = self.out_degree()
+        sources = np.repeat(np.arange(n), out_degree)
+        dangling = out_degree == 0
+        rank = np.full(n, 1.0 / n)
+
+        for _ in range(max_iter):
+            # Each node spreads its rank evenly over its outgoing links
+            contributions = rank[sources] / out_degree[sources]
+            new_rank = np.bincount(self.indices, weights=contributions, minlength=n)
+            # Rank held by dangling nodes is redistributed uniformly
+            new_rank = damping * (new_rank + rank[dangling].sum() / n) + (1.0 - damping) / n
+
+            converged = np.abs(new_rank - rank).sum() < tol
+            rank = new_rank
+            if converged:
+                break
+
+        return rank
+
+    def click_depth(self, root=None):
+        """Minimum number of clicks from the root to each node (-1 if unreachable)"""
+        root = self.root if root is None else root
+        depth = np.full(self.num_nodes, -1, dtype=np.int64)
+        if root is None or self.num_nodes == 0:
+            return depth
+
+        depth[root] = 0
+        frontier = np.array([root], dtype=np.int64)
+        level = 0
+
+        while frontier.size:
+            starts = self.indptr[frontier]
+            counts = self.indptr[frontier + 1] - starts
+            total = counts.sum()
+            if total == 0:
+                break
+
+            # Gather all neighbours of the frontier in one shot
+            offsets = np.repeat(starts - (np.cumsum(counts) - counts), counts) + np.arange(total)
+            neighbours = self.indices[offsets]
+            neighbours = np.unique(neighbours[depth[neighbours] < 0])
+
+            level += 1
+            depth[neighbours] = level
+            frontier = neighbours
+
+        return depth
+
+    def orphan_pages(self, in_degree=None):
+        """Boolean mask of crawled pages that no other page links to"""
+        in_degree = self.in_degree() if in_degree is None else in_degree
+        orphans = (in_degree == 0) & (self.page_ids >= 0)
+        if self.root is not None:
+            orphans[self.root] = False
+        return orphans
+
+    def strongly_connected_components(self):
+        """Label each node with the id of its strongly connected component"""
+        n = self.num_nodes
+        if n == 0:
+            return np.zeros(0, dtype=np.int64)
+
+        if HAS_SCIPY:
+            matrix = csr_matrix(
+                (np.ones(self.num_edges, dtype=np.int8), self.indices, self.indptr),
+                shape=(n, n)
+            )
+            _, labels = connected_components(matrix, directed=True, connection="strong")
+            return labels.astype(np.int64)
+
+        return self._tarjan_scc()
+
+    def _tarjan_scc(self):
+        """Iterative Tarjan SCC fallback used when SciPy is not installed"""
+        n = self.num_nodes
+        indptr = self.indptr.tolist()
+        indices = self.indices.tolist()
+
+        index = [-1] * n
+        lowlink = [0] * n
+        on_stack = [False] * n
+        labels = [-1] * n
+        stack = []
+        counter = 0
+        component = 0
+
+        for start in range(n):
+            if index[start] != -1:
+                continue
+
+            work = [(start, indptr[start])]
+            index[start] = lowlink[start] = counter
+            counter += 1
+            stack.append(start)
+            on_stack[start] = True
+
+            while work:
+                node, edge = work[-1]
+                if edge < indptr[node + 1]:
+                    work[-1] = (node, edge + 1)
+                    target = indices[edge]
+                    if index[target] == -1:
+                        index[target] = lowlink[target] = counter
+                        counter += 1
+                        stack.append(target)
+                        on_stack[target] = True
+                        work.append((target, indptr[target]))
+                    elif on_stack[target]:
+                        lowlink[node] = min(lowlink[node], index[target])
+                    continue
+
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+
+                if lowlink[node] == index[node]:
+                    while True:
+                        member = stack.pop()
+                        on_stack[member] = False
+                        labels[member] = component
+                        if member == node:
+                            break
+                    component += 1
+
+        return np.asarray(labels, dtype=np.int64)
+
+    def compute_metrics(self):
+        """Compute all per-node metrics as a dict of aligned arrays"""
+        in_degree = self.in_degree()
+        return {
+            "in_degree": in_degree,
+            "out_degree": self.out_degree(),
+            "pagerank": self.pagerank(),
+            "click_depth": self.click_depth(),
+            "is_orphan": self.orphan_pages(in_degree),
+            "component_id": self.strongly_connected_components(),
+        }
+
+    def save_metrics(self, db_path, session_id, metrics=None):
+        """Replace the page_metrics rows of a session with freshly computed values"""
+        metrics = metrics or self.compute_metrics()
+        computed_at = datetime.now().isoformat()
+
+        page_ids = [int(pid) if pid >= 0 else None for pid in self.page_ids]
+        click_depth = [int(d) if d >= 0 else None for d in metrics["click_depth"]]
+        rows = zip(
+            [session_id] * self.num_nodes,
+            page_ids,
+            self.urls.tolist(),
+            metrics["in_degree"].tolist(),
+            metrics["out_degree"].tolist(),
+            metrics["pagerank"].tolist(),
+            click_depth,
+            metrics["is_orphan"].tolist(),
+            metrics["component_id"].tolist(),
+            [computed_at] * self.num_nodes,
+        )
+
+        conn = sqlite3.connect(db_path)
+        try:
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM page_metrics WHERE session_id = ?", (session_id,))
+            cursor.executemany(
+                """INSERT INTO page_metrics (session_id, page_id, url, in_degree, out_degree, pagerank,
+                                            click_depth, is_orphan, component_id, computed_at)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                rows
+            )
+            conn.commit()
+        finally:
+            conn.close()
+
+        return metrics
 
 class ElysianLens:
     """Main application class"""
     
+    JOB_TYPES = ("scrape", "report", "sitemap", "graph")
+    
     def __init__(self):
         self.config = Configuration()
-        self.proxy_manager = ProxyManager(self.config)
-        self.browser_tools = BrowserTools(self.config, self.proxy_manager)
-        self.scraper = Scraper(self.config, self.proxy_manager, self.browser_tools)
+        self.metrics = MetricsRegistry()
+        self.proxy_manager = ProxyManager(self.config, self.metrics)
+        self.browser_tools = BrowserTools(self.config, self.proxy_manager, self.metrics)
+        self.scraper = Scraper(self.config, self.proxy_manager, self.browser_tools, self.metrics)
+        self.job_queue = JobQueue(self.config, self.scraper.db_path)
+        self.monitor = ChangeMonitor(self.config, self.scraper.db_path)
+        
+        # Optional localhost Prometheus endpoint, started by setup()
+        self.metrics_server = None
+        if self.config.get("METRICS_ENABLED", "false").lower() == "true":
+            self.metrics_server = MetricsServer(
+                self.metrics, self.config.get("METRICS_HOST", "127.0.0.1"), int(self.config.get("METRICS_PORT", 9464))
+            )
     
     async def setup(self):
         """Set up the application and its components"""
-        # Fetch and verify proxies if enabled
-        if self.config.get("USE_PROXIES", "false").lower() == "true":
-            await self.proxy_manager.fetch_free_proxies()
-            await self.proxy_manager.verify_proxies()
+        if self.metrics_server and not self.metrics_server.runner:
+            await self.metrics_server.start()
+        
+        # Fetch and verify proxies if enabled (a replayed crawl never touches the network)
+        archive = self.browser_tools.archive
+        if self.config.get("USE_PROXIES", "false").lower() == "true" and not (archive and archive.mode == "replay"):
+            # Start from cached verified proxies and refresh them in the background
+            if self.proxy_manager.load_cached_pool():
+                self.proxy_manager.start_background_refresh()
+            else:
+                await self.proxy_manager.fetch_free_proxies()
+                await self.proxy_manager.verify_proxies()
+            self.proxy_manager.start_reverification()
     
-    async def scrape(self, url, depth=1, max_pages=10, take_screenshots=True, extract_pdf=True):
+    async def scrape(self, url, depth=1, max_pages=10, take_screenshots=True, extract_pdf=True, on_progress=None):
         """Scrape a URL with the specified parameters"""
         return await self.scraper.scrape_url(
-            url, depth, max_pages, take_screenshots, extract_pdf
+            url, depth, max_pages, take_screenshots, extract_pdf, on_progress=on_progress
         )
     
+    async def scrape_batch(self, urls, concurrency=8, sessions=None, depth=1, max_pages=10,
+                           take_screenshots=True, extract_pdf=True, on_progress=None):
+        """Scrape a stream of seed URLs as concurrent sessions sharing one browser and database"""
+        emit = on_progress or (lambda event: None)
+        sessions = sessions or concurrency
+        
+        # Budget of pages in flight across the batch, nested under any budget the scraper already shares
+        # (the daemon's); each session also gets its own cap so one wide site can't take every slot
+        batch_slots = asyncio.Semaphore(concurrency)
+        session_cap = max(1, concurrency // sessions)
+        seeds = asyncio.Queue(maxsize=sessions * 4)
+        seen = set()
+        counts = {"seeds": 0, "duplicates": 0, "invalid": 0, "sessions": 0, "failed": 0, "pages": 0}
+        start_time = time.time()
+        
+        async def produce():
+            iterator = iter(urls)
+            while True:
+                # Read in chunks off the event loop so huge files and slow stdin don't stall crawling
+                chunk = await asyncio.to_thread(lambda: list(itertools.islice(iterator, 1000)))
+                if not chunk:
+                    break
+                for line in chunk:
+                    seed = line.strip()
+                    if not seed or seed.startswith("#"):
+                        continue
+                    if not seed.startswith(("http://", "https://")):
+                        counts["invalid"] += 1
+                        emit({"event": "invalid_url", "url": seed})
+                        continue
+                    
+                    # 8-byte digests keep the dedup set small for millions of seeds
+                    digest = hashlib.blake2b(seed.encode(), digest_size=8).digest()
+                    if digest in seen:
+                        counts["duplicates"] += 1
+                        continue
+                    seen.add(digest)
+                    
+                    counts["seeds"] += 1
+                    await seeds.put(seed)
+            
+            for _ in range(sessions):
+                await seeds.put(None)
+        
+        async def consume():
+            while True:
+                seed = await seeds.get()
+                if seed is None:
+                    return
+                try:
+                    result = await self.scraper.scrape_url(
+                        seed, depth, max_pages, take_screenshots, extract_pdf, on_progress=emit,
+                        page_limits=(asyncio.Semaphore(session_cap), batch_slots)
+                    )
+                    counts["sessions"] += 1
+                    counts["pages"] += result["pages_scraped"]
+                except Exception as e:
+                    counts["failed"] += 1
+                    logger.error(f"Batch session failed for {seed}: {e}")
+        
+        # If reading seeds fails, the consumers would wait for sentinels forever; cancel them instead
+        consumers = [asyncio.create_task(consume()) for _ in range(sessions)]
+        try:
+            await produce()
+            await asyncio.gather(*consumers)
+        finally:
+            for task in consumers:
+                task.cancel()
+            await asyncio.gather(*consumers, return_exceptions=True)
+        
+        elapsed = time.time() - start_time
+        summary = {
+            **counts,
+            "elapsed": round(elapsed, 3),
+            "pages_per_second": round(counts["pages"] / elapsed, 3) if elapsed else 0.0,
+        }
+        emit({"event": "batch_completed", **summary})
+        return summary
+    
+    async def run_job(self, job_type, params, on_progress=None):
+        """Run a single scrape, report, sitemap or graph job and return its JSON-serializable result"""
+        if job_type not in self.JOB_TYPES:
+            raise ValueError(f"Unsupported job type: {job_type}")
+        
+        if job_type == "scrape":
+            return await self.scrape(
+                params["url"],
+                int(params.get("depth", 1)),
+                int(params.get("max_pages", 10)),
+                bool(params.get("screenshots", True)),
+                bool(params.get("extract_pdf", True)),
+                on_progress=on_progress,
+            )
+        
+        session_id = int(params["session_id"])
+        if job_type == "graph":
+            return await self.compute_page_metrics(session_id)
+        
+        export = self.export_pdf_report if job_type == "report" else self.generate_site_map
+        path = await export(session_id)
+        if path is None:
+            raise RuntimeError(f"Could not generate {job_type} for session {session_id}")
+        return {"session_id": session_id, "path": path}
+    
+    async def run_worker(self, worker_id=None, concurrency=None, drain=False, stop=None, on_progress=None):
+        """Claim and run jobs from the persistent queue until stopped, or until it is empty when draining"""
+        worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        concurrency = concurrency or int(self.config.get("WORKER_CONCURRENCY", 2))
+        poll_interval = float(self.config.get("WORKER_POLL_INTERVAL", 1))
+        stop = stop or asyncio.Event()
+        emit = on_progress or (lambda event: None)
+        job_queue = self.job_queue
+        counts = {"completed": 0, "failed": 0, "lost": 0}
+        running = set()
+        
+        async def keep_lease(job_id):
+            while True:
+                await asyncio.sleep(job_queue.lease_seconds / 3)
+                if not await asyncio.to_thread(job_queue.heartbeat, job_id, worker_id):
+                    return
+        
+        async def process(job):
+            job_id = job["id"]
+            emit({"event": "job_claimed", "job_id": job_id, "type": job["type"], "attempt": job["attempts"]})
+            work = asyncio.create_task(self.run_job(
+                job["type"], job["params"], on_progress=lambda event: emit({**event, "job_id": job_id})
+            ))
+            lease = asyncio.create_task(keep_lease(job_id))
+            try:
+                await asyncio.wait({work, lease}, return_when=asyncio.FIRST_COMPLETED)
+                if not work.done():
+                    # Another worker reclaimed the job; stop rather than duplicate its work
+                    counts["lost"] += 1
+                    logger.warning(f"Lost lease on job {job_id}; abandoning it")
+                    emit({"event": "job_lost", "job_id": job_id})
+                    return
+                
+                try:
+                    result = work.result()
+                except Exception as e:
+                    counts["failed"] += 1
+                    logger.error(f"Job {job_id} failed (attempt {job['attempts']}/{job['max_attempts']}): {e}")
+                    await asyncio.to_thread(job_queue.fail, job_id, worker_id, e)
+                    emit({"event": "job_failed", "job_id": job_id, "error": str(e)})
+                else:
+                    counts["completed"] += 1
+                    await asyncio.to_thread(job_queue.complete, job_id, worker_id, result)
+                    emit({"event": "job_completed", "job_id": job_id, "result": result})
+            except asyncio.CancelledError:
+                # Hand the job straight back on shutdown instead of waiting for the lease to expire
+                await asyncio.to_thread(job_queue.release, job_id, worker_id)
+                raise
+            finally:
+                work.cancel()
+                lease.cancel()
+                # Let an abandoned scrape record its session as cancelled before moving on
+                await asyncio.gather(work, lease, return_exceptions=True)
+        
+        logger.info(f"Worker {worker_id} started with concurrency {concurrency}")
+        try:
+            while not stop.is_set():
+                job = None
+                while len(running) < concurrency:
+                    job = await asyncio.to_thread(job_queue.claim, worker_id)
+                    if job is None:
+                        break
+                    task = asyncio.create_task(process(job))
+                    running.add(task)
+                    task.add_done_callback(running.discard)
+                
+                if drain and job is None and not running:
+                    if not (await asyncio.to_thread(job_queue.counts)).get("queued"):
+                        break
+                
+                stopping = asyncio.create_task(stop.wait())
+                await asyncio.wait(running | {stopping}, timeout=poll_interval, return_when=asyncio.FIRST_COMPLETED)
+                stopping.cancel()
+        finally:
+            for task in list(running):
+                task.cancel()
+            if running:
+                await asyncio.gather(*running, return_exceptions=True)
+        
+        logger.info(f"Worker {worker_id} stopped: {counts}")
+        return {"worker_id": worker_id, **counts}
+    
     async def export_pdf_report(self, session_id):
         """Export a PDF report for a scraping session"""
+        # Report rendering is blocking SQLite, file and pdfkit work; keep it off the event loop
+        return await asyncio.to_thread(self._export_pdf_report, session_id)
+    
+    def _export_pdf_report(self, session_id):
         conn = sqlite3.connect(self.scraper.db_path)
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
@@ -2007,11 +6256,12 @@ class ElysianLens:
                 </div>
             """
             
-            # Add screenshot if available
-            if page["screenshot_path"] and os.path.exists(page["screenshot_path"]):
+            # Add screenshot if available (tiled captures show their first tile)
+            screenshot = BrowserTools.preview_image(page["screenshot_path"])
+            if screenshot and os.path.exists(screenshot):
                 html_content += f"""
                 <h3>Screenshot:</h3>
-                <img class="screenshot" src="file://{page["screenshot_path"]}" alt="Screenshot of {page["url"]}">
+                <img class="screenshot" src="file://{screenshot}" alt="Screenshot of {page["url"]}">
                 """
             
             # Add links section
@@ -2127,95 +6377,768 @@ class ElysianLens:
     
     async def generate_site_map(self, session_id):
         """Generate a site map for a scraping session"""
+        return await asyncio.to_thread(self._generate_site_map, session_id)
+    
+    def _generate_site_map(self, session_id):
         conn = sqlite3.connect(self.scraper.db_path)
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
-        # Get session info
-        cursor.execute("SELECT * FROM scrape_sessions WHERE id = ?", (session_id,))
-        session = cursor.fetchone()
+        # Get session info
+        cursor.execute("SELECT * FROM scrape_sessions WHERE id = ?", (session_id,))
+        session = cursor.fetchone()
+        
+        if not session:
+            logger.error(f"Session ID {session_id} not found")
+            conn.close()
+            return None
+        
+        # Get pages and links
+        cursor.execute("""
+        SELECT p.id, p.url, p.title, l.target_url, l.is_internal
+        FROM pages p
+        LEFT JOIN links l ON p.id = l.source_page_id
+        WHERE p.session_id = ?
+        """, (session_id,))
+        rows = cursor.fetchall()
+        
+        # Create a site map structure
+        site_map = {}
+        for row in rows:
+            page_id = row["id"]
+            page_url = row["url"]
+            
+            if page_url not in site_map:
+                site_map[page_url] = {
+                    "title": row["title"],
+                    "internal_links": [],
+                    "external_links": []
+                }
+            
+            if row["target_url"]:
+                if row["is_internal"]:
+                    site_map[page_url]["internal_links"].append(row["target_url"])
+                else:
+                    site_map[page_url]["external_links"].append(row["target_url"])
+        
+        # Generate markdown site map
+        markdown_content = f"# Site Map: {session['url']}\n\n"
+        markdown_content += f"- Session ID: {session_id}\n"
+        markdown_content += f"- Pages Scraped: {session['pages_scraped']}\n"
+        markdown_content += f"- Generated: {datetime.now().isoformat()}\n\n"
+        
+        markdown_content += "## Pages\n\n"
+        
+        for url, data in site_map.items():
+            markdown_content += f"### {data['title'] or 'No Title'}\n"
+            markdown_content += f"- URL: {url}\n"
+            
+            if data["internal_links"]:
+                markdown_content += f"- Internal Links ({len(data['internal_links'])}):\n"
+                for link in sorted(set(data["internal_links"]))[:10]:  # Limit to 10 internal links
+                    markdown_content += f"  - {link}\n"
+                if len(data["internal_links"]) > 10:
+                    markdown_content += f"  - ... and {len(data['internal_links']) - 10} more\n"
+            
+            if data["external_links"]:
+                markdown_content += f"- External Links ({len(data['external_links'])}):\n"
+                for link in sorted(set(data["external_links"]))[:5]:  # Limit to 5 external links
+                    markdown_content += f"  - {link}\n"
+                if len(data["external_links"]) > 5:
+                    markdown_content += f"  - ... and {len(data['external_links']) - 5} more\n"
+            
+            markdown_content += "\n"
+        
+        conn.close()
+        
+        # Save to file
+        sitemap_dir = os.path.join(self.config.data_dir, "exports/text")
+        os.makedirs(sitemap_dir, exist_ok=True)
+        
+        domain = urllib.parse.urlparse(session["url"]).netloc
+        filename = f"sitemap_{domain}_{session_id}.md"
+        sitemap_path = os.path.join(sitemap_dir, filename)
+        
+        with open(sitemap_path, 'w', encoding='utf-8') as f:
+            f.write(markdown_content)
+        
+        logger.info(f"Site map created: {sitemap_path}")
+        return sitemap_path
+
+    async def compute_page_metrics(self, session_id):
+        """Compute link-graph metrics for a session and store them in page_metrics"""
+        def build_and_save():
+            graph = LinkGraph.from_session(self.scraper.db_path, session_id)
+            if graph is None:
+                return None, None
+            return graph, graph.save_metrics(self.scraper.db_path, session_id)
+
+        start_time = time.time()
+        graph, metrics = await asyncio.to_thread(build_and_save)
+
+        if graph is None:
+            logger.error(f"Session ID {session_id} not found")
+            return None
+
+        elapsed = time.time() - start_time
+        logger.info(f"Computed page metrics for session {session_id}: "
+                    f"{graph.num_nodes} nodes, {graph.num_edges} edges in {elapsed:.2f}s")
+
+        return {
+            "session_id": session_id,
+            "nodes": graph.num_nodes,
+            "edges": graph.num_edges,
+            "orphans": int(metrics["is_orphan"].sum()),
+            "components": int(len(np.unique(metrics["component_id"]))),
+            "max_click_depth": int(metrics["click_depth"].max()) if graph.num_nodes else 0,
+            "elapsed": elapsed,
+        }
+
+    async def stage_timings(self, session_id=None, domain=None):
+        """Aggregate page_timings into per-domain, per-stage histograms"""
+        def aggregate():
+            query = "SELECT domain, page_id, stage, seconds FROM page_timings"
+            clauses, params = [], []
+            if session_id is not None:
+                clauses.append("session_id = ?")
+                params.append(session_id)
+            if domain:
+                clauses.append("domain = ?")
+                params.append(domain)
+            if clauses:
+                query += " WHERE " + " AND ".join(clauses)
+            
+            domains = {}
+            conn = sqlite3.connect(self.scraper.db_path)
+            try:
+                for row_domain, page_id, stage, seconds in conn.execute(query, params):
+                    entry = domains.setdefault(row_domain, {
+                        "pages": set(), "total": 0.0, "stages": collections.defaultdict(StageHistogram)
+                    })
+                    entry["pages"].add(page_id)
+                    entry["total"] += seconds
+                    entry["stages"][stage].observe(seconds)
+            finally:
+                conn.close()
+            
+            return {
+                name: {
+                    "pages": len(entry["pages"]),
+                    "total": round(entry["total"], 4),
+                    "stages": {stage: histogram.to_dict() for stage, histogram in sorted(
+                        entry["stages"].items(), key=lambda item: item[1].total, reverse=True
+                    )},
+                }
+                for name, entry in sorted(domains.items(), key=lambda item: item[1]["total"], reverse=True)
+            }
+        
+        return await asyncio.to_thread(aggregate)
+
+    async def run_monitor(self, take_screenshots=False, on_progress=None):
+        """Recrawl the watched URLs that are due as one session and record what changed"""
+        urls = await asyncio.to_thread(self.monitor.due)
+        if not urls:
+            return {"session_id": None, "checked": 0, "pages_scraped": 0, "events": []}
+        
+        logger.info(f"Monitor: checking {len(urls)} due URLs")
+        result = await self.scraper.scrape_url(
+            urls[0], depth=0, max_pages=len(urls), take_screenshots=take_screenshots, extract_pdf=False,
+            on_progress=on_progress, seeds=urls,
+        )
+        events = await asyncio.to_thread(self.monitor.record_check, result["session_id"], urls)
+        return {
+            "session_id": result["session_id"],
+            "checked": len(urls),
+            "pages_scraped": result["pages_scraped"],
+            "events": events,
+        }
+    
+    async def run_monitor_loop(self, stop=None, take_screenshots=False, on_progress=None, on_run=None):
+        """Keep running due monitor checks, sleeping until the next URL is due"""
+        stop = stop or asyncio.Event()
+        poll_interval = float(self.config.get("MONITOR_POLL_INTERVAL", 60))
+        while not stop.is_set():
+            result = await self.run_monitor(take_screenshots, on_progress)
+            if on_run and result["checked"]:
+                on_run(result)
+            if result["checked"] >= self.monitor.batch_size:
+                continue  # more URLs are already due
+            
+            next_due = await asyncio.to_thread(self.monitor.next_due_at)
+            wait = poll_interval if next_due is None else min(poll_interval, max(0.0, next_due - time.time()))
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=wait)
+            except asyncio.TimeoutError:
+                pass
+    
+    async def reextract_text(self, session_ids=None, on_batch=None):
+        """Re-extract text from stored HTML for existing sessions without re-crawling"""
+        return await asyncio.to_thread(
+            self.scraper.content_extractor.reextract, self.scraper.db_path, session_ids, on_batch
+        )
+    
+    async def close(self):
+        """Close the application and release resources"""
+        if self.scraper:
+            await self.scraper.close()
+        await self.proxy_manager.close()
+        if self.metrics_server:
+            await self.metrics_server.stop()
+
+class CrawlDaemon:
+    """Resident job server that keeps one warm ElysianLens instance behind a local HTTP API"""
+    
+    def __init__(self, config=None):
+        self.lens = ElysianLens()
+        self.config = config or self.lens.config
+        self.host = self.config.get("DAEMON_HOST", "127.0.0.1")
+        self.port = int(self.config.get("DAEMON_PORT", 8765))
+        self.socket_path = self.config.get("DAEMON_SOCKET", "") or None
+        self.max_jobs = int(self.config.get("DAEMON_MAX_JOBS", 4))
+        self.concurrency = int(self.config.get("DAEMON_CONCURRENCY", 8))
+        self.history = int(self.config.get("DAEMON_JOB_HISTORY", 1000))
+        self.event_history = int(self.config.get("DAEMON_JOB_EVENTS", 1000))
+        self.job_ttl = float(self.config.get("DAEMON_JOB_TTL", 3600))
+        self.token = self.config.get("DAEMON_TOKEN", "") or None
+        
+        # Host names the API answers to; anything else is a DNS-rebinding attempt (unless bound to all interfaces)
+        self.allowed_hosts = {"127.0.0.1", "localhost", "::1", self.host}
+        
+        self.jobs = {}
+        self.job_slots = None
+        self.runner = None
+        self.started_at = None
+        self._tasks = set()
+    
+    def create_app(self):
+        """Build the aiohttp application exposing the job API"""
+        web_app = web.Application(middlewares=[self._guard])
+        web_app.add_routes([
+            web.get("/health", self.handle_health),
+            web.get("/metrics", self.handle_metrics),
+            web.get("/jobs", self.handle_list_jobs),
+            web.post("/jobs", self.handle_submit_job),
+            web.get("/jobs/{job_id}", self.handle_get_job),
+            web.get("/jobs/{job_id}/events", self.handle_job_events),
+        ])
+        return web_app
+    
+    def _allowed_host(self, host):
+        if self.socket_path or self.host in ("0.0.0.0", "::", ""):
+            return True
+        hostname = urllib.parse.urlsplit(f"//{host}").hostname if host else None
+        return hostname in self.allowed_hosts
+    
+    @web.middleware
+    async def _guard(self, request, handler):
+        """Reject requests a web page in the user's browser could forge"""
+        def error(status, message):
+            return web.json_response({"error": message}, status=status)
+        
+        # Browsers send Origin on cross-site requests and a rebinding attack has a foreign Host
+        origin = request.headers.get("Origin")
+        if not self._allowed_host(request.host) or (origin and not self._allowed_host(urllib.parse.urlsplit(origin).netloc)):
+            return error(403, "forbidden host or origin")
+        if self.token:
+            supplied = request.headers.get("Authorization", "")
+            if not hmac.compare_digest(supplied.encode(), f"Bearer {self.token}".encode()):
+                return error(401, "missing or invalid token")
+        # A cross-site form or no-cors fetch can only send simple content types, never JSON
+        if request.method == "POST" and request.content_type != "application/json":
+            return error(415, "expected application/json")
+        return await handler(request)
+    
+    async def start(self):
+        """Warm up the browser, proxy pool and DB writer, then start listening"""
+        await self.lens.setup()
+        await self.lens.browser_tools.initialize()
+        self.lens.scraper.db_writer.start()
+        
+        # All jobs share one page budget so concurrent scrapes can't oversubscribe the browser
+        self.lens.scraper.page_slots = asyncio.Semaphore(self.concurrency)
+        self.job_slots = asyncio.Semaphore(self.max_jobs)
+        
+        self.runner = web.AppRunner(self.create_app(), access_log=None)
+        await self.runner.setup()
+        if self.socket_path:
+            site = web.UnixSite(self.runner, self.socket_path)
+        else:
+            site = web.TCPSite(self.runner, self.host, self.port)
+        await site.start()
+        
+        self.started_at = time.time()
+        if not self.socket_path and not self.token and self._allowed_host("elsewhere.invalid"):
+            logger.warning(f"Daemon is bound to {self.host} without DAEMON_TOKEN; anyone who can reach it can submit jobs")
+        logger.info(f"Daemon listening on {self.socket_path or f'http://{self.host}:{self.port}'}")
+    
+    async def stop(self):
+        """Cancel running jobs and release all resources"""
+        for task in list(self._tasks):
+            task.cancel()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self.runner:
+            await self.runner.cleanup()
+        await self.lens.close()
+    
+    def submit(self, job_type, params):
+        """Register a job and schedule it; returns the job record"""
+        if job_type not in ElysianLens.JOB_TYPES:
+            raise ValueError(f"Unsupported job type: {job_type}")
+        
+        job = {
+            "id": uuid.uuid4().hex[:12],
+            "type": job_type,
+            "params": params,
+            "status": "queued",
+            "created_at": time.time(),
+            "started_at": None,
+            "finished_at": None,
+            "result": None,
+            "error": None,
+            # Only the most recent events are replayed; a long crawl would otherwise grow without bound
+            "events": collections.deque(maxlen=self.event_history),
+            "listeners": set(),
+        }
+        self.jobs[job["id"]] = job
+        self._prune_history()
+        
+        task = asyncio.create_task(self._run_job(job))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job
+    
+    def _prune_history(self):
+        """Forget the oldest finished jobs beyond the history limit"""
+        excess = len(self.jobs) - self.history
+        if excess <= 0:
+            return
+        for job_id in [job_id for job_id, job in self.jobs.items() if job["finished_at"]][:excess]:
+            del self.jobs[job_id]
+    
+    def _emit(self, job, event):
+        event.setdefault("ts", round(time.time(), 3))
+        event["job_id"] = job["id"]
+        job["events"].append(event)
+        for listener in job["listeners"]:
+            listener.put_nowait(event)
+    
+    async def _run_job(self, job):
+        async with self.job_slots:
+            job["status"] = "running"
+            job["started_at"] = time.time()
+            self._emit(job, {"event": "job_started", "type": job["type"]})
+            
+            try:
+                job["result"] = await self._execute(job)
+                job["status"] = "completed"
+            except asyncio.CancelledError:
+                job["status"] = "cancelled"
+                raise
+            except Exception as e:
+                job["status"] = "failed"
+                job["error"] = str(e)
+                logger.error(f"Daemon job {job['id']} failed: {e}")
+            finally:
+                job["finished_at"] = time.time()
+                self._emit(job, {
+                    "event": "job_finished",
+                    "status": job["status"],
+                    "result": job["result"],
+                    "error": job["error"],
+                    "elapsed": round(job["finished_at"] - job["started_at"], 3),
+                })
+                self._prune_history()
+                if self.job_ttl > 0:
+                    # Finished jobs are only kept around for polling and event replay
+                    asyncio.get_running_loop().call_later(self.job_ttl, self.jobs.pop, job["id"], None)
+    
+    async def _execute(self, job):
+        return await self.lens.run_job(
+            job["type"], job["params"], on_progress=lambda event: self._emit(job, event)
+        )
+    
+    @staticmethod
+    def _public(job):
+        return {key: value for key, value in job.items() if key not in ("events", "listeners")}
+    
+    def _lookup(self, request):
+        job = self.jobs.get(request.match_info["job_id"])
+        if job is None:
+            raise web.HTTPNotFound(text=json.dumps({"error": "job not found"}), content_type="application/json")
+        return job
+    
+    async def handle_health(self, request):
+        statuses = {}
+        for job in self.jobs.values():
+            statuses[job["status"]] = statuses.get(job["status"], 0) + 1
+        return web.json_response({
+            "status": "ok",
+            "version": APP_VERSION,
+            "uptime": round(time.time() - self.started_at, 3) if self.started_at else 0.0,
+            "jobs": statuses,
+            "healthy_proxies": self.lens.proxy_manager.pool.healthy_count(),
+            "browser_contexts": self.lens.browser_tools.open_contexts(),
+            "db_queue": self.lens.scraper.db_writer.pending(),
+        })
+    
+    async def handle_metrics(self, request):
+        body = self.lens.metrics.render()
+        return web.Response(body=body.encode(), headers={"Content-Type": MetricsServer.CONTENT_TYPE})
+    
+    async def handle_list_jobs(self, request):
+        return web.json_response([self._public(job) for job in self.jobs.values()])
+    
+    async def handle_get_job(self, request):
+        return web.json_response(self._public(self._lookup(request)))
+    
+    async def handle_submit_job(self, request):
+        try:
+            body = await request.json()
+            params = body.get("params", {})
+            if not isinstance(params, dict):
+                raise ValueError("params must be a JSON object")
+            job = self.submit(body.get("type", "scrape"), params)
+        except (ValueError, AttributeError) as e:
+            return web.json_response({"error": str(e)}, status=400)
+        return web.json_response(self._public(job), status=202)
+    
+    async def handle_job_events(self, request):
+        """Stream a job's events as NDJSON, replaying history before following live"""
+        job = self._lookup(request)
+        response = web.StreamResponse(headers={"Content-Type": "application/x-ndjson"})
+        await response.prepare(request)
+        
+        listener = asyncio.Queue()
+        backlog = list(job["events"])
+        if not job["finished_at"]:
+            job["listeners"].add(listener)
+        
+        try:
+            for event in backlog:
+                await response.write((json.dumps(event) + "\n").encode())
+            
+            # job_finished is always the last event a job emits
+            last = backlog[-1]["event"] if backlog else None
+            while last != "job_finished":
+                event = await listener.get()
+                await response.write((json.dumps(event) + "\n").encode())
+                last = event["event"]
+        finally:
+            job["listeners"].discard(listener)
+        
+        await response.write_eof()
+        return response
+    
+    async def serve_forever(self):
+        """Run until SIGINT or SIGTERM"""
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, stop.set)
+        
+        await self.start()
+        try:
+            await stop.wait()
+        finally:
+            await self.stop()
+
+class SyntheticSite:
+    """Deterministic generated website served from a child process for crawl benchmarks"""
+    
+    WORDS = (
+        "lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor incididunt "
+        "ut labore et dolore magna aliqua enim minim veniam quis nostrud exercitation ullamco"
+    ).split()
+    
+    def __init__(self, pages=200, links_per_page=10, page_kb=20, js_fraction=0.2, slow_fraction=0.05,
+                 slow_delay=1.0, seed=42, host="127.0.0.1", port=0):
+        self.pages = pages
+        self.links_per_page = links_per_page
+        self.page_kb = page_kb
+        self.js_fraction = js_fraction
+        self.slow_fraction = slow_fraction
+        self.slow_delay = slow_delay
+        self.seed = seed
+        self.host = host
+        self.port = port
+        self._rendered = {}
+        self._process = None
+    
+    @property
+    def base_url(self):
+        return f"http://{self.host}:{self.port}"
+    
+    def params(self):
+        return {
+            "pages": self.pages,
+            "links_per_page": self.links_per_page,
+            "page_kb": self.page_kb,
+            "js_fraction": self.js_fraction,
+            "slow_fraction": self.slow_fraction,
+            "slow_delay": self.slow_delay,
+            "seed": self.seed,
+        }
+    
+    def render(self, index):
+        """Build page HTML; returns (html, is_slow). Every page links to the next so all are reachable"""
+        if index in self._rendered:
+            return self._rendered[index]
+        
+        rng = random.Random(self.seed * 1_000_003 + index)
+        targets = {(index + 1) % self.pages}
+        while len(targets) < min(self.links_per_page, self.pages):
+            targets.add(rng.randrange(self.pages))
+        links = "".join(f'<li><a href="/p/{target}">Page {target}</a></li>' for target in sorted(targets))
         
-        if not session:
-            logger.error(f"Session ID {session_id} not found")
-            conn.close()
-            return None
+        paragraphs = []
+        size = 0
+        while size < self.page_kb * 1024:
+            paragraph = " ".join(rng.choices(self.WORDS, k=80))
+            paragraphs.append(f"<p>{paragraph}</p>")
+            size += len(paragraph) + 7
+        content = f"<article><h1>Page {index}</h1>{''.join(paragraphs)}</article><nav><ul>{links}</ul></nav>"
         
-        # Get pages and links
-        cursor.execute("""
-        SELECT p.id, p.url, p.title, l.target_url, l.is_internal
-        FROM pages p
-        LEFT JOIN links l ON p.id = l.source_page_id
-        WHERE p.session_id = ?
-        """, (session_id,))
-        rows = cursor.fetchall()
+        if rng.random() < self.js_fraction:
+            # Client-rendered page: nothing useful until the script runs
+            body = f'<div id="root"></div><script>document.getElementById("root").innerHTML = {json.dumps(content)};</script>'
+        else:
+            body = content
         
-        # Create a site map structure
-        site_map = {}
-        for row in rows:
-            page_id = row["id"]
-            page_url = row["url"]
-            
-            if page_url not in site_map:
-                site_map[page_url] = {
-                    "title": row["title"],
-                    "internal_links": [],
-                    "external_links": []
-                }
-            
-            if row["target_url"]:
-                if row["is_internal"]:
-                    site_map[page_url]["internal_links"].append(row["target_url"])
+        html = (
+            f"<!DOCTYPE html><html><head><title>Synthetic page {index}</title>"
+            f'<link rel="stylesheet" href="/static/site.css"><script src="/static/app.js"></script>'
+            f"</head><body>{body}</body></html>"
+        )
+        self._rendered[index] = (html, rng.random() < self.slow_fraction)
+        return self._rendered[index]
+    
+    def create_app(self):
+        async def page(request):
+            try:
+                index = int(request.match_info["index"])
+            except ValueError:
+                raise web.HTTPNotFound()
+            if not 0 <= index < self.pages:
+                raise web.HTTPNotFound()
+            html, slow = self.render(index)
+            if slow:
+                await asyncio.sleep(self.slow_delay)
+            return web.Response(text=html, content_type="text/html")
+        
+        async def asset(request):
+            name = request.match_info["name"]
+            if name == "site.css":
+                body, content_type = "body { font-family: sans-serif; } " * 200, "text/css"
+            elif name == "app.js":
+                body, content_type = "window.synthetic = true;\n" * 400, "application/javascript"
+            else:
+                raise web.HTTPNotFound()
+            return web.Response(text=body, content_type=content_type, headers={"Cache-Control": "max-age=3600"})
+        
+        async def index(request):
+            raise web.HTTPFound("/p/0")
+        
+        web_app = web.Application()
+        web_app.add_routes([
+            web.get("/", index),
+            web.get("/p/{index}", page),
+            web.get("/static/{name}", asset),
+        ])
+        return web_app
+    
+    READY_PREFIX = "SYNTHETIC_SITE_PORT="
+    
+    @property
+    def pid(self):
+        return self._process.pid if self._process else None
+    
+    async def serve(self):
+        """Serve the site until cancelled, announcing the bound port on stdout"""
+        runner = web.AppRunner(self.create_app(), access_log=None)
+        await runner.setup()
+        await web.TCPSite(runner, self.host, self.port).start()
+        print(f"{self.READY_PREFIX}{runner.addresses[0][1]}", flush=True)
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await runner.cleanup()
+    
+    def start(self):
+        """Serve the site from a child process so it shares neither the crawler's GIL nor its RSS"""
+        self._process = subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), "synthetic-site",
+             "--params", json.dumps(self.params()), "--host", self.host, "--port", str(self.port)],
+            stdout=subprocess.PIPE, text=True,
+        )
+        # Startup logging may share stdout; wait for the announcement line
+        for line in self._process.stdout:
+            if line.startswith(self.READY_PREFIX):
+                self.port = int(line[len(self.READY_PREFIX):])
+                return self.base_url
+        self._process.wait()
+        raise RuntimeError(f"Synthetic site exited with status {self._process.returncode} before serving")
+    
+    def stop(self):
+        if self._process and self._process.poll() is None:
+            self._process.terminate()
+            try:
+                self._process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self._process.kill()
+                self._process.wait()
+        if self._process:
+            self._process.stdout.close()
+        self._process = None
+
+class CrawlBenchmark:
+    """Crawls a SyntheticSite at several concurrency levels and reports throughput, latency, DB size and RSS"""
+    
+    def __init__(self, site, levels=(1, 4, 16), take_screenshots=False, workdir=None):
+        self.site = site
+        self.levels = list(levels)
+        self.take_screenshots = take_screenshots
+        self.workdir = workdir
+    
+    @staticmethod
+    @contextmanager
+    def _environ(overrides):
+        previous = {key: os.environ.get(key) for key in overrides}
+        os.environ.update(overrides)
+        try:
+            yield
+        finally:
+            for key, value in previous.items():
+                if value is None:
+                    os.environ.pop(key, None)
                 else:
-                    site_map[page_url]["external_links"].append(row["target_url"])
+                    os.environ[key] = value
+    
+    async def run(self):
+        """Run every level against a freshly started site and return the machine-readable results"""
+        workdir = self.workdir or tempfile.mkdtemp(prefix="elysian_bench_")
+        os.makedirs(workdir, exist_ok=True)
+        self.site.start()
+        try:
+            levels = []
+            for concurrency in self.levels:
+                levels.append(await self._run_level(concurrency, workdir))
+        finally:
+            self.site.stop()
+            if not self.workdir:
+                shutil.rmtree(workdir, ignore_errors=True)
         
-        # Generate markdown site map
-        markdown_content = f"# Site Map: {session['url']}\n\n"
-        markdown_content += f"- Session ID: {session_id}\n"
-        markdown_content += f"- Pages Scraped: {session['pages_scraped']}\n"
-        markdown_content += f"- Generated: {datetime.now().isoformat()}\n\n"
+        return {
+            "benchmark": "crawl",
+            "version": APP_VERSION,
+            "timestamp": datetime.now().isoformat(),
+            "python": sys.version.split()[0],
+            "platform": sys.platform,
+            "cpu_count": os.cpu_count(),
+            "site": self.site.params(),
+            "take_screenshots": self.take_screenshots,
+            "levels": levels,
+        }
+    
+    async def _run_level(self, concurrency, workdir):
+        db_path = os.path.join(workdir, f"bench_c{concurrency}.db")
+        overrides = {
+            "SCRAPE_DB_PATH": db_path,
+            "HTTP_CACHE_DIR": os.path.join(workdir, f"cache_c{concurrency}"),
+            "ELYSIAN_DATA_DIR": os.path.join(workdir, f"data_c{concurrency}"),
+            "ARCHIVE_MODE": "off",
+            "HOST_INITIAL_CONCURRENCY": str(concurrency),
+            "HOST_MAX_CONCURRENCY": str(concurrency),
+            "ADAPTIVE_CONCURRENCY": "true",
+            "DEFAULT_CRAWL_DELAY": "0",
+            "USE_PROXIES": "false",
+        }
+        latencies = []
+        errors = collections.Counter()
         
-        markdown_content += "## Pages\n\n"
+        def on_progress(event):
+            if event["event"] == "page" and event.get("duration") is not None:
+                latencies.append(event["duration"])
+            elif event["event"] == "page_error":
+                errors[event.get("error_class", "unknown")] += 1
         
-        for url, data in site_map.items():
-            markdown_content += f"### {data['title'] or 'No Title'}\n"
-            markdown_content += f"- URL: {url}\n"
-            
-            if data["internal_links"]:
-                markdown_content += f"- Internal Links ({len(data['internal_links'])}):\n"
-                for link in sorted(set(data["internal_links"]))[:10]:  # Limit to 10 internal links
-                    markdown_content += f"  - {link}\n"
-                if len(data["internal_links"]) > 10:
-                    markdown_content += f"  - ... and {len(data['internal_links']) - 10} more\n"
-            
-            if data["external_links"]:
-                markdown_content += f"- External Links ({len(data['external_links'])}):\n"
-                for link in sorted(set(data["external_links"]))[:5]:  # Limit to 5 external links
-                    markdown_content += f"  - {link}\n"
-                if len(data["external_links"]) > 5:
-                    markdown_content += f"  - ... and {len(data['external_links']) - 5} more\n"
-            
-            markdown_content += "\n"
+        peak_rss = 0
+        sampling = True
         
-        conn.close()
+        async def sample_rss():
+            nonlocal peak_rss
+            while sampling:
+                peak_rss = max(peak_rss, await asyncio.to_thread(process_tree_rss, None, (self.site.pid,)) or 0)
+                await asyncio.sleep(0.25)
         
-        # Save to file
-        sitemap_dir = os.path.join(self.config.data_dir, "exports/text")
-        os.makedirs(sitemap_dir, exist_ok=True)
+        # Configuration reads the environment on every lookup, so keep the overrides for the whole run
+        with self._environ(overrides):
+            lens = ElysianLens()
+            sampler = asyncio.create_task(sample_rss())
+            try:
+                start_time = time.perf_counter()
+                result = await lens.scrape(
+                    f"{self.site.base_url}/p/0",
+                    depth=self.site.pages,
+                    max_pages=self.site.pages,
+                    take_screenshots=self.take_screenshots,
+                    extract_pdf=False,
+                    on_progress=on_progress,
+                )
+                elapsed = time.perf_counter() - start_time
+            finally:
+                sampling = False
+                await sampler
+                await lens.close()
         
-        domain = urllib.parse.urlparse(session["url"]).netloc
-        filename = f"sitemap_{domain}_{session_id}.md"
-        sitemap_path = os.path.join(sitemap_dir, filename)
+        pages = result["pages_scraped"]
+        db_bytes = sum(os.path.getsize(path) for path in (db_path, db_path + "-wal") if os.path.exists(path))
+        ordered = sorted(latencies)
         
-        with open(sitemap_path, 'w', encoding='utf-8') as f:
-            f.write(markdown_content)
+        def percentile(q):
+            return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))], 4) if ordered else None
         
-        logger.info(f"Site map created: {sitemap_path}")
-        return sitemap_path
-    
-    async def close(self):
-        """Close the application and release resources"""
-        if self.scraper:
-            await self.scraper.close()
+        level = {
+            "concurrency": concurrency,
+            "pages": pages,
+            "elapsed": round(elapsed, 3),
+            "pages_per_second": round(pages / elapsed, 3) if elapsed else 0.0,
+            "latency_p50": percentile(0.50),
+            "latency_p95": percentile(0.95),
+            "db_bytes_per_page": round(db_bytes / pages) if pages else None,
+            "peak_rss_mb": round(peak_rss / (1024 * 1024), 1),
+            "errors": dict(errors),
+            "http_cache": result["stats"]["http_cache"],
+        }
+        logger.info(f"Benchmark level {concurrency}: {level}")
+        return level
+
+def daemon_client_session(config):
+    """Open a client session for the local daemon; returns (session, base_url)"""
+    socket_path = config.get("DAEMON_SOCKET", "") or None
+    token = config.get("DAEMON_TOKEN", "") or None
+    headers = {"Authorization": f"Bearer {token}"} if token else None
+    if socket_path:
+        return aiohttp.ClientSession(connector=aiohttp.UnixConnector(path=socket_path), headers=headers), "http://localhost"
+    host = config.get("DAEMON_HOST", "127.0.0.1")
+    port = int(config.get("DAEMON_PORT", 8765))
+    return aiohttp.ClientSession(headers=headers), f"http://{host}:{port}"
+
+async def daemon_error(response):
+    """Error message of a failed daemon response, which may not be JSON (e.g. a plain 404 page)"""
+    text = await response.text()
+    try:
+        return json.loads(text)["error"]
+    except (ValueError, KeyError, TypeError):
+        return text.strip() or response.reason
+
+def use_archive(record=None, replay=None):
+    """Select record or replay mode for this process (environment settings win over .env)"""
+    if record and replay:
+        raise typer.BadParameter("--record and --replay are mutually exclusive")
+    if record or replay:
+        os.environ["ARCHIVE_MODE"] = "record" if record else "replay"
+        os.environ["ARCHIVE_PATH"] = os.path.abspath(record or replay)
 
 # CLI Application
 app = typer.Typer(help=f"ElysianLens: {APP_DESCRIPTION}")
@@ -2229,8 +7152,11 @@ def scrape_command(
     extract_pdf: bool = typer.Option(True, "--extract-pdf/--no-extract-pdf", help="Extract text from PDF files"),
     report: bool = typer.Option(False, "--report", "-r", help="Generate a PDF report after scraping"),
     sitemap: bool = typer.Option(False, "--sitemap", "-s", help="Generate a site map after scraping"),
+    record: Optional[str] = typer.Option(None, "--record", help="Record all responses into this archive"),
+    replay: Optional[str] = typer.Option(None, "--replay", help="Replay responses from this archive without network"),
 ):
     """Scrape a website with the specified parameters"""
+    use_archive(record, replay)
     console.print(f"[bold {COLORS['primary']}]ElysianLens[/] - Scraping: {url}\n")
     
     async def run_scrape():
@@ -2255,6 +7181,14 @@ def scrape_command(
                 console.print(f"\n[bold {COLORS['success']}]✓[/] Scraping completed:")
                 console.print(f"  Session ID: {result['session_id']}")
                 console.print(f"  Pages scraped: {result['pages_scraped']}")
+                if result["stats"]["retries"] or result["stats"]["failed"]:
+                    console.print(f"  Retries: {result['stats']['retries']}, failed pages: {result['stats']['failed']}")
+                event_loop = result["stats"].get("event_loop")
+                if event_loop and event_loop["stalls"]:
+                    console.print(f"  Event loop stalls: {event_loop['stalls']} ({event_loop['stalled_seconds']}s blocked)")
+                    for hotspot in event_loop["hotspots"][:3]:
+                        console.print(f"    {hotspot['location']} → {hotspot['call']}: "
+                                      f"{hotspot['count']}x, max {hotspot['max_lag']}s")
                 
                 # Generate report if requested
                 if report:
@@ -2285,6 +7219,459 @@ def scrape_command(
     
     asyncio.run(run_scrape())
 
+@app.command("batch")
+def batch_command(
+    source: str = typer.Argument("-", help="File with one seed URL per line ('-' for stdin)"),
+    depth: int = typer.Option(1, "--depth", "-d", help="Crawling depth"),
+    max_pages: int = typer.Option(10, "--max-pages", "-m", help="Maximum number of pages per session"),
+    concurrency: int = typer.Option(8, "--concurrency", "-c", help="Maximum pages in flight across all sessions"),
+    sessions: int = typer.Option(0, "--sessions", "-n", help="Concurrent sessions (defaults to --concurrency)"),
+    screenshots: bool = typer.Option(True, "--screenshots/--no-screenshots", help="Take screenshots of pages"),
+    extract_pdf: bool = typer.Option(True, "--extract-pdf/--no-extract-pdf", help="Extract text from PDF files"),
+    progress_file: str = typer.Option("-", "--progress", "-p", help="JSONL progress output ('-' for stdout)"),
+    record: Optional[str] = typer.Option(None, "--record", help="Record all responses into this archive"),
+    replay: Optional[str] = typer.Option(None, "--replay", help="Replay responses from this archive without network"),
+):
+    """Scrape a list of seed URLs as concurrent sessions with JSONL progress output"""
+    use_archive(record, replay)
+    
+    # Keep stdout clean for JSONL by moving console logging to stderr
+    if progress_file == "-":
+        for handler in logging.getLogger().handlers:
+            if isinstance(handler, logging.StreamHandler) and handler.stream is sys.stdout:
+                handler.setStream(sys.stderr)
+    
+    async def run_batch():
+        app = ElysianLens()
+        await app.setup()
+        
+        input_file = sys.stdin if source == "-" else open(source, 'r', encoding='utf-8')
+        output_file = sys.stdout if progress_file == "-" else open(progress_file, 'a', encoding='utf-8')
+        
+        def emit(event):
+            event["ts"] = round(time.time(), 3)
+            output_file.write(json.dumps(event) + "\n")
+            output_file.flush()
+        
+        try:
+            await app.scrape_batch(
+                input_file, concurrency, sessions or None, depth, max_pages,
+                screenshots, extract_pdf, on_progress=emit
+            )
+        except Exception as e:
+            logger.error(f"Error during batch scrape: {e}")
+            logger.error(traceback.format_exc())
+        finally:
+            await app.close()
+            if input_file is not sys.stdin:
+                input_file.close()
+            if output_file is not sys.stdout:
+                output_file.close()
+    
+    asyncio.run(run_batch())
+
+@app.command("daemon")
+def daemon_command():
+    """Run a resident crawler that accepts jobs over a local HTTP API"""
+    console.print(f"[bold {COLORS['primary']}]ElysianLens[/] - Starting daemon\n")
+    
+    async def run_daemon():
+        daemon = CrawlDaemon()
+        try:
+            await daemon.serve_forever()
+        except Exception as e:
+            console.print(f"[bold {COLORS['error']}]Error:[/] {str(e)}")
+            logger.error(f"Daemon error: {e}")
+            logger.error(traceback.format_exc())
+    
+    asyncio.run(run_daemon())
+
+@app.command("submit")
+def submit_command(
+    job_type: str = typer.Argument(..., help="Job type (scrape, report, sitemap or graph)"),
+    target: str = typer.Argument(..., help="URL for scrape jobs, session ID otherwise"),
+    depth: int = typer.Option(1, "--depth", "-d", help="Crawling depth"),
+    max_pages: int = typer.Option(10, "--max-pages", "-m", help="Maximum number of pages to scrape"),
+    screenshots: bool = typer.Option(True, "--screenshots/--no-screenshots", help="Take screenshots of pages"),
+    extract_pdf: bool = typer.Option(True, "--extract-pdf/--no-extract-pdf", help="Extract text from PDF files"),
+    follow: bool = typer.Option(True, "--follow/--no-follow", help="Stream job events as JSONL until the job finishes"),
+):
+    """Submit a job to a running daemon and stream its progress"""
+    if job_type == "scrape":
+        params = {"url": target, "depth": depth, "max_pages": max_pages,
+                  "screenshots": screenshots, "extract_pdf": extract_pdf}
+    else:
+        params = {"session_id": target}
+    
+    async def run_submit():
+        session, base_url = daemon_client_session(Configuration())
+        async with session:
+            try:
+                async with session.post(f"{base_url}/jobs", json={"type": job_type, "params": params}) as response:
+                    if response.status != 202:
+                        console.print(f"[bold {COLORS['error']}]✗[/] {await daemon_error(response)}")
+                        raise typer.Exit(1)
+                    job = await response.json()
+            except aiohttp.ClientConnectionError:
+                console.print(f"[bold {COLORS['error']}]✗[/] Daemon is not running (start it with 'elysian_lens daemon')")
+                raise typer.Exit(1)
+            
+            if not follow:
+                print(job["id"])
+                return
+            
+            status = None
+            async with session.get(f"{base_url}/jobs/{job['id']}/events", timeout=aiohttp.ClientTimeout(total=None)) as response:
+                if response.status != 200:
+                    console.print(f"[bold {COLORS['error']}]✗[/] {await daemon_error(response)}")
+                    raise typer.Exit(1)
+                async for line in response.content:
+                    sys.stdout.write(line.decode())
+                    sys.stdout.flush()
+                    event = json.loads(line)
+                    if event["event"] == "job_finished":
+                        status = event["status"]
+            
+            if status != "completed":
+                raise typer.Exit(1)
+    
+    asyncio.run(run_submit())
+
+@app.command("enqueue")
+def enqueue_command(
+    source: str = typer.Argument("-", help="File with one seed URL per line ('-' for stdin)"),
+    priority: int = typer.Option(0, "--priority", "-P", help="Job priority (higher runs first)"),
+    depth: int = typer.Option(1, "--depth", "-d", help="Crawling depth"),
+    max_pages: int = typer.Option(10, "--max-pages", "-m", help="Maximum number of pages per session"),
+    screenshots: bool = typer.Option(True, "--screenshots/--no-screenshots", help="Take screenshots of pages"),
+    extract_pdf: bool = typer.Option(True, "--extract-pdf/--no-extract-pdf", help="Extract text from PDF files"),
+    max_attempts: int = typer.Option(0, "--max-attempts", help="Attempts per job (default: JOB_MAX_ATTEMPTS)"),
+):
+    """Add scrape jobs to the persistent job queue for worker processes"""
+    job_queue = ElysianLens().job_queue
+    params = {"depth": depth, "max_pages": max_pages, "screenshots": screenshots, "extract_pdf": extract_pdf}
+    
+    input_file = sys.stdin if source == "-" else open(source, 'r', encoding='utf-8')
+    added = 0
+    try:
+        while True:
+            chunk = [line.strip() for line in itertools.islice(input_file, 1000)]
+            if not chunk:
+                break
+            urls = [url for url in chunk if url.startswith(("http://", "https://"))]
+            if urls:
+                job_queue.enqueue_many(
+                    [("scrape", {"url": url, **params}) for url in urls], priority, max_attempts or None
+                )
+                added += len(urls)
+    finally:
+        if input_file is not sys.stdin:
+            input_file.close()
+    
+    console.print(f"[bold {COLORS['success']}]✓[/] Queued {added} scrape jobs")
+    console.print(f"  Queue: {job_queue.counts()}")
+
+@app.command("worker")
+def worker_command(
+    concurrency: int = typer.Option(0, "--concurrency", "-c", help="Jobs run at once (default: WORKER_CONCURRENCY)"),
+    drain: bool = typer.Option(False, "--drain", help="Exit once the queue has no more jobs"),
+):
+    """Claim and run jobs from the persistent job queue"""
+    console.print(f"[bold {COLORS['primary']}]ElysianLens[/] - Starting worker\n")
+    
+    async def run_worker():
+        app = ElysianLens()
+        await app.setup()
+        
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, stop.set)
+        
+        try:
+            summary = await app.run_worker(concurrency=concurrency or None, drain=drain, stop=stop)
+            console.print(f"\n[bold {COLORS['success']}]✓[/] Worker {summary['worker_id']} finished:")
+            console.print(f"  Completed: {summary['completed']}")
+            console.print(f"  Failed: {summary['failed']}")
+            console.print(f"  Lost leases: {summary['lost']}")
+        except Exception as e:
+            console.print(f"[bold {COLORS['error']}]Error:[/] {str(e)}")
+            logger.error(f"Worker error: {e}")
+            logger.error(traceback.format_exc())
+        finally:
+            await app.close()
+    
+    asyncio.run(run_worker())
+
+monitor_app = typer.Typer(help="Watch URLs for changes with scheduled recrawls")
+app.add_typer(monitor_app, name="monitor")
+
+def read_urls(source):
+    """URLs from arguments, or one per line from a file when given as @file"""
+    urls = []
+    for item in source:
+        if item.startswith("@"):
+            with open(item[1:], 'r', encoding='utf-8') as f:
+                urls.extend(line.strip() for line in f)
+        else:
+            urls.append(item.strip())
+    return [url for url in urls if url.startswith(("http://", "https://"))]
+
+@monitor_app.command("add")
+def monitor_add_command(
+    urls: List[str] = typer.Argument(..., help="URLs to watch (or @file with one URL per line)"),
+    every: Optional[str] = typer.Option(None, "--every", "-e", help="Recrawl interval, e.g. 30m, 6h, 1d (default: MONITOR_DEFAULT_INTERVAL)"),
+    label: Optional[str] = typer.Option(None, "--label", "-l", help="Label for this set of URLs"),
+):
+    """Watch URLs for changes"""
+    watched = read_urls(urls)
+    ElysianLens().monitor.watch(watched, every, label)
+    console.print(f"[bold {COLORS['success']}]✓[/] Watching {len(watched)} URLs")
+
+@monitor_app.command("remove")
+def monitor_remove_command(
+    urls: List[str] = typer.Argument(..., help="URLs to stop watching (or @file with one URL per line)"),
+):
+    """Stop watching URLs"""
+    removed = ElysianLens().monitor.unwatch(read_urls(urls))
+    console.print(f"[bold {COLORS['success']}]✓[/] Stopped watching {removed} URLs")
+
+@monitor_app.command("list")
+def monitor_list_command():
+    """List watched URLs and their schedules"""
+    watched = ElysianLens().monitor.watched()
+    if not watched:
+        console.print(f"[bold {COLORS['warning']}]No watched URLs[/]")
+        return
+    
+    table = Table(title="Watched URLs", box=ROUNDED)
+    table.add_column("URL", style="cyan")
+    table.add_column("Label")
+    table.add_column("Every", justify="right")
+    table.add_column("Last checked")
+    table.add_column("Next due")
+    for entry in watched:
+        last_checked = datetime.fromtimestamp(entry["last_checked"]).strftime("%Y-%m-%d %H:%M") if entry["last_checked"] else "never"
+        table.add_row(
+            entry["url"], entry["label"] or "", f"{entry['interval_seconds'] / 3600:g}h", last_checked,
+            datetime.fromtimestamp(entry["next_due"]).strftime("%Y-%m-%d %H:%M"),
+        )
+    console.print(table)
+
+def print_change_events(events, limit=50):
+    colors = {"added": COLORS["success"], "removed": COLORS["error"], "changed": COLORS["warning"]}
+    for event in events[:limit]:
+        console.print(f"  [{colors.get(event['change_type'], COLORS['info'])}]{event['change_type']:>8}[/] {event['url']}")
+    if len(events) > limit:
+        console.print(f"  ... and {len(events) - limit} more")
+
+@monitor_app.command("run")
+def monitor_run_command(
+    loop: bool = typer.Option(False, "--loop", help="Keep running, recrawling URLs as they become due"),
+    screenshots: bool = typer.Option(False, "--screenshots/--no-screenshots", help="Take screenshots of pages"),
+):
+    """Recrawl the watched URLs that are due and report what changed"""
+    console.print(f"[bold {COLORS['primary']}]ElysianLens[/] - Checking watched URLs\n")
+    
+    def report(result):
+        console.print(f"[bold {COLORS['success']}]✓[/] Session {result['session_id']}: checked {result['checked']} URLs, "
+                      f"{len(result['events'])} changes")
+        print_change_events(result["events"])
+    
+    async def run_monitor():
+        app = ElysianLens()
+        await app.setup()
+        
+        try:
+            if loop:
+                stop = asyncio.Event()
+                event_loop = asyncio.get_running_loop()
+                for sig in (signal.SIGINT, signal.SIGTERM):
+                    event_loop.add_signal_handler(sig, stop.set)
+                await app.run_monitor_loop(stop, screenshots, on_run=report)
+                return
+            
+            result = await app.run_monitor(screenshots)
+            if not result["checked"]:
+                console.print("No watched URLs are due")
+                return
+            report(result)
+        except Exception as e:
+            console.print(f"[bold {COLORS['error']}]Error:[/] {str(e)}")
+            logger.error(f"Monitor error: {e}")
+            logger.error(traceback.format_exc())
+        finally:
+            await app.close()
+    
+    asyncio.run(run_monitor())
+
+@monitor_app.command("diff")
+def monitor_diff_command(
+    old_session_id: int = typer.Argument(..., help="Earlier scraping session ID"),
+    new_session_id: int = typer.Argument(..., help="Later scraping session ID"),
+    record: bool = typer.Option(False, "--record", help="Store the differences as change events"),
+    limit: int = typer.Option(50, "--limit", "-n", help="Maximum URLs to list per change type"),
+):
+    """Compare two scraping sessions by URL and content hash"""
+    diff = ElysianLens().monitor.diff_sessions(old_session_id, new_session_id, record)
+    console.print(f"[bold {COLORS['primary']}]Session {old_session_id} → {new_session_id}[/]: "
+                  f"{len(diff['added'])} added, {len(diff['removed'])} removed, {len(diff['changed'])} changed")
+    print_change_events(
+        [{"change_type": change_type, **row} for change_type in ("added", "removed", "changed") for row in diff[change_type]],
+        limit
+    )
+
+@monitor_app.command("changes")
+def monitor_changes_command(
+    url: Optional[str] = typer.Option(None, "--url", "-u", help="Only show changes to this URL"),
+    limit: int = typer.Option(50, "--limit", "-n", help="Maximum events to show"),
+):
+    """Show the most recent change events"""
+    events = ElysianLens().monitor.changes(url, limit)
+    if not events:
+        console.print(f"[bold {COLORS['warning']}]No change events recorded[/]")
+        return
+    
+    table = Table(title="Change Events", box=ROUNDED)
+    table.add_column("Detected")
+    table.add_column("Change")
+    table.add_column("URL", style="cyan")
+    table.add_column("Session", justify="right")
+    for event in events:
+        table.add_row(event["detected_at"][:19], event["change_type"], event["url"], str(event["session_id"]))
+    console.print(table)
+
+@app.command("stitch")
+def stitch_command(
+    manifest: str = typer.Argument(..., help="Tile manifest.json written by a tiled screenshot"),
+    output: Optional[str] = typer.Option(None, "--output", "-o", help="Output image path"),
+):
+    """Stitch a tiled screenshot into a single image"""
+    try:
+        path = BrowserTools.stitch_tiles(manifest, output)
+        if path:
+            console.print(f"[bold {COLORS['success']}]✓[/] Stitched screenshot: {path}")
+        else:
+            console.print(f"[bold {COLORS['error']}]✗[/] Manifest has no tiles")
+    except Exception as e:
+        console.print(f"[bold {COLORS['error']}]Error:[/] {str(e)}")
+        logger.error(f"Error stitching tiles: {e}")
+
+@app.command("benchmark")
+def benchmark_command(
+    pages: int = typer.Option(200, "--pages", help="Pages in the synthetic site"),
+    links: int = typer.Option(10, "--links", help="Links per page"),
+    page_kb: int = typer.Option(20, "--page-kb", help="Approximate text weight per page in KB"),
+    js_fraction: float = typer.Option(0.2, "--js-fraction", help="Fraction of client-rendered pages"),
+    slow_fraction: float = typer.Option(0.05, "--slow-fraction", help="Fraction of slow pages"),
+    slow_delay: float = typer.Option(1.0, "--slow-delay", help="Delay of slow pages in seconds"),
+    levels: str = typer.Option("1,4,16", "--levels", "-l", help="Comma-separated concurrency levels"),
+    screenshots: bool = typer.Option(False, "--screenshots/--no-screenshots", help="Take screenshots of pages"),
+    seed: int = typer.Option(42, "--seed", help="Site generator seed"),
+    output: str = typer.Option("-", "--output", "-o", help="JSON results file ('-' for stdout)"),
+):
+    """Benchmark crawl throughput against a generated local site"""
+    
+    # Keep stdout clean for the JSON results
+    if output == "-":
+        for handler in logging.getLogger().handlers:
+            if isinstance(handler, logging.StreamHandler) and handler.stream is sys.stdout:
+                handler.setStream(sys.stderr)
+    
+    site = SyntheticSite(pages, links, page_kb, js_fraction, slow_fraction, slow_delay, seed)
+    benchmark = CrawlBenchmark(site, [int(level) for level in levels.split(",") if level.strip()], screenshots)
+    results = asyncio.run(benchmark.run())
+    
+    if output == "-":
+        print(json.dumps(results, indent=2))
+        return
+    
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    
+    table = Table(title="Crawl Benchmark", box=ROUNDED)
+    for column in ("Concurrency", "Pages/s", "p50 (s)", "p95 (s)", "DB bytes/page", "Peak RSS (MB)"):
+        table.add_column(column, justify="right")
+    for level in results["levels"]:
+        table.add_row(
+            str(level["concurrency"]), f"{level['pages_per_second']:.2f}", str(level["latency_p50"]),
+            str(level["latency_p95"]), str(level["db_bytes_per_page"]), f"{level['peak_rss_mb']:.1f}"
+        )
+    console.print(table)
+    console.print(f"[bold {COLORS['success']}]✓[/] Results written to {output}")
+
+@app.command("synthetic-site", hidden=True)
+def synthetic_site_command(
+    params: str = typer.Option("{}", "--params", help="SyntheticSite parameters as JSON"),
+    host: str = typer.Option("127.0.0.1", "--host", help="Interface to bind"),
+    port: int = typer.Option(0, "--port", help="Port to bind (0 picks a free one)"),
+):
+    """Serve a synthetic benchmark site (started by the benchmark command)"""
+    site = SyntheticSite(**json.loads(params), host=host, port=port)
+    try:
+        asyncio.run(site.serve())
+    except KeyboardInterrupt:
+        pass
+
+@app.command("stats")
+def stats_command(
+    session_id: Optional[int] = typer.Option(None, "--session", "-s", help="Only include this scraping session"),
+    domain: Optional[str] = typer.Option(None, "--domain", "-d", help="Only include this domain"),
+    top: int = typer.Option(10, "--top", "-t", help="Number of slowest domains to display"),
+):
+    """Show where page scrape time goes, per domain and stage"""
+    console.print(f"[bold {COLORS['primary']}]ElysianLens[/] - Page timing breakdown\n")
+    
+    async def run_stats():
+        app = None
+        
+        try:
+            # Opening the database can fail too (e.g. an unreadable or outdated file)
+            app = ElysianLens()
+            domains = await app.stage_timings(session_id, domain)
+            if not domains:
+                console.print(f"[bold {COLORS['warning']}]No page timings recorded yet[/]")
+                return
+            
+            for name, entry in list(domains.items())[:top]:
+                table = Table(
+                    title=f"{name} - {entry['pages']} pages, {entry['total']:.2f}s total", box=ROUNDED
+                )
+                table.add_column("Stage", style="cyan")
+                table.add_column("Total (s)", justify="right")
+                table.add_column("Share", justify="right")
+                table.add_column("Mean (ms)", justify="right")
+                table.add_column("p50 (ms)", justify="right")
+                table.add_column("p95 (ms)", justify="right")
+                table.add_column("Max (ms)", justify="right")
+                
+                for stage, histogram in entry["stages"].items():
+                    share = histogram["total"] / entry["total"] if entry["total"] else 0.0
+                    table.add_row(
+                        stage,
+                        f"{histogram['total']:.2f}",
+                        f"{share:.1%}",
+                        f"{histogram['mean'] * 1000:.1f}",
+                        f"≤{histogram['p50'] * 1000:.0f}",
+                        f"≤{histogram['p95'] * 1000:.0f}",
+                        f"{histogram['max'] * 1000:.1f}",
+                    )
+                
+                console.print(table)
+            
+            if len(domains) > top:
+                console.print(f"... and {len(domains) - top} more domains")
+        
+        except Exception as e:
+            console.print(f"[bold {COLORS['error']}]Error:[/] {str(e)}")
+            logger.error(f"Stats error: {e}")
+            logger.error(traceback.format_exc())
+        finally:
+            if app:
+                await app.close()
+    
+    asyncio.run(run_stats())
+
 @app.command("report")
 def report_command(
     session_id: int = typer.Argument(..., help="Scraping session ID"),
@@ -2335,6 +7722,108 @@ def report_command(
     
     asyncio.run(run_report())
 
+@app.command("graph")
+def graph_command(
+    session_id: int = typer.Argument(..., help="Scraping session ID"),
+    top: int = typer.Option(20, "--top", "-t", help="Number of top pages to display"),
+):
+    """Compute link-graph metrics (PageRank, depth, orphans) for a scraping session"""
+    console.print(f"[bold {COLORS['primary']}]ElysianLens[/] - Analyzing link graph for session: {session_id}\n")
+    
+    async def run_graph():
+        app = ElysianLens()
+        
+        try:
+            with console.status("[bold blue]Computing page metrics...", spinner="dots"):
+                summary = await app.compute_page_metrics(session_id)
+            
+            if not summary:
+                console.print(f"[bold {COLORS['error']}]✗[/] Session ID {session_id} not found")
+                return
+            
+            console.print(f"[bold {COLORS['success']}]✓[/] Page metrics computed in {summary['elapsed']:.2f}s:")
+            console.print(f"  Nodes: {summary['nodes']}")
+            console.print(f"  Edges: {summary['edges']}")
+            console.print(f"  Orphan pages: {summary['orphans']}")
+            console.print(f"  Strongly connected components: {summary['components']}")
+            console.print(f"  Max click depth: {summary['max_click_depth']}")
+            
+            conn = sqlite3.connect(app.scraper.db_path)
+            rows = conn.execute(
+                """SELECT url, pagerank, in_degree, click_depth FROM page_metrics
+                   WHERE session_id = ? ORDER BY pagerank DESC LIMIT ?""",
+                (session_id, top)
+            ).fetchall()
+            conn.close()
+            
+            table = Table(title="Top Pages by PageRank", box=ROUNDED)
+            table.add_column("URL", style=COLORS["primary"])
+            table.add_column("PageRank", justify="right")
+            table.add_column("In-links", justify="right")
+            table.add_column("Depth", justify="right")
+            
+            for url, pagerank, in_degree, click_depth in rows:
+                table.add_row(url, f"{pagerank:.6f}", str(in_degree), "-" if click_depth is None else str(click_depth))
+            
+            console.print(table)
+            
+        except Exception as e:
+            console.print(f"[bold {COLORS['error']}]Error:[/] {str(e)}")
+            logger.error(f"Error computing page metrics: {e}")
+            logger.error(traceback.format_exc())
+        
+        finally:
+            await app.close()
+    
+    asyncio.run(run_graph())
+
+@app.command("reextract")
+def reextract_command(
+    session_ids: Optional[List[int]] = typer.Argument(None, help="Session IDs to re-extract (all sessions if omitted)"),
+    workers: int = typer.Option(0, "--workers", "-w", help="Number of extraction processes (default: all cores)"),
+):
+    """Re-extract page text from stored HTML using the offline extractor"""
+    scope = ", ".join(str(s) for s in session_ids) if session_ids else "all sessions"
+    console.print(f"[bold {COLORS['primary']}]ElysianLens[/] - Re-extracting text for: {scope}\n")
+    
+    async def run_reextract():
+        app = ElysianLens()
+        if workers:
+            app.scraper.content_extractor.workers = workers
+        
+        with Progress(
+            SpinnerColumn(),
+            TextColumn("[bold blue]Extracting..."),
+            TextColumn("[progress.description]{task.description}"),
+            TimeElapsedColumn(),
+            console=console
+        ) as progress:
+            task = progress.add_task("Starting...", total=None)
+            
+            try:
+                stats = await app.reextract_text(
+                    session_ids or None,
+                    lambda pages: progress.update(task, description=f"{pages} pages")
+                )
+                
+                console.print(f"\n[bold {COLORS['success']}]✓[/] Re-extraction completed:")
+                console.print(f"  Pages: {stats['pages']}")
+                console.print(f"  HTML processed: {stats['bytes'] / 1e6:.1f} MB")
+                console.print(f"  Elapsed: {stats['elapsed']:.2f}s")
+                console.print(f"  Throughput: {stats['pages_per_second']:.1f} pages/s "
+                              f"({stats['mb_per_second']:.1f} MB/s) on {stats['workers']} workers")
+                console.print(f"  Per-core throughput: {stats['pages_per_core_second']:.1f} pages/s")
+                
+            except Exception as e:
+                console.print(f"[bold {COLORS['error']}]Error:[/] {str(e)}")
+                logger.error(f"Error re-extracting text: {e}")
+                logger.error(traceback.format_exc())
+            
+            finally:
+                await app.close()
+    
+    asyncio.run(run_reextract())
+
 @app.command("interactive")
 def interactive_command():
     """Run ElysianLens in interactive mode"""
@@ -2617,6 +8106,13 @@ main() {
     echo -e "You can now use ElysianLens with the following commands:\n"
     echo -e "${CYAN}$ elysian_lens interactive${RESET} - Launch the interactive mode"
     echo -e "${CYAN}$ elysian_lens scrape https://example.com${RESET} - Scrape a website"
+    echo -e "${CYAN}$ elysian_lens batch urls.txt --concurrency 16${RESET} - Scrape a list of URLs in one run"
+    echo -e "${CYAN}$ elysian_lens daemon${RESET} - Keep a warm crawler running for submitted jobs"
+    echo -e "${CYAN}$ elysian_lens submit scrape https://example.com${RESET} - Run a job on the daemon"
+    echo -e "${CYAN}$ elysian_lens enqueue urls.txt && elysian_lens worker${RESET} - Drain a job queue with workers"
+    echo -e "${CYAN}$ elysian_lens benchmark -l 1,4,16 -o bench.json${RESET} - Benchmark crawl throughput on a synthetic site"
+    echo -e "${CYAN}$ elysian_lens stats --session 1${RESET} - Show where scrape time goes per domain"
+    echo -e "${CYAN}$ elysian_lens monitor add https://example.com --every 6h${RESET} - Watch a page for changes"
     echo -e "${CYAN}$ elysian_lens report 1 --format pdf${RESET} - Generate a report for session ID 1"
     echo -e "${CYAN}$ elysian_lens version${RESET} - Display version information"
     echo -e "\nFor more options, run: ${CYAN}$ elysian_lens --help${RESET}"
@@ -0,0 +1,61 @@
+"""
+Shared fixtures for the ElysianLens application tests.
+
+The application is shipped inside the main.sh installer, so the fixtures
+extract it from there and import it with HOME pointed at a scratch directory.
+"""
+import importlib.util
+import os
+import re
+import sys
+from pathlib import Path
+
+import pytest
+
+INSTALLER = Path(__file__).resolve().parent.parent / "main.sh"
+
+def extract_application(installer, target):
+    """Write the elysian_lens.py heredoc embedded in the installer to target"""
+    source = installer.read_text(encoding="utf-8")
+    match = re.search(r'cat > "\$INSTALL_DIR/elysian_lens\.py" << \'EOF\'\n(.*?)\nEOF\n', source, re.S)
+    target.write_text(match.group(1) + "\n", encoding="utf-8")
+    return target
+
+@pytest.fixture(scope="session")
+def lens(tmp_path_factory):
+    """The ElysianLens application module"""
+    home = tmp_path_factory.mktemp("home")
+    os.environ["HOME"] = str(home)
+    path = extract_application(INSTALLER, tmp_path_factory.mktemp("app") / "elysian_lens.py")
+    
+    spec = importlib.util.spec_from_file_location("elysian_lens", path)
+    module = importlib.util.module_from_spec(spec)
+    # Registered so process pool workers can unpickle functions from it
+    sys.modules[spec.name] = module
+    try:
+        spec.loader.exec_module(module)
+    except SystemExit:
+        del sys.modules[spec.name]
+        pytest.skip("ElysianLens dependencies are not installed")
+    return module
+
+@pytest.fixture
+def config():
+    """Configuration stand-in that returns defaults, with per-test overrides"""
+    class Config:
+        def __init__(self):
+            self.values = {}
+        
+        def get(self, key, default=None):
+            return self.values.get(key, default)
+    
+    return Config()
+
+@pytest.fixture
+def db_path(lens, tmp_path):
+    """Path of a scrape database with the full schema"""
+    path = str(tmp_path / "scrape.db")
+    scraper = lens.Scraper.__new__(lens.Scraper)
+    scraper.db_path = path
+    scraper._init_database()
+    return path
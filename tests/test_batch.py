@@ -0,0 +1,90 @@
+"""
+Tests for batch scraping of seed URL streams.
+"""
+import asyncio
+
+import pytest
+
+class FakeScraper:
+    def __init__(self):
+        self.page_slots = None
+        self.seeds = []
+    
+    async def scrape_url(self, url, depth, max_pages, take_screenshots, extract_pdf, on_progress=None, page_limits=()):
+        await asyncio.sleep(0.01)
+        self.seeds.append(url)
+        return {"pages_scraped": 2}
+
+def make_lens(lens):
+    app = lens.ElysianLens.__new__(lens.ElysianLens)
+    app.scraper = FakeScraper()
+    return app
+
+def test_batch_deduplicates_and_counts(lens):
+    """Seeds are deduplicated and invalid lines counted; blank lines and comments are ignored."""
+    app = make_lens(lens)
+    urls = ["https://a/", "https://b/", "https://a/", "# comment", "", "ftp://c/"]
+    summary = asyncio.run(app.scrape_batch(urls, concurrency=2))
+    
+    assert sorted(app.scraper.seeds) == ["https://a/", "https://b/"]
+    assert (summary["seeds"], summary["duplicates"], summary["invalid"], summary["pages"]) == (2, 1, 1, 4)
+    assert app.scraper.page_slots is None
+
+def test_producer_failure_cancels_consumers(lens):
+    """A failing seed source raises promptly instead of leaving consumers waiting forever."""
+    def urls():
+        yield "https://a/"
+        raise OSError("read failed")
+    
+    async def run():
+        app = make_lens(lens)
+        with pytest.raises(OSError):
+            await asyncio.wait_for(app.scrape_batch(urls(), concurrency=3), timeout=5)
+        await asyncio.sleep(0)
+        return [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+    
+    assert asyncio.run(run()) == []
+
+class PagedScraper:
+    """Scraper stand-in that fetches several pages per session through the real page slots"""
+    def __init__(self, lens, page_slots=None):
+        self.page_slots = page_slots
+        self._page_slot = lens.Scraper._page_slot.__get__(self)
+        self.in_flight = {}
+        self.peak = {}
+        self.peak_total = 0
+    
+    async def fetch(self, url, page_limits):
+        async with self._page_slot(page_limits):
+            self.in_flight[url] = self.in_flight.get(url, 0) + 1
+            self.peak[url] = max(self.peak.get(url, 0), self.in_flight[url])
+            self.peak_total = max(self.peak_total, sum(self.in_flight.values()))
+            await asyncio.sleep(0.01)
+            self.in_flight[url] -= 1
+    
+    async def scrape_url(self, url, depth, max_pages, take_screenshots, extract_pdf, on_progress=None, page_limits=()):
+        await asyncio.gather(*(self.fetch(url, page_limits) for _ in range(6)))
+        return {"pages_scraped": 6}
+
+def test_sessions_share_the_page_budget_fairly(lens):
+    """Each session is capped at its share of the batch's page budget."""
+    app = lens.ElysianLens.__new__(lens.ElysianLens)
+    app.scraper = PagedScraper(lens)
+    summary = asyncio.run(app.scrape_batch(["https://a/", "https://b/", "https://c/"], concurrency=4, sessions=2))
+    
+    assert summary["pages"] == 18
+    assert max(app.scraper.peak.values()) == 2
+    assert app.scraper.peak_total == 4
+
+def test_batch_stays_under_the_shared_page_budget(lens):
+    """A batch inside the daemon keeps its shared page budget instead of replacing it."""
+    async def run():
+        app = lens.ElysianLens.__new__(lens.ElysianLens)
+        shared = asyncio.Semaphore(3)
+        app.scraper = PagedScraper(lens, page_slots=shared)
+        await app.scrape_batch(["https://a/", "https://b/"], concurrency=8, sessions=2)
+        return app.scraper, shared
+    
+    scraper, shared = asyncio.run(run())
+    assert scraper.page_slots is shared
+    assert scraper.peak_total == 3
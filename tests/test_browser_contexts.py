@@ -0,0 +1,137 @@
+"""
+Tests for per-proxy browser context leasing in BrowserTools.
+"""
+import asyncio
+
+class FakeContext:
+    def __init__(self, proxy):
+        self.proxy = proxy
+        self.closed = False
+        self.pages = []
+    
+    async def new_page(self):
+        page = FakePage(self)
+        self.pages.append(page)
+        return page
+    
+    async def close(self):
+        assert not [page for page in self.pages if not page.closed], "context closed under a live page"
+        self.closed = True
+
+class FakePage:
+    def __init__(self, context):
+        self.context = context
+        self.closed = False
+        self.handlers = {}
+    
+    def on(self, event, handler):
+        self.handlers.setdefault(event, []).append(handler)
+    
+    async def route(self, pattern, handler):
+        pass
+    
+    def close(self):
+        self.closed = True
+        for handler in self.handlers.get("close", []):
+            handler(self)
+
+class FakeBrowser:
+    def __init__(self):
+        self.contexts = []
+    
+    async def new_context(self, proxy=None, **options):
+        context = FakeContext(proxy and proxy["server"])
+        self.contexts.append(context)
+        return context
+
+class FakeProxyManager:
+    def __init__(self, lens, proxies):
+        self.use_proxies = True
+        self.rotation_interval = 300
+        self.pool = lens.ProxyPool()
+        for proxy in proxies:
+            self.pool.add(proxy, 0.1)
+    
+    def get_next_proxy(self):
+        return self.pool.select()
+
+def make_tools(lens, config, proxies, max_contexts=16):
+    config.values.update({"HTTP_CACHE": "false", "STEALTH_MODE": "false", "BROWSER_MAX_CONTEXTS": max_contexts})
+    tools = lens.BrowserTools(config, FakeProxyManager(lens, proxies))
+    tools.browser = FakeBrowser()
+    return tools
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+def test_direct_context_does_not_inherit_placeholder(lens, config):
+    """Direct traffic only overrides the launch proxy when a placeholder was set."""
+    tools = make_tools(lens, config, [])
+    assert tools._context_proxy(None) is None
+    tools.launch_proxy = {"server": "http://per-context"}
+    assert tools._context_proxy(None) == {"server": "direct://"}
+    assert tools._context_proxy("http://p:1") == {"server": "http://p:1"}
+
+def test_empty_pool_falls_back_to_direct_context(lens, config):
+    """With no healthy proxy, pages come from the default direct context."""
+    async def run():
+        tools = make_tools(lens, config, ["http://p:1"])
+        tools.context = await tools._create_context()
+        tools.proxy_manager.pool.evict("http://p:1")
+        page = await tools.new_page()
+        return tools, page
+    
+    tools, page = asyncio.run(run())
+    assert page.context is tools.context and page.context.proxy is None
+    assert tools.direct_fallback
+
+def test_evicted_proxy_context_is_not_released_again(lens, config):
+    """A retired context is closed after its last page and never leased again."""
+    async def run():
+        tools = make_tools(lens, config, ["http://p:1"])
+        first = await tools.new_page()
+        tools.proxy_manager.pool.evict("http://p:1")
+        tools.proxy_manager.pool.restore("http://p:1", 0.1)
+        
+        second = await tools.new_page()
+        assert second.context is not first.context
+        first.close()
+        await settle()
+        return first, second, tools
+    
+    first, second, tools = asyncio.run(run())
+    assert first.context.closed and not second.context.closed
+    assert tools.open_contexts() == 1
+
+def test_contexts_are_bounded_when_all_busy(lens, config):
+    """When every context holds pages, new pages share one instead of opening more."""
+    proxies = [f"http://p:{i}" for i in range(6)]
+    
+    async def run():
+        tools = make_tools(lens, config, proxies, max_contexts=2)
+        pages = [await tools.new_page() for _ in range(12)]
+        return tools, pages
+    
+    tools, pages = asyncio.run(run())
+    assert tools.open_contexts() == 2
+    assert len(tools.browser.contexts) == 2
+    assert all(tools.proxy_for_page(page) == page.context.proxy for page in pages)
+
+def test_recycle_waits_for_busy_contexts(lens, config):
+    """Recycling retires busy contexts and closes them once their pages finish."""
+    async def run():
+        tools = make_tools(lens, config, ["http://p:1"])
+        tools.context = await tools._create_context()
+        page = await tools.new_page()
+        await tools.recycle_contexts()
+        assert not page.context.closed
+        
+        replacement = await tools.new_page()
+        page.close()
+        await settle()
+        return page, replacement, tools
+    
+    page, replacement, tools = asyncio.run(run())
+    assert page.context.closed
+    assert replacement.context is not page.context and not replacement.context.closed
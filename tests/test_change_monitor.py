@@ -0,0 +1,122 @@
+"""
+Tests for interval parsing and the ChangeMonitor.
+"""
+import sqlite3
+import time
+
+import pytest
+
+@pytest.fixture
+def monitor(lens, config, db_path):
+    return lens.ChangeMonitor(config, db_path)
+
+def new_session(monitor, pages=(), failures=()):
+    """Store a session with (url, content_hash, status_code) pages and finally failed URLs"""
+    with sqlite3.connect(monitor.db_path) as conn:
+        session_id = conn.execute(
+            "INSERT INTO scrape_sessions (url, timestamp, status) VALUES ('https://a/', 't', 'completed')"
+        ).lastrowid
+        conn.executemany(
+            "INSERT INTO pages (session_id, url, content_hash, status_code, timestamp) VALUES (?, ?, ?, ?, 't')",
+            [(session_id, url, content_hash, status) for url, content_hash, status in pages]
+        )
+        conn.executemany(
+            """INSERT INTO page_failures (session_id, url, attempt, error_class, final, timestamp)
+               VALUES (?, ?, 3, 'timeout', 1, 't')""",
+            [(session_id, url) for url in failures]
+        )
+    return session_id
+
+def events(monitor, session_id, urls):
+    return [(event["url"], event["change_type"]) for event in monitor.record_check(session_id, urls)]
+
+@pytest.mark.parametrize("value, seconds", [
+    ("90", 90), (45, 45), ("30m", 1800), ("6h", 21600), ("1d", 86400), ("2w", 1209600), (" 1.5H ", 5400),
+])
+def test_parse_interval(lens, value, seconds):
+    """Intervals accept plain seconds and s/m/h/d/w suffixes."""
+    assert lens.parse_interval(value) == seconds
+
+def test_parse_interval_rejects_garbage(lens):
+    """Unknown units are an error rather than a silent default."""
+    with pytest.raises(ValueError):
+        lens.parse_interval("5y")
+
+def test_watch_schedules_new_urls_immediately(monitor):
+    """New URLs are due at once; re-watching keeps the earlier due time."""
+    monitor.watch(["https://a/1", "https://a/2"], "1h", "docs")
+    assert sorted(monitor.due()) == ["https://a/1", "https://a/2"]
+    
+    monitor.watch(["https://a/1"], "2h")
+    entry = {e["url"]: e for e in monitor.watched()}["https://a/1"]
+    assert entry["interval_seconds"] == 7200 and entry["label"] == "docs"
+    assert monitor.unwatch(["https://a/2", "https://a/9"]) == 1
+
+def test_record_check_added_changed_removed(monitor):
+    """Hashes are compared against the last successful check."""
+    urls = ["https://a/1", "https://a/2"]
+    monitor.watch(urls, "1h")
+    
+    first = new_session(monitor, [("https://a/1", "h1", 200), ("https://a/2", "h2", 200)])
+    assert events(monitor, first, urls) == [("https://a/1", "added"), ("https://a/2", "added")]
+    
+    second = new_session(monitor, [("https://a/1", "h1b", 200), ("https://a/2", "h2", 200)])
+    assert events(monitor, second, urls) == [("https://a/1", "changed")]
+    
+    third = new_session(monitor, [("https://a/1", "h1b", 200), ("https://a/2", "nf", 404)])
+    assert events(monitor, third, urls) == [("https://a/2", "removed")]
+    assert not monitor.due()
+
+def test_record_check_ignores_transient_failures(monitor):
+    """A failed check reschedules the URL without touching its known hash."""
+    urls = ["https://a/1", "https://a/2"]
+    monitor.watch(urls, "1h")
+    first = new_session(monitor, [("https://a/1", "h1", 200), ("https://a/2", "h2", 200)])
+    events(monitor, first, urls)
+    
+    failed = new_session(monitor, [("https://a/2", "err", 503)], failures=["https://a/1"])
+    assert events(monitor, failed, urls) == []
+    
+    recovered = new_session(monitor, [("https://a/1", "h1", 200), ("https://a/2", "h2", 200)])
+    assert events(monitor, recovered, urls) == []
+    
+    state = {e["url"]: e for e in monitor.watched()}
+    assert state["https://a/1"]["last_content_hash"] == "h1"
+    assert state["https://a/1"]["last_session_id"] == recovered
+    assert state["https://a/1"]["next_due"] > time.time()
+
+def test_diff_sessions(monitor):
+    """Sessions are compared by URL and content hash."""
+    old = new_session(monitor, [("https://a/1", "h1", 200), ("https://a/2", "h2", 200), ("https://a/3", "h3", 200)])
+    new = new_session(monitor, [("https://a/1", "h1", 200), ("https://a/2", "h2b", 200), ("https://a/4", "h4", 200)],
+                      failures=["https://a/3"])
+    diff = monitor.diff_sessions(old, new)
+    
+    assert diff["added"] == [{"url": "https://a/4", "new_hash": "h4"}]
+    assert diff["changed"] == [{"url": "https://a/2", "old_hash": "h2", "new_hash": "h2b"}]
+    assert diff["removed"] == []
+    
+    later = new_session(monitor, [("https://a/1", "h1", 200), ("https://a/2", "gone", 404), ("https://a/4", "err", 500)])
+    diff = monitor.diff_sessions(new, later, record=True)
+    assert diff["removed"] == [{"url": "https://a/2", "old_hash": "h2b"}]
+    assert diff["changed"] == [] and diff["added"] == []
+    assert [e["change_type"] for e in monitor.changes()] == ["removed"]
+    assert monitor.changes("https://a/2", limit=5)[0]["old_hash"] == "h2b"
+
+def test_diff_sessions_ignores_unreached_urls(monitor):
+    """URLs the new crawl didn't reach are neither removed nor changed."""
+    old = new_session(monitor, [("https://a/1", "h1", 200), ("https://a/deep", "h2", 200), ("https://a/late", "h3", 200)])
+    # A smaller page budget or a changed link order leaves two old URLs unvisited
+    new = new_session(monitor, [("https://a/1", "h1", 200)])
+    assert monitor.diff_sessions(old, new) == {
+        "old_session_id": old, "new_session_id": new, "added": [], "removed": [], "changed": [],
+    }
+
+def test_diff_sessions_reports_gone_pages_as_removed(monitor):
+    """A page that now answers 404 or 410 is removed, not changed; one that comes back is added."""
+    old = new_session(monitor, [("https://a/1", "h1", 200), ("https://a/2", "h2", 200), ("https://a/3", "x", 404)])
+    new = new_session(monitor, [("https://a/1", "404page", 404), ("https://a/2", "410page", 410), ("https://a/3", "h3", 200)])
+    diff = monitor.diff_sessions(old, new)
+    assert sorted(row["url"] for row in diff["removed"]) == ["https://a/1", "https://a/2"]
+    assert diff["changed"] == []
+    assert diff["added"] == [{"url": "https://a/3", "new_hash": "h3"}]
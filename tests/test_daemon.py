@@ -0,0 +1,136 @@
+"""
+Tests for CrawlDaemon job bookkeeping.
+"""
+import asyncio
+
+import pytest
+from aiohttp.test_utils import TestClient, TestServer
+
+@pytest.fixture
+def make_daemon(lens):
+    def make(event_history=1000, job_ttl=3600, history=1000, events_per_job=0):
+        daemon = lens.CrawlDaemon.__new__(lens.CrawlDaemon)
+        daemon.host = "127.0.0.1"
+        daemon.socket_path = None
+        daemon.token = None
+        daemon.allowed_hosts = {"127.0.0.1", "localhost", "::1"}
+        daemon.history = history
+        daemon.event_history = event_history
+        daemon.job_ttl = job_ttl
+        daemon.jobs = {}
+        daemon._tasks = set()
+        daemon.job_slots = asyncio.Semaphore(4)
+
+        async def execute(job):
+            for i in range(events_per_job):
+                daemon._emit(job, {"event": "page", "index": i})
+            return {"pages": events_per_job}
+
+        daemon._execute = execute
+        return daemon
+    return make
+
+async def run_jobs(daemon, count=1):
+    jobs = [daemon.submit("scrape", {}) for _ in range(count)]
+    await asyncio.gather(*list(daemon._tasks))
+    return jobs
+
+def test_job_events_are_bounded_and_keep_the_final_event(make_daemon):
+    """Only the most recent events are kept, ending with job_finished."""
+    daemon = make_daemon(event_history=10, events_per_job=100)
+
+    async def run():
+        return (await run_jobs(daemon))[0]
+
+    job = asyncio.run(run())
+    events = list(job["events"])
+    assert len(events) == 10
+    assert events[-1]["event"] == "job_finished"
+    assert events[-2]["index"] == 99
+
+def test_finished_jobs_expire_after_ttl(make_daemon):
+    """Finished jobs are dropped once their TTL passes, even with no further submissions."""
+    daemon = make_daemon(job_ttl=0.05)
+
+    async def run():
+        job = (await run_jobs(daemon))[0]
+        assert job["id"] in daemon.jobs
+        await asyncio.sleep(0.1)
+        return job
+
+    job = asyncio.run(run())
+    assert job["status"] == "completed"
+    assert daemon.jobs == {}
+
+def test_history_limit_applies_when_jobs_finish(make_daemon):
+    """The history limit is enforced as jobs finish, not only on submit."""
+    daemon = make_daemon(history=2, job_ttl=0)
+
+    async def run():
+        return await run_jobs(daemon, count=5)
+
+    jobs = asyncio.run(run())
+    assert list(daemon.jobs) == [job["id"] for job in jobs[-2:]]
+
+def call(daemon, method, path, **kwargs):
+    """Issue one request against the daemon app; returns (status, body text, jobs created)"""
+    async def run():
+        async with TestClient(TestServer(daemon.create_app())) as client:
+            response = await client.request(method, path, **kwargs)
+            text = await response.text()
+            await asyncio.gather(*list(daemon._tasks))
+            return response.status, text
+    status, text = asyncio.run(run())
+    return status, text, len(daemon.jobs)
+
+def test_submit_requires_json_content_type(make_daemon):
+    """A text/plain POST, which any web page can send cross-site, is refused."""
+    daemon = make_daemon()
+    body = '{"type": "scrape", "params": {"url": "http://internal/"}}'
+    status, _, jobs = call(daemon, "POST", "/jobs", data=body, headers={"Content-Type": "text/plain"})
+    assert (status, jobs) == (415, 0)
+
+    status, _, jobs = call(daemon, "POST", "/jobs", data=body, headers={"Content-Type": "application/json"})
+    assert (status, jobs) == (202, 1)
+
+@pytest.mark.parametrize("headers", [
+    {"Origin": "https://evil.example"},
+    {"Origin": "null"},
+    {"Host": "evil.example:8765"},
+])
+def test_foreign_origin_and_host_are_refused(make_daemon, headers):
+    """Cross-site origins and DNS-rebound host names get 403."""
+    status, _, jobs = call(make_daemon(), "POST", "/jobs", json={"type": "scrape", "params": {}}, headers=headers)
+    assert (status, jobs) == (403, 0)
+
+def test_loopback_origin_is_allowed(make_daemon):
+    """Requests from a page served by the daemon's own host are accepted."""
+    status, _, _ = call(make_daemon(), "GET", "/jobs", headers={"Origin": "http://localhost:8765"})
+    assert status == 200
+
+def test_token_is_required_when_configured(make_daemon):
+    """With DAEMON_TOKEN set, requests need the matching bearer token."""
+    daemon = make_daemon()
+    daemon.token = "s3cret"
+    assert call(daemon, "GET", "/jobs")[0] == 401
+    assert call(daemon, "GET", "/jobs", headers={"Authorization": "Bearer wrong"})[0] == 401
+    assert call(daemon, "GET", "/jobs", headers={"Authorization": "Bearer s3cret"})[0] == 200
+
+@pytest.mark.parametrize("body", [{"type": "scrape", "params": ["http://a/"]}, ["scrape"], {"type": "nope"}])
+def test_malformed_jobs_are_rejected(make_daemon, body):
+    """Non-object params, non-object bodies and unknown job types get 400."""
+    status, text, jobs = call(make_daemon(), "POST", "/jobs", json=body)
+    assert (status, jobs) == (400, 0)
+    assert "error" in text
+
+def test_daemon_error_reads_plain_text_responses(lens, make_daemon):
+    """Client-side error extraction copes with aiohttp's plain-text error pages and JSON errors."""
+    daemon = make_daemon()
+
+    async def run():
+        async with TestClient(TestServer(daemon.create_app())) as client:
+            plain = await lens.daemon_error(await client.get("/nope"))
+            missing = await lens.daemon_error(await client.get("/jobs/unknown"))
+            return plain, missing
+
+    assert asyncio.run(run()) == ("404: Not Found", "job not found")
@@ -0,0 +1,126 @@
+"""
+Tests for the disk-spilling CrawlFrontier.
+"""
+import asyncio
+import os
+import random
+
+import pytest
+
+@pytest.fixture
+def frontier(lens, tmp_path):
+    frontier = lens.CrawlFrontier(str(tmp_path / "frontier" / "session_1.db"), hot_size=5, batch_size=3)
+    yield frontier
+    frontier.close()
+
+async def drain(frontier):
+    items = []
+    while (item := await frontier.pop()) is not None:
+        items.append(item)
+    return items
+
+def test_equal_priorities_pop_in_fifo_order_across_spills(frontier):
+    """With equal priorities the frontier is FIFO (BFS), even after spilling to disk."""
+    async def run():
+        await frontier.push_many([(f"https://a/{i}", i // 10, 0.0) for i in range(40)])
+        assert frontier.cold_count > 0
+        return await drain(frontier)
+    
+    items = asyncio.run(run())
+    assert [url for url, _ in items] == [f"https://a/{i}" for i in range(40)]
+    assert frontier.stats()["loaded"] == frontier.stats()["spilled"] > 0
+
+def test_priorities_are_respected_across_spills(frontier):
+    """Lower priority values come out first, whether they were hot or cold."""
+    rng = random.Random(5)
+    priorities = [rng.random() for _ in range(60)]
+    
+    async def run():
+        for start in range(0, 60, 7):
+            await frontier.push_many([(f"https://a/{i}", 1, priorities[i]) for i in range(start, min(start + 7, 60))])
+        first = await frontier.pop()
+        await frontier.push_many([("https://a/urgent", 1, -1.0)])
+        return [first] + await drain(frontier)
+    
+    urls = [url for url, _ in asyncio.run(run())]
+    expected = [f"https://a/{i}" for i in sorted(range(60), key=priorities.__getitem__)]
+    assert urls[0] == expected[0] and urls[1] == "https://a/urgent"
+    assert urls[2:] == expected[1:]
+
+def test_urls_are_queued_once(frontier):
+    """Re-discovered URLs are not queued again, even after they were popped or spilled."""
+    async def run():
+        queued = await frontier.push_many([("https://a/nav", 1, 0.0), ("https://a/1", 1, 0.0), ("https://a/nav", 1, 0.0)])
+        popped = await frontier.pop()
+        queued += await frontier.push_many([("https://a/nav", 2, 0.0)] * 20 + [("https://a/2", 2, 0.0)])
+        return queued, [popped] + await drain(frontier)
+    
+    queued, items = asyncio.run(run())
+    assert queued == 3
+    assert items == [("https://a/nav", 1), ("https://a/1", 1), ("https://a/2", 2)]
+    assert frontier.stats()["duplicates"] == 21
+
+def test_better_sighting_requeues_at_its_priority(frontier):
+    """A URL seen again at a better priority moves up, whether its entry was hot or cold."""
+    async def run():
+        await frontier.push_many([(f"https://a/{i}", 3, float(i)) for i in range(20)])
+        assert frontier.cold_count > 0
+        # https://a/1 is hot and https://a/19 was spilled; both are found again closer to the root
+        queued = await frontier.push_many([("https://a/19", 1, -2.0), ("https://a/1", 1, -1.0), ("https://a/5", 1, 9.0)])
+        return queued, len(frontier), await drain(frontier)
+    
+    queued, size, items = asyncio.run(run())
+    assert queued == 2 and size == 20
+    assert items[:2] == [("https://a/19", 1), ("https://a/1", 1)]
+    assert [url for url, _ in items[2:]] == [f"https://a/{i}" for i in range(20) if i not in (1, 19)]
+    assert frontier.stats()["duplicates"] == 1
+
+def test_popped_urls_are_not_requeued_at_a_better_priority(frontier):
+    """Once a URL has been handed out it is never queued again."""
+    async def run():
+        await frontier.push_many([("https://a/x", 2, 5.0)])
+        first = await frontier.pop()
+        queued = await frontier.push_many([("https://a/x", 1, -5.0)])
+        return first, queued, await frontier.pop()
+    
+    assert asyncio.run(run()) == (("https://a/x", 2), 0, None)
+
+def test_seen_urls_are_kept_on_disk(frontier):
+    """Memory holds only the hot segment; the record of queued URLs lives in SQLite."""
+    async def run():
+        for start in range(0, 300, 30):
+            await frontier.push_many([(f"https://a/{i}", 1, 0.0) for i in range(start, start + 30)])
+        while len(frontier) > 100:
+            await frontier.pop()
+        return await frontier.push_many([(f"https://a/{i}", 1, 0.0) for i in range(300)])
+    
+    assert asyncio.run(run()) == 0
+    assert len(frontier.hot_seq) <= 2 * frontier.hot_size + 30
+    assert frontier.conn.execute("SELECT COUNT(*) FROM seen").fetchone()[0] == 300
+
+def test_shrink_spills_all_but_keep(frontier):
+    """Shrinking under memory pressure keeps only the best entries hot."""
+    async def run():
+        await frontier.push_many([(f"https://a/{i}", 1, float(i)) for i in range(8)])
+        await frontier.shrink(2)
+        hot = sorted(url for _, _, url, _ in frontier.hot)
+        return hot, len(frontier), await frontier.pop()
+    
+    hot, size, first = asyncio.run(run())
+    assert hot == ["https://a/0", "https://a/1"]
+    assert size == 8 and first == ("https://a/0", 1)
+
+def test_count_inlinks_accumulates(frontier):
+    """In-link counts are running totals per URL."""
+    async def run():
+        await frontier.count_inlinks(["https://a/x", "https://a/y"])
+        return await frontier.count_inlinks(["https://a/x", "https://a/x", "https://a/z"])
+    
+    assert asyncio.run(run()) == [3, 3, 1]
+
+def test_close_removes_cold_segment(frontier):
+    """Closing the frontier deletes its file."""
+    asyncio.run(frontier.push_many([(f"https://a/{i}", 1, 0.0) for i in range(20)]))
+    assert os.path.exists(frontier.path)
+    frontier.close()
+    assert not os.path.exists(frontier.path)
@@ -0,0 +1,51 @@
+"""
+Tests for per-host AIMD concurrency control.
+"""
+import asyncio
+import time
+
+def make_controller(lens, config, **values):
+    config.values.update({"DEFAULT_CRAWL_DELAY": 0, **values})
+    return lens.HostConcurrencyController(config)
+
+def test_healthy_responses_raise_the_limit(lens, config):
+    """Steady latency adds about one slot per window of successes."""
+    controller = make_controller(lens, config, HOST_INITIAL_CONCURRENCY=2, HOST_MAX_CONCURRENCY=4)
+    for _ in range(20):
+        controller.record("a", latency=0.1)
+    
+    assert controller.limit("a") == 4
+
+def test_server_errors_decrease_the_limit(lens, config):
+    """5xx pages count as overload rather than healthy latency samples."""
+    controller = make_controller(lens, config, HOST_INITIAL_CONCURRENCY=8)
+    controller.record("a", latency=0.1, status_code=500)
+    
+    assert controller.limit("a") == 4
+    assert controller.hosts["a"]["latency"] is None
+
+def test_disabled_controller_keeps_one_slot(lens, config):
+    """Without adaptive limits each host gets a single slot."""
+    controller = make_controller(lens, config, ADAPTIVE_CONCURRENCY="false")
+    controller.record("a", latency=0.1)
+    
+    assert controller.limit("a") == 1
+
+def test_crawl_delay_spaces_request_starts(lens, config):
+    """The crawl delay is a minimum interval between starts to one host, even with free slots."""
+    controller = make_controller(lens, config, HOST_INITIAL_CONCURRENCY=4)
+    controller.min_interval = 0.1
+    starts = []
+    
+    async def fetch(host):
+        async with controller.slot(host):
+            starts.append((host, time.monotonic()))
+    
+    async def run():
+        await asyncio.gather(*(fetch("a") for _ in range(4)), fetch("b"))
+    
+    asyncio.run(run())
+    a_starts = [t for host, t in starts if host == "a"]
+    gaps = [later - earlier for earlier, later in zip(a_starts, a_starts[1:])]
+    assert min(gaps) >= 0.09
+    assert [t for host, t in starts if host == "b"][0] - a_starts[0] < 0.05
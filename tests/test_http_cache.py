@@ -0,0 +1,180 @@
+"""
+Tests for the disk-backed subresource HttpCache and the route handler that serves from it.
+"""
+import asyncio
+import email.utils
+import itertools
+import os
+import time
+
+import pytest
+
+class Config:
+    def __init__(self, data_dir, values):
+        self.data_dir = data_dir
+        self.values = values
+
+    def get(self, key, default=None):
+        return self.values.get(key, default)
+
+@pytest.fixture
+def make_cache(lens, tmp_path):
+    caches = []
+
+    def make(**values):
+        cache = lens.HttpCache(Config(str(tmp_path), {key.upper(): str(value) for key, value in values.items()}))
+        caches.append(cache)
+        return cache
+
+    yield make
+    for cache in caches:
+        cache.close()
+
+def http_date(offset):
+    return email.utils.formatdate(time.time() + offset, usegmt=True)
+
+@pytest.mark.parametrize("headers, expected", [
+    ({"cache-control": "no-store, max-age=60"}, None),
+    ({"cache-control": "no-cache"}, 0.0),
+    ({"cache-control": "public, max-age=600"}, 600.0),
+    ({"expires": "not a date"}, 0.0),
+    ({}, 3600.0),
+])
+def test_freshness(make_cache, headers, expected):
+    """Cache-Control wins, unparseable Expires means stale, and the default TTL applies otherwise."""
+    assert make_cache().freshness(headers) == expected
+
+def test_freshness_from_dates(make_cache):
+    """Expires counts down from now; Last-Modified gives a tenth of the document's age."""
+    cache = make_cache()
+    assert cache.freshness({"expires": http_date(120)}) == pytest.approx(120, abs=2)
+    assert cache.freshness({"expires": http_date(-120)}) == 0.0
+    assert cache.freshness({"last-modified": http_date(-1000)}) == pytest.approx(100, abs=2)
+    assert cache.freshness({"last-modified": http_date(-10 * 86400 * 10)}) == 86400.0
+
+def test_put_and_read_round_trip(make_cache):
+    """A stored body comes back with its validators and without encoding headers."""
+    cache = make_cache()
+    headers = {"cache-control": "max-age=60", "etag": '"v1"', "content-encoding": "gzip", "content-type": "text/css"}
+    assert cache.put("https://a/site.css", 200, headers, b"body{}")
+
+    entry = cache.get("https://a/site.css")
+    assert (entry["fresh"], entry["etag"], entry["size"]) == (True, '"v1"', 6)
+    assert entry["headers"] == {"cache-control": "max-age=60", "etag": '"v1"', "content-type": "text/css"}
+    assert cache.read(entry) == b"body{}"
+    assert cache.get("https://a/other.css") is None
+
+@pytest.mark.parametrize("status, headers, size", [
+    (404, {}, 10),
+    (200, {"cache-control": "no-store"}, 10),
+    (200, {}, 200 * 1024),
+])
+def test_uncacheable_responses_are_not_stored(make_cache, status, headers, size):
+    """Errors, no-store responses and bodies over a tenth of the budget are skipped."""
+    cache = make_cache(http_cache_max_mb=1)
+    assert not cache.put("https://a/x.js", status, headers, b"x" * size)
+    assert cache.get("https://a/x.js") is None
+
+def test_missing_file_drops_the_entry(make_cache):
+    """An entry whose body file is gone reads as a miss and is removed."""
+    cache = make_cache()
+    cache.put("https://a/x.js", 200, {}, b"12345")
+    entry = cache.get("https://a/x.js")
+    os.remove(cache._path(entry["key"]))
+
+    assert cache.read(entry) is None
+    assert cache.get("https://a/x.js") is None
+    assert cache.total_bytes == 0
+
+def test_refresh_makes_a_stale_entry_fresh(make_cache):
+    """A 304 extends the entry by the freshness of the merged headers."""
+    cache = make_cache()
+    cache.put("https://a/x.js", 200, {"cache-control": "no-cache", "etag": '"1"'}, b"x")
+    entry = cache.get("https://a/x.js")
+    assert not entry["fresh"]
+
+    cache.refresh(entry, {"cache-control": "max-age=300"})
+    assert cache.get("https://a/x.js")["fresh"]
+
+def test_lru_eviction_keeps_recently_read_entries(lens, make_cache, monkeypatch):
+    """Going over budget drops the least recently used entries down to 90% of it."""
+    clock = itertools.count(1_000_000)
+    monkeypatch.setattr(lens.time, "time", lambda: float(next(clock)))
+    cache = make_cache(http_cache_max_mb=1)
+    body = b"x" * (100 * 1024)
+    for i in range(9):
+        cache.put(f"https://a/{i}.js", 200, {"cache-control": "max-age=1000000000"}, body)
+    cache.read(cache.get("https://a/0.js"))
+
+    cache.put("https://a/9.js", 200, {"cache-control": "max-age=1000000000"}, body)
+    cache.put("https://a/10.js", 200, {"cache-control": "max-age=1000000000"}, body)
+    kept = [i for i in range(11) if cache.get(f"https://a/{i}.js")]
+    assert kept == [0, 3, 4, 5, 6, 7, 8, 9, 10]
+    assert cache.total_bytes == 9 * len(body) <= cache.max_bytes * 0.9
+
+def test_size_survives_reopening(make_cache):
+    """The byte total is rebuilt from the index when the cache is reopened."""
+    make_cache().put("https://a/x.js", 200, {}, b"abc")
+    cache = make_cache()
+    cache.get("https://a/x.js")
+    assert cache.total_bytes == 3
+
+class FakeResponse:
+    def __init__(self, status, headers, body):
+        self.status = status
+        self.headers = headers
+        self._body = body
+
+    async def body(self):
+        return self._body
+
+class FakeRoute:
+    def __init__(self, response):
+        self.response = response
+        self.fetched_with = None
+        self.fulfilled = None
+
+    async def fetch(self, headers=None):
+        self.fetched_with = headers
+        if isinstance(self.response, Exception):
+            raise self.response
+        return self.response
+
+    async def fulfill(self, status, headers, body):
+        self.fulfilled = (status, headers, body)
+
+class FakeRequest:
+    url = "https://a/app.js"
+    headers = {"accept": "*/*"}
+
+def serve(tools, response):
+    route = FakeRoute(response)
+    handled = asyncio.run(tools._serve_from_cache("page", route, FakeRequest()))
+    return handled, route
+
+def test_route_handler_counts_misses_hits_and_revalidations(lens, make_cache):
+    """Pages are served from the cache, revalidated with validators, and counted per page."""
+    tools = lens.BrowserTools.__new__(lens.BrowserTools)
+    tools.http_cache = make_cache()
+    tools.page_cache_stats = {"page": {}}
+
+    handled, route = serve(tools, FakeResponse(200, {"cache-control": "no-cache", "etag": '"7"'}, b"js"))
+    assert handled and route.fulfilled[2] == b"js"
+    assert route.fetched_with == {"accept": "*/*"}
+
+    # Stale, so the next request is conditional and a 304 is served from disk
+    handled, route = serve(tools, FakeResponse(304, {"cache-control": "max-age=60"}, b""))
+    assert route.fetched_with == {"accept": "*/*", "if-none-match": '"7"'}
+    assert route.fulfilled == (200, {"cache-control": "no-cache", "etag": '"7"'}, b"js")
+
+    handled, route = serve(tools, AssertionError("fresh entries are served without a request"))
+    assert handled and route.fetched_with is None
+    assert tools.cache_stats("page") == {"misses": 1, "revalidated": 1, "hits": 1, "bytes_saved": 4}
+
+def test_route_handler_leaves_network_errors_to_the_browser(lens, make_cache):
+    """A failed fetch isn't handled, so the request continues to the network as usual."""
+    tools = lens.BrowserTools.__new__(lens.BrowserTools)
+    tools.http_cache = make_cache()
+    tools.page_cache_stats = {}
+    handled, route = serve(tools, OSError("connection reset"))
+    assert not handled and route.fulfilled is None
@@ -0,0 +1,107 @@
+"""
+Tests for the persistent JobQueue and its leased claims.
+"""
+import sqlite3
+import threading
+import time
+
+import pytest
+
+@pytest.fixture
+def queue(lens, config, db_path):
+    config.values.update({"JOB_LEASE_SECONDS": 60, "JOB_MAX_ATTEMPTS": 2, "JOB_RETRY_DELAY": 0})
+    return lens.JobQueue(config, db_path)
+
+def expire_leases(db_path):
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("UPDATE jobs SET lease_expires_at = 0 WHERE status = 'running'")
+
+def test_claims_follow_priority_then_age(queue):
+    """Higher priority jobs are claimed first, then the oldest."""
+    low = queue.enqueue("scrape", {"url": "https://a/"})
+    high = queue.enqueue("scrape", {"url": "https://b/"}, priority=5)
+    older = queue.enqueue("batch", {"url": "https://c/"})
+    
+    assert queue.claim("w1")["id"] == high
+    assert queue.claim("w1", job_types=["batch"])["id"] == older
+    job = queue.claim("w1")
+    assert job["id"] == low and job["params"] == {"url": "https://a/"} and job["attempts"] == 1
+    assert queue.claim("w1") is None
+
+def test_concurrent_workers_never_claim_the_same_job(queue, lens, config, db_path):
+    """Workers on separate connections each lease distinct jobs."""
+    queue.enqueue_many([("scrape", {"n": n}) for n in range(40)])
+    claimed = []
+    lock = threading.Lock()
+    
+    def work(worker_id):
+        own_queue = lens.JobQueue(config, db_path)
+        while (job := own_queue.claim(worker_id)) is not None:
+            with lock:
+                claimed.append(job["id"])
+    
+    threads = [threading.Thread(target=work, args=(f"w{i}",)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert len(claimed) == 40 and len(set(claimed)) == 40
+
+def test_expired_lease_is_reclaimed_by_another_worker(queue, db_path):
+    """A job whose worker died is handed to the next claimer; the dead worker loses it."""
+    job_id = queue.enqueue("scrape", {})
+    queue.claim("dead")
+    assert queue.claim("live") is None
+    
+    expire_leases(db_path)
+    job = queue.claim("live")
+    assert job["id"] == job_id and job["attempts"] == 2
+    assert not queue.heartbeat(job_id, "dead")
+    assert not queue.complete(job_id, "dead")
+    assert queue.complete(job_id, "live", {"pages": 3})
+    assert queue.counts() == {"completed": 1}
+
+def test_lease_expiry_respects_attempt_cap(queue, db_path):
+    """A job that keeps losing its lease fails once out of attempts."""
+    queue.enqueue("scrape", {})
+    for worker_id in ("w1", "w2"):
+        assert queue.claim(worker_id) is not None
+        expire_leases(db_path)
+    
+    assert queue.claim("w3") is None
+    assert queue.counts() == {"failed": 1}
+
+def test_failures_retry_until_cap(queue):
+    """Failed jobs are requeued until max_attempts, then marked failed."""
+    queue.enqueue("scrape", {})
+    assert queue.fail(queue.claim("w1")["id"], "w1", "boom")
+    assert queue.counts() == {"queued": 1}
+    
+    assert queue.fail(queue.claim("w1")["id"], "w1", "boom again")
+    assert queue.counts() == {"failed": 1}
+    assert queue.claim("w1") is None
+
+def test_release_does_not_spend_an_attempt(queue):
+    """Released jobs return to the queue with their attempt count restored."""
+    job_id = queue.enqueue("scrape", {}, max_attempts=1)
+    assert queue.release(queue.claim("w1")["id"], "w1")
+    
+    job = queue.claim("w2")
+    assert job["id"] == job_id and job["attempts"] == 1
+
+def test_heartbeat_extends_lease(queue, db_path):
+    """Heartbeats push the lease expiry forward for the owner only."""
+    job_id = queue.enqueue("scrape", {})
+    queue.claim("w1")
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("UPDATE jobs SET lease_expires_at = ?", (time.time() + 1,))
+    
+    assert queue.heartbeat(job_id, "w1")
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute("SELECT lease_expires_at FROM jobs").fetchone()[0] > time.time() + 30
+
+def test_delayed_jobs_wait(queue):
+    """Jobs enqueued with a delay are not claimable before it passes."""
+    queue.enqueue("scrape", {}, delay=60)
+    assert queue.claim("w1") is None
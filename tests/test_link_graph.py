@@ -0,0 +1,145 @@
+"""
+Tests for the CSR LinkGraph: PageRank, click depth, components and orphans.
+"""
+import sqlite3
+
+import numpy as np
+import pytest
+
+def dense_pagerank(n, edges, damping=0.85, iterations=200):
+    """Reference PageRank over a dense transition matrix."""
+    matrix = np.zeros((n, n))
+    for src, dst in edges:
+        matrix[dst, src] = 1.0
+    out_degree = matrix.sum(axis=0)
+    for column in range(n):
+        if out_degree[column]:
+            matrix[:, column] /= out_degree[column]
+        else:
+            matrix[:, column] = 1.0 / n
+    rank = np.full(n, 1.0 / n)
+    for _ in range(iterations):
+        rank = damping * matrix @ rank + (1.0 - damping) / n
+    return rank
+
+@pytest.fixture
+def graph(lens):
+    # 0 -> 1, 2; 1 -> 2; 2 -> 0; 3 -> 2; 4 is isolated; 5 is a dangling sink reached from 1
+    urls = np.array([f"https://a/{i}" for i in range(6)], dtype=object)
+    src = [0, 0, 1, 2, 3, 1]
+    dst = [1, 2, 2, 0, 2, 5]
+    page_ids = np.array([10, 11, 12, 13, 14, -1], dtype=np.int64)
+    return lens.LinkGraph.from_edges(urls, src, dst, page_ids, root=0)
+
+def test_from_edges_drops_self_loops_and_duplicates(lens):
+    """Self-loops and repeated edges are removed and rows are grouped by source."""
+    urls = np.array(["a", "b", "c"], dtype=object)
+    graph = lens.LinkGraph.from_edges(urls, [2, 0, 0, 1, 1, 0], [0, 1, 1, 1, 2, 2])
+    assert graph.num_edges == 4
+    assert graph.indptr.tolist() == [0, 2, 3, 4]
+    assert graph.indices.tolist() == [1, 2, 2, 0]
+
+def test_degrees(graph):
+    """Out- and in-degrees come from the CSR arrays."""
+    assert graph.out_degree().tolist() == [2, 2, 1, 1, 0, 0]
+    assert graph.in_degree().tolist() == [1, 1, 3, 0, 0, 1]
+
+def test_pagerank_matches_dense_reference(graph):
+    """Power iteration over CSR agrees with a dense computation, dangling nodes included."""
+    edges = [(0, 1), (0, 2), (1, 2), (1, 5), (2, 0), (3, 2)]
+    rank = graph.pagerank(tol=1e-12, max_iter=500)
+    assert rank.sum() == pytest.approx(1.0)
+    assert rank == pytest.approx(dense_pagerank(6, edges), abs=1e-9)
+    # Nodes nobody links to only get the teleport and dangling share
+    assert rank[3] == pytest.approx(rank[4])
+    assert rank[3] == pytest.approx(rank.min())
+
+def test_pagerank_of_a_cycle_is_uniform(lens):
+    """Every node of a directed cycle has the same rank."""
+    urls = np.array(list("abcd"), dtype=object)
+    graph = lens.LinkGraph.from_edges(urls, [0, 1, 2, 3], [1, 2, 3, 0])
+    assert graph.pagerank() == pytest.approx([0.25] * 4)
+
+def test_empty_graph(lens):
+    """An empty graph has no ranks and no depths."""
+    graph = lens.LinkGraph.from_edges(np.array([], dtype=object), [], [])
+    assert graph.pagerank().size == 0
+    assert graph.click_depth(root=None).size == 0
+    assert graph.strongly_connected_components().size == 0
+
+def test_click_depth(graph):
+    """Click depth is the BFS distance from the root; unreachable nodes are -1."""
+    assert graph.click_depth().tolist() == [0, 1, 1, -1, -1, 2]
+    assert graph.click_depth(root=3).tolist() == [2, 3, 1, 0, -1, 4]
+
+def test_click_depth_leaves_other_components_unreachable(lens):
+    """Nodes only reachable from outside the root's component keep depth -1."""
+    urls = np.array(list("abcdef"), dtype=object)
+    # a -> b -> c is reachable from the root; d <-> e -> f only links into itself and back to a
+    graph = lens.LinkGraph.from_edges(urls, [0, 1, 3, 4, 4, 5], [1, 2, 4, 3, 5, 0], root=0)
+    assert graph.click_depth().tolist() == [0, 1, 2, -1, -1, -1]
+    assert graph.click_depth(root=3).tolist() == [3, 4, 5, 0, 1, 2]
+
+def partition(labels):
+    """Components as a set of frozensets, independent of label numbering."""
+    groups = {}
+    for node, label in enumerate(labels.tolist()):
+        groups.setdefault(label, set()).add(node)
+    return {frozenset(group) for group in groups.values()}
+
+@pytest.fixture
+def scc_graph(lens):
+    # Two cycles {0, 1, 2} and {3, 4} joined by a one-way edge, plus a chain 5 -> 6 -> 0 and a lone node 7
+    urls = np.array([f"https://a/{i}" for i in range(8)], dtype=object)
+    src = [0, 1, 2, 2, 3, 4, 5, 6]
+    dst = [1, 2, 0, 3, 4, 3, 6, 0]
+    return lens.LinkGraph.from_edges(urls, src, dst, root=0)
+
+def test_strongly_connected_components(scc_graph):
+    """Cycles collapse into one component each; acyclic nodes are their own component."""
+    labels = scc_graph.strongly_connected_components()
+    assert len(set(labels.tolist())) == 5
+    assert partition(labels) == {
+        frozenset({0, 1, 2}), frozenset({3, 4}), frozenset({5}), frozenset({6}), frozenset({7})
+    }
+
+def test_tarjan_fallback_matches(lens, scc_graph):
+    """The pure-Python Tarjan fallback finds the same components as the default path."""
+    assert partition(scc_graph._tarjan_scc()) == partition(scc_graph.strongly_connected_components())
+
+def test_tarjan_fallback_handles_long_chains(lens):
+    """The iterative fallback does not recurse, so long chains don't overflow the stack."""
+    n = 50000
+    urls = np.array([str(i) for i in range(n)], dtype=object)
+    graph = lens.LinkGraph.from_edges(urls, list(range(n - 1)) + [n - 1], list(range(1, n)) + [0])
+    assert len(set(graph._tarjan_scc().tolist())) == 1
+
+def test_orphan_pages(graph):
+    """Crawled pages without inbound links are orphans; the root and uncrawled URLs are not."""
+    assert graph.orphan_pages().tolist() == [False, False, False, True, True, False]
+
+def test_from_session_normalizes_fragments(lens, db_path):
+    """Loading a session merges fragment URLs and ignores external links."""
+    conn = sqlite3.connect(db_path)
+    conn.execute("INSERT INTO scrape_sessions (id, url, timestamp, status) VALUES (1, 'https://a/#top', 't', 'completed')")
+    for page_id, url in [(1, "https://a/"), (2, "https://a/x"), (3, "https://a/y")]:
+        conn.execute(
+            "INSERT INTO pages (id, session_id, url, content_hash, timestamp) VALUES (?, 1, ?, 'h', 't')",
+            (page_id, url),
+        )
+    conn.executemany(
+        "INSERT INTO links (source_page_id, target_url, is_internal) VALUES (?, ?, ?)",
+        [(1, "https://a/x#section", 1), (1, "https://a/x", 1), (2, "https://a/#top", 1),
+         (2, "https://a/z", 1), (1, "https://other/", 0)],
+    )
+    conn.commit()
+    conn.close()
+
+    graph = lens.LinkGraph.from_session(db_path, 1)
+    index = {url: i for i, url in enumerate(graph.urls)}
+    assert set(index) == {"https://a/", "https://a/x", "https://a/y", "https://a/z"}
+    assert graph.root == index["https://a/"]
+    assert graph.num_edges == 3
+    assert graph.page_ids[index["https://a/z"]] == -1
+    assert graph.orphan_pages()[index["https://a/y"]]
+    assert lens.LinkGraph.from_session(db_path, 99) is None
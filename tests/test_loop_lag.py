@@ -0,0 +1,82 @@
+"""
+Tests for the event-loop lag monitor and its blocking-call hotspots.
+"""
+import asyncio
+import time
+import traceback
+
+def make_monitor(lens, config, **values):
+    config.values.update({"LOOP_LAG_INTERVAL": "0.02", "LOOP_LAG_THRESHOLD": "0.1"})
+    config.values.update({key.upper(): str(value) for key, value in values.items()})
+    return lens.LoopLagMonitor(config, lens.MetricsRegistry())
+
+def block_the_loop(seconds):
+    time.sleep(seconds)
+
+def test_blocking_call_is_caught_with_its_stack(lens, config):
+    """A blocking call stalls the loop, and the watchdog records where it was made."""
+    monitor = make_monitor(lens, config)
+
+    async def run():
+        monitor.start()
+        monitor.begin("session")
+        await asyncio.sleep(0.1)
+        block_the_loop(0.4)
+        await asyncio.sleep(0.1)
+        summary = monitor.end("session")
+        await monitor.stop()
+        return summary
+
+    summary = asyncio.run(run())
+    assert summary["stalls"] >= 1 and summary["max"] >= 0.3 and summary["samples"] >= 5
+    hotspot = next(entry for entry in summary["hotspots"] if entry["location"].endswith("in block_the_loop"))
+    assert hotspot["location"].startswith("test_loop_lag.py:") and hotspot["max_lag"] >= 0.3
+    assert any("time.sleep(seconds)" in frame for frame in hotspot["stack"])
+    assert "elysian_event_loop_stalls_total 0" not in monitor.metrics.render()
+    assert monitor.task is None and monitor.watchdog is None
+
+def test_disabled_monitor_does_not_sample(lens, config):
+    """With LOOP_LAG_MONITOR off, start() doesn't sample; unopened windows summarize to None."""
+    monitor = make_monitor(lens, config, loop_lag_monitor="false")
+
+    async def run():
+        monitor.start()
+        await monitor.stop()
+
+    asyncio.run(run())
+    assert monitor.task is None
+    assert monitor.end("never-opened") is None
+
+def test_stall_without_a_stack_is_counted_without_a_hotspot(lens, config):
+    """A stall the watchdog missed still counts, and only open windows collect samples."""
+    monitor = make_monitor(lens, config)
+    monitor._record(0.5, None)
+    monitor.begin("a")
+    monitor.begin("b")
+    for lag in (0.0, 0.01, 0.3):
+        monitor._record(lag, None)
+    monitor.end("b")
+
+    summary = monitor.end("a")
+    assert (summary["samples"], summary["stalls"], summary["stalled_seconds"], summary["hotspots"]) == (3, 1, 0.3, [])
+    assert (summary["p50"], summary["max"]) == (0.01, 0.3)
+    assert "elysian_event_loop_stalls_total 2" in monitor.metrics.render()
+
+def test_empty_window(lens, config):
+    """A window closed before any sample has no percentiles."""
+    monitor = make_monitor(lens, config)
+    monitor.begin("s")
+    summary = monitor.end("s")
+    assert (summary["samples"], summary["p50"], summary["p99"], summary["max"]) == (0, None, None, None)
+
+def test_hotspot_is_the_innermost_frame_of_application_code(lens):
+    """The hotspot points at the application line making the call, with the library frame as the call."""
+    stack = traceback.StackSummary.from_list([
+        (lens.__file__, 10, "_scrape_page", "await self._extract_pdf(url)"),
+        (lens.__file__, 20, "_extract_pdf", "reader = pypdf.PdfReader(data)"),
+        ("/site-packages/pypdf/_reader.py", 300, "__init__", "self.read(stream)"),
+    ])
+    location, call, frames = lens.LoopLagMonitor._hotspot(stack)
+    assert location == "elysian_lens.py:20 in _extract_pdf"
+    assert call == "_reader.py:300 in __init__"
+    assert frames[-1] == "_reader.py:300 in __init__: self.read(stream)"
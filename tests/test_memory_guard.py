@@ -0,0 +1,43 @@
+"""
+Tests for process RSS measurement and memory budgets.
+"""
+import asyncio
+import os
+import shutil
+
+import pytest
+
+def test_process_tree_rss_is_current(lens):
+    """The process tree RSS is positive and excluding ourselves leaves nothing."""
+    assert lens.process_tree_rss() > 0
+    assert lens.process_tree_rss(exclude=(os.getpid(),)) == 0
+
+@pytest.mark.skipif(shutil.which("ps") is None, reason="ps is not available")
+def test_process_table_without_procfs(lens, monkeypatch):
+    """Without /proc the table comes from ps and still reports current RSS."""
+    real_isdir = os.path.isdir
+    monkeypatch.setattr(lens.os.path, "isdir", lambda path: False if path == "/proc" else real_isdir(path))
+    
+    table = lens._process_table()
+    assert table[os.getpid()][0] == os.getppid()
+    assert lens.process_tree_rss() > 0
+
+def test_budget_levels(lens, config, monkeypatch):
+    """RSS above the soft and hard limits moves the level up."""
+    config.values.update({"MEMORY_SOFT_LIMIT_MB": 100, "MEMORY_HARD_LIMIT_MB": 200})
+    guard = lens.MemoryGuard(config)
+    levels = []
+    for rss_mb in (50, 150, 250, 50):
+        monkeypatch.setattr(lens, "process_tree_rss", lambda: rss_mb * 1024 * 1024)
+        levels.append(asyncio.run(guard.check(force=True)))
+    
+    assert levels == ["ok", "soft", "hard", "ok"]
+
+def test_unmeasurable_rss_disables_budgets(lens, config, monkeypatch):
+    """When current RSS cannot be read, budgets are turned off instead of stopping crawls."""
+    config.values.update({"MEMORY_HARD_LIMIT_MB": 1})
+    guard = lens.MemoryGuard(config)
+    monkeypatch.setattr(lens, "process_tree_rss", lambda: None)
+    
+    assert asyncio.run(guard.check(force=True)) == "ok"
+    assert not guard.enabled
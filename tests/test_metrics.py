@@ -0,0 +1,94 @@
+"""
+Tests for Prometheus text rendering in MetricsRegistry.
+"""
+import asyncio
+
+def test_unlabelled_counter_starts_at_zero_and_accumulates(lens):
+    """Unlabelled counters render a zero baseline, then their running total."""
+    registry = lens.MetricsRegistry()
+    counter = registry.counter("pages_total", "Pages scraped")
+    assert "elysian_pages_total 0\n" in registry.render()
+
+    counter.inc()
+    counter.inc(2.5)
+    text = registry.render()
+    assert "# HELP elysian_pages_total Pages scraped" in text
+    assert "# TYPE elysian_pages_total counter" in text
+    assert "elysian_pages_total 3.5\n" in text
+
+def test_labels_are_escaped(lens):
+    """Label values escape backslashes, quotes and newlines."""
+    registry = lens.MetricsRegistry()
+    registry.counter("errors_total", "Errors", labels=("kind",)).inc(kind='a"b\\c\nd')
+    assert 'elysian_errors_total{kind="a\\"b\\\\c\\nd"} 1' in registry.render()
+
+def test_special_float_values_use_prometheus_spelling(lens):
+    """NaN and infinities render as NaN, +Inf and -Inf."""
+    registry = lens.MetricsRegistry()
+    gauge = registry.gauge("ratio", "Ratio", labels=("case",))
+    gauge.set(float("nan"), case="nan")
+    gauge.set(float("inf"), case="pos")
+    gauge.set(float("-inf"), case="neg")
+    text = registry.render()
+    assert 'elysian_ratio{case="nan"} NaN' in text
+    assert 'elysian_ratio{case="pos"} +Inf' in text
+    assert 'elysian_ratio{case="neg"} -Inf' in text
+
+def test_histogram_buckets_are_cumulative(lens):
+    """Histogram buckets are cumulative and end with +Inf, _sum and _count."""
+    registry = lens.MetricsRegistry()
+    histogram = registry.histogram("stage_seconds", "Stage latency", labels=("stage",))
+    for value in (0.003, 0.2, 0.2, 60.0):
+        histogram.observe(value, stage="fetch")
+    text = registry.render()
+    assert 'elysian_stage_seconds_bucket{stage="fetch",le="0.005"} 1' in text
+    assert 'elysian_stage_seconds_bucket{stage="fetch",le="0.25"} 3' in text
+    assert 'elysian_stage_seconds_bucket{stage="fetch",le="30.0"} 3' in text
+    assert 'elysian_stage_seconds_bucket{stage="fetch",le="+Inf"} 4' in text
+    assert 'elysian_stage_seconds_sum{stage="fetch"} 60.403' in text
+    assert 'elysian_stage_seconds_count{stage="fetch"} 4' in text
+
+def test_collector_gauges_are_evaluated_at_render_time(lens):
+    """Collector gauges are computed on render, and a failing collector is skipped."""
+    registry = lens.MetricsRegistry()
+    state = {"value": 2}
+    registry.gauge("open_contexts", "Open contexts", collector=lambda: state["value"])
+    registry.gauge("broken", "Broken", collector=lambda: 1 / 0)
+    state["value"] = 7
+    text = registry.render()
+    assert "elysian_open_contexts 7\n" in text
+    assert "# TYPE elysian_broken gauge" in text
+    assert "\nelysian_broken " not in text
+
+class FakeResponse:
+    def __init__(self, body):
+        self._body = body
+
+    async def body(self):
+        return self._body
+
+class FakeRequest:
+    url = "https://example.com/"
+
+    def __init__(self, body_size, body=b""):
+        self.body_size = body_size
+        self._response = FakeResponse(body)
+
+    async def sizes(self):
+        return {"requestBodySize": 0, "requestHeadersSize": 100, "responseBodySize": self.body_size, "responseHeadersSize": 200}
+
+    async def response(self):
+        return self._response
+
+def test_response_bytes_use_transferred_size_with_body_fallback(lens):
+    """Response bytes count the transfer size, falling back to the body when there was no transfer."""
+    tools = lens.BrowserTools.__new__(lens.BrowserTools)
+    registry = lens.MetricsRegistry()
+    tools.response_bytes = registry.counter("response_bytes_total", "Response bytes")
+
+    async def run():
+        await tools._count_response_bytes(FakeRequest(1234))
+        await tools._count_response_bytes(FakeRequest(-1, body=b"x" * 10))
+
+    asyncio.run(run())
+    assert "elysian_response_bytes_total 1244\n" in registry.render()
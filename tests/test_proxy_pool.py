@@ -0,0 +1,170 @@
+"""
+Tests for the latency-weighted ProxyPool and the proxy health feedback from page loads.
+"""
+import asyncio
+import random
+from collections import Counter
+
+import pytest
+from playwright.async_api import Error as PlaywrightError
+
+def make_pool(lens, latencies):
+    pool = lens.ProxyPool(max_failures=1)
+    for i, latency in enumerate(latencies):
+        pool.add(f"http://10.0.0.{i}:8080", latency)
+    return pool
+
+def test_select_prefers_faster_proxies(lens):
+    """Selection frequency follows the inverse latency."""
+    random.seed(1)
+    pool = make_pool(lens, [0.1, 1.0])
+    counts = Counter(pool.select() for _ in range(4000))
+    
+    assert counts["http://10.0.0.0:8080"] > 8 * counts["http://10.0.0.1:8080"]
+
+def test_fenwick_prefix_matches_weights(lens):
+    """Prefix sums over the tree agree with the raw weights after updates."""
+    random.seed(2)
+    pool = make_pool(lens, [random.uniform(0.05, 3) for _ in range(37)])
+    for proxy in random.sample(pool.proxies, 10):
+        pool.report_success(proxy, random.uniform(0.05, 3))
+    
+    for i in range(len(pool) + 1):
+        assert abs(pool._prefix(i) - sum(pool.weights[:i])) < 1e-9
+
+def test_select_never_returns_evicted_proxy(lens):
+    """Evicted proxies are never picked while others remain."""
+    random.seed(3)
+    pool = make_pool(lens, [random.uniform(0.05, 3) for _ in range(20)])
+    evicted = set(random.sample(pool.proxies, 15))
+    for proxy in evicted:
+        pool.evict(proxy)
+    
+    assert pool.healthy_count() == 5
+    assert not evicted & {pool.select() for _ in range(2000)}
+
+def test_evict_all_returns_none(lens):
+    """Once every proxy is evicted, selection returns None despite float drift."""
+    for trial in range(200):
+        rng = random.Random(trial)
+        pool = make_pool(lens, [rng.uniform(0.05, 3) for _ in range(rng.randint(1, 40))])
+        for proxy in rng.sample(pool.proxies, len(pool)):
+            if rng.random() < 0.5:
+                pool.report_failure(proxy)
+            else:
+                pool.evict(proxy)
+        
+        assert pool.healthy_count() == 0
+        assert pool.select() is None
+
+def test_restore_after_evict_all(lens):
+    """A restored proxy is selectable again after the pool was emptied."""
+    pool = make_pool(lens, [0.5, 0.7])
+    for proxy in list(pool.proxies):
+        pool.evict(proxy)
+    pool.restore("http://10.0.0.1:8080", 0.2)
+    
+    assert {pool.select() for _ in range(50)} == {"http://10.0.0.1:8080"}
+
+def test_failure_cools_proxy_down(lens):
+    """A failing proxy is skipped during its cooldown."""
+    pool = lens.ProxyPool(max_failures=3, cooldown=60)
+    pool.add("http://a:1", 0.1)
+    pool.add("http://b:1", 0.1)
+    pool.report_failure("http://a:1")
+    
+    assert not pool.is_available("http://a:1")
+    assert {pool.select() for _ in range(50)} == {"http://b:1"}
+
+class HealthRecorder:
+    def __init__(self):
+        self.events = []
+    
+    def report_success(self, proxy, latency):
+        self.events.append(("success", proxy, latency))
+    
+    def report_failure(self, proxy):
+        self.events.append(("failure", proxy))
+
+class FakeRequest:
+    def __init__(self, timing):
+        self.timing = timing
+
+class FakeResponse:
+    def __init__(self, status, timing):
+        self.status = status
+        self.headers = {"content-type": "application/json"}
+        self.request = FakeRequest(timing)
+
+class FakePage:
+    def __init__(self, outcome):
+        self.outcome = outcome
+    
+    async def goto(self, url, **kwargs):
+        if isinstance(self.outcome, Exception):
+            raise self.outcome
+        return self.outcome
+    
+    async def close(self):
+        pass
+
+class FakeTools:
+    def __init__(self, outcome):
+        self.outcome = outcome
+    
+    async def new_page(self):
+        return FakePage(self.outcome)
+    
+    def proxy_for_page(self, page):
+        return "http://proxy:1"
+
+class FakeProfiles:
+    def for_url(self, url):
+        return {"timeout": 30, "wait": "load"}
+
+def scrape_with(lens, outcome):
+    scraper = lens.Scraper.__new__(lens.Scraper)
+    scraper.browser_tools = FakeTools(outcome)
+    scraper.profiles = FakeProfiles()
+    scraper.proxy_manager = HealthRecorder()
+    
+    async def run():
+        try:
+            return await scraper._scrape_page("https://a/", 1)
+        except Exception as e:
+            return e
+    
+    return asyncio.run(run()), scraper.proxy_manager.events
+
+@pytest.mark.parametrize("message, charged", [
+    ("net::ERR_PROXY_CONNECTION_FAILED at https://a/", True),
+    ("net::ERR_TUNNEL_CONNECTION_FAILED at https://a/", True),
+    ("net::ERR_CONNECTION_REFUSED at https://a/", True),
+    ("net::ERR_NAME_NOT_RESOLVED at https://a/", False),
+    ("net::ERR_CERT_DATE_INVALID at https://a/", False),
+    ("net::ERR_ABORTED at https://a/", False),
+])
+def test_only_proxy_errors_count_against_the_proxy(lens, message, charged):
+    """Navigation failures are charged to the proxy only when the proxy caused them."""
+    result, events = scrape_with(lens, PlaywrightError(message))
+    assert isinstance(result, PlaywrightError)
+    assert events == ([("failure", "http://proxy:1")] if charged else [])
+
+def test_target_overload_does_not_count_against_the_proxy(lens):
+    """A 503 from the target is retried without touching proxy health; a 429 charges the throttled exit."""
+    result, events = scrape_with(lens, FakeResponse(503, {"responseStart": 40.0}))
+    assert isinstance(result, lens.RetryableStatusError)
+    assert events == []
+    
+    result, events = scrape_with(lens, FakeResponse(429, {"responseStart": 40.0}))
+    assert isinstance(result, lens.RetryableStatusError)
+    assert events == [("failure", "http://proxy:1")]
+
+def test_success_latency_is_time_to_response_start(lens):
+    """Proxy latency is the response-start time, falling back to the load time when it's unknown."""
+    result, events = scrape_with(lens, FakeResponse(200, {"responseStart": 250.0}))
+    assert result["status_code"] == 200
+    assert events == [("success", "http://proxy:1", 0.25)]
+    
+    _, events = scrape_with(lens, FakeResponse(200, {"responseStart": -1}))
+    assert events[0][2] == pytest.approx(0, abs=0.5)
@@ -0,0 +1,115 @@
+"""
+Tests for concurrent proxy verification against local stand-in proxies.
+"""
+import asyncio
+import socket
+
+import pytest
+
+class ProxyConfig:
+    def __init__(self, directory, proxies):
+        self.config_dir = str(directory)
+        self.proxies = proxies
+        self.values = {"USE_PROXIES": "true", "PROXY_TEST_TIMEOUT": "2", "PROXY_VERIFY_CONCURRENCY": "8"}
+    
+    def get(self, key, default=None):
+        return self.values.get(key, default)
+    
+    def save_proxies(self, proxies):
+        self.proxies = proxies
+
+async def start_stand_in_proxy(requests):
+    """HTTP proxy stand-in that answers every forwarded request with 200 and records its target"""
+    async def handle(reader, writer):
+        request_line = await reader.readline()
+        while (await reader.readline()) not in (b"\r\n", b""):
+            pass
+        requests.append(request_line.split()[1].decode())
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\nContent-Length: 2\r\nConnection: close\r\n\r\n{}")
+        await writer.drain()
+        writer.close()
+    
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    return server, f"http://127.0.0.1:{server.sockets[0].getsockname()[1]}"
+
+def unused_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+@pytest.fixture
+def manager_for(lens, tmp_path):
+    def make(proxies):
+        return lens.ProxyManager(ProxyConfig(tmp_path, proxies))
+    return make
+
+def test_verify_keeps_working_proxies(manager_for):
+    """Working proxies are kept with their latency; dead ones and unsupported types are dropped."""
+    requests = []
+    
+    async def run():
+        server, good = await start_stand_in_proxy(requests)
+        dead = f"http://127.0.0.1:{unused_port()}"
+        manager = manager_for({"http": [good, dead], "ftp": ["ftp://127.0.0.1:21"]})
+        async with server:
+            await manager.verify_proxies(test_url="http://check.invalid/ip", show_progress=False)
+        return manager, good, dead
+    
+    manager, good, dead = asyncio.run(run())
+    assert manager.proxies["http"] == [good]
+    assert "ftp" not in manager.proxies
+    assert requests == ["http://check.invalid/ip"]
+    assert manager.proxy_latencies[good] > 0
+    assert manager.cache["verified"][dead]["latency"] is None
+    assert manager.get_next_proxy() == good
+
+def test_verify_stops_at_target(manager_for):
+    """Verification stops once the target number of working proxies is reached."""
+    async def run():
+        servers = [await start_stand_in_proxy([]) for _ in range(6)]
+        manager = manager_for({"http": [url for _, url in servers]})
+        await manager.verify_proxies(target_count=2, concurrency=1, test_url="http://check.invalid/", show_progress=False)
+        for server, _ in servers:
+            server.close()
+        return manager
+    
+    manager = asyncio.run(run())
+    assert len(manager.proxies["http"]) == 2
+
+def test_cached_results_skip_retesting(manager_for):
+    """Fresh cached verifications are reused without contacting the proxy."""
+    async def run():
+        requests = []
+        server, good = await start_stand_in_proxy(requests)
+        manager = manager_for({"http": [good]})
+        async with server:
+            await manager.verify_proxies(test_url="http://check.invalid/", show_progress=False)
+            manager.proxies = {"http": [good]}
+            await manager.verify_proxies(test_url="http://check.invalid/", show_progress=False)
+        return requests, manager, good
+    
+    requests, manager, good = asyncio.run(run())
+    assert len(requests) == 1
+    assert manager.proxies["http"] == [good]
+
+def test_early_stop_keeps_untested_proxies(manager_for):
+    """Candidates an early stop never tested are saved as untested and tested on the next run."""
+    async def run():
+        servers = [await start_stand_in_proxy([]) for _ in range(5)]
+        urls = [url for _, url in servers]
+        manager = manager_for({"http": urls})
+        await manager.verify_proxies(target_count=2, concurrency=1, test_url="http://check.invalid/", show_progress=False)
+        first = {key: list(value) for key, value in manager.config.proxies.items()}
+        pool_size = len(manager.pool)
+        
+        await manager.verify_proxies(target_count=0, test_url="http://check.invalid/", show_progress=False)
+        for server, _ in servers:
+            server.close()
+        return urls, first, pool_size, manager
+    
+    urls, first, pool_size, manager = asyncio.run(run())
+    assert len(first["http"]) == 2
+    assert sorted(first["http"] + first["untested"]) == sorted(urls)
+    assert pool_size == 2
+    assert sorted(manager.proxies["http"]) == sorted(urls)
+    assert "untested" not in manager.config.proxies
@@ -0,0 +1,121 @@
+"""
+Tests for recording responses into a ResponseArchive and replaying them offline.
+"""
+import asyncio
+import os
+import types
+
+import pytest
+
+@pytest.fixture
+def archive_path(tmp_path):
+    return str(tmp_path / "archives" / "crawl.db")
+
+def test_modes_are_checked(lens, archive_path):
+    """Unknown modes are rejected and replay needs an existing archive."""
+    with pytest.raises(ValueError):
+        lens.ResponseArchive(archive_path, "live")
+    with pytest.raises(FileNotFoundError):
+        lens.ResponseArchive(archive_path, "replay")
+
+def test_recorded_responses_replay(lens, archive_path):
+    """Replay serves the recorded response, falling back across query strings, and counts misses."""
+    archive = lens.ResponseArchive(archive_path, "record")
+    headers = archive.record("GET", "https://a/app.js?v=1", 200, {"Content-Length": "2", "content-type": "text/javascript"}, b"v1")
+    archive.record("GET", "https://a/app.js?v=2", 200, {}, b"v2")
+    archive.record("GET", "https://a/", 200, {}, b"old")
+    archive.record("GET", "https://a/", 301, {"location": "/home"}, b"")
+    archive.close()
+    assert headers == {"content-type": "text/javascript"}
+    assert archive.stats["recorded"] == 4
+
+    archive = lens.ResponseArchive(archive_path, "replay")
+    try:
+        assert archive.lookup("GET", "https://a/app.js?v=1") == {"status": 200, "headers": {"content-type": "text/javascript"}, "body": b"v1"}
+        assert archive.lookup("GET", "https://a/app.js?v=999#x")["body"] == b"v2"
+        assert archive.lookup("GET", "https://a/") == {"status": 301, "headers": {"location": "/home"}, "body": b""}
+        assert archive.lookup("POST", "https://a/") is None
+        assert archive.stats == {"recorded": 0, "replayed": 3, "missed": 1}
+    finally:
+        archive.close()
+
+class FakeResponse:
+    status = 200
+    headers = {"content-type": "text/html", "content-encoding": "br"}
+
+    async def body(self):
+        return b"<p>hi</p>"
+
+class FakeRoute:
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.fulfilled = None
+        self.aborted = None
+
+    async def fetch(self, max_redirects=None):
+        assert max_redirects == 0
+        if self.fail:
+            raise OSError("connection reset")
+        return FakeResponse()
+
+    async def fulfill(self, status, headers, body):
+        self.fulfilled = (status, headers, body)
+
+    async def abort(self, error_code):
+        self.aborted = error_code
+
+def route_through(tools, url, fail=False):
+    route = FakeRoute(fail)
+    asyncio.run(tools._handle_route(None, route, types.SimpleNamespace(method="GET", url=url)))
+    return route
+
+def test_route_handler_records_then_replays(lens, archive_path, monkeypatch):
+    """Recording fetches and stores each response; replay fulfills from the archive or aborts as offline."""
+    monkeypatch.setattr(lens.random, "uniform", lambda low, high: 0)
+    tools = lens.BrowserTools.__new__(lens.BrowserTools)
+    tools.archive = lens.ResponseArchive(archive_path, "record")
+    route = route_through(tools, "https://a/")
+    assert route.fulfilled == (200, {"content-type": "text/html"}, b"<p>hi</p>")
+    assert route_through(tools, "https://a/down", fail=True).aborted == "failed"
+    tools.archive.close()
+
+    tools.archive = lens.ResponseArchive(archive_path, "replay")
+    try:
+        assert route_through(tools, "https://a/").fulfilled == (200, {"content-type": "text/html"}, b"<p>hi</p>")
+        assert route_through(tools, "https://a/down").aborted == "internetdisconnected"
+    finally:
+        tools.archive.close()
+
+def test_http_fetch_path_records_and_replays(lens, archive_path, monkeypatch):
+    """Fetches outside the browser go through the archive too, and replay misses fail like network errors."""
+    scraper = lens.Scraper.__new__(lens.Scraper)
+    scraper.request_timeout = 5
+    scraper.browser_tools = types.SimpleNamespace(archive=lens.ResponseArchive(archive_path, "record"))
+    live = types.SimpleNamespace(status_code=200, headers={"content-type": "application/pdf"}, content=b"%PDF")
+    monkeypatch.setattr(lens.requests, "get", lambda url, headers, timeout: live)
+    assert asyncio.run(scraper._http_get("https://a/doc.pdf", {})) is live
+    scraper.browser_tools.archive.close()
+
+    scraper.browser_tools.archive = lens.ResponseArchive(archive_path, "replay")
+    monkeypatch.setattr(lens.requests, "get", lambda *args, **kwargs: pytest.fail("replay must not hit the network"))
+    try:
+        replayed = asyncio.run(scraper._http_get("https://a/doc.pdf", {}))
+        assert (replayed.status_code, replayed.content) == (200, b"%PDF")
+        with pytest.raises(lens.requests.ConnectionError):
+            asyncio.run(scraper._http_get("https://a/missing.pdf", {}))
+    finally:
+        scraper.browser_tools.archive.close()
+
+def test_use_archive_sets_the_mode(lens, tmp_path, monkeypatch):
+    """--record and --replay select the archive mode and path; both at once is an error."""
+    # Set first so monkeypatch restores them after use_archive overwrites them
+    monkeypatch.setenv("ARCHIVE_MODE", "off")
+    monkeypatch.setenv("ARCHIVE_PATH", "")
+    monkeypatch.chdir(tmp_path)
+    with pytest.raises(lens.typer.BadParameter):
+        lens.use_archive("a.db", "b.db")
+    lens.use_archive()
+    assert os.environ["ARCHIVE_MODE"] == "off"
+
+    lens.use_archive(replay="crawl.db")
+    assert (os.environ["ARCHIVE_MODE"], os.environ["ARCHIVE_PATH"]) == ("replay", str(tmp_path / "crawl.db"))
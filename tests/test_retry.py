@@ -0,0 +1,33 @@
+"""
+Tests for retry classification and backoff.
+"""
+import email.utils
+import time
+
+import pytest
+
+def test_retry_after_seconds(lens):
+    """Delay-seconds values are used as-is."""
+    assert lens.parse_retry_after("120") == 120.0
+    assert lens.parse_retry_after(" 5 ") == 5.0
+
+def test_retry_after_http_date(lens):
+    """HTTP-date values become the time remaining until that date."""
+    header = email.utils.formatdate(time.time() + 90, usegmt=True)
+    assert 85 <= lens.parse_retry_after(header) <= 91
+    
+    past = email.utils.formatdate(time.time() - 90, usegmt=True)
+    assert lens.parse_retry_after(past) == 0.0
+
+@pytest.mark.parametrize("value", [None, "", "soon", "-5"])
+def test_retry_after_invalid(lens, value):
+    """Missing or unparseable values give no hint."""
+    assert lens.parse_retry_after(value) is None
+
+def test_classify_scrape_error(lens):
+    """Throttling, timeouts and network errors are retryable classes; the rest is fatal."""
+    assert lens.classify_scrape_error(lens.RetryableStatusError(429, 3)) == "throttled"
+    assert lens.classify_scrape_error(lens.PlaywrightTimeoutError("Timeout 30000ms exceeded")) == "timeout"
+    assert lens.classify_scrape_error(lens.PlaywrightError("net::ERR_CONNECTION_RESET")) == "network"
+    assert lens.classify_scrape_error(lens.PlaywrightError("net::ERR_NAME_NOT_RESOLVED")) == "fatal"
+    assert lens.classify_scrape_error(ValueError("boom")) == "fatal"
@@ -0,0 +1,114 @@
+"""
+Tests for running report, sitemap and scrape jobs.
+"""
+import asyncio
+import sqlite3
+import threading
+
+import pytest
+
+class Config:
+    def __init__(self, data_dir, values):
+        self.data_dir = data_dir
+        self.values = values
+
+    def get(self, key, default=None):
+        return self.values.get(key, default)
+
+@pytest.fixture
+def scraper(lens, tmp_path):
+    scraper = lens.Scraper(Config(str(tmp_path), {"SCRAPE_DB_PATH": str(tmp_path / "scrape.db")}))
+    scraper.browser_tools.browser = object()  # never launched; pages come from the fake below
+    yield scraper
+    scraper.db_writer.close()
+
+def session_statuses(scraper):
+    conn = sqlite3.connect(scraper.db_path)
+    try:
+        return [row[0] for row in conn.execute("SELECT status FROM scrape_sessions ORDER BY id")]
+    finally:
+        conn.close()
+
+def test_cancelled_scrape_marks_its_session(scraper):
+    """A scrape cancelled mid-crawl leaves its session cancelled, not in_progress."""
+    started = asyncio.Event()
+
+    async def scrape_page(url, session_id, take_screenshots=True):
+        started.set()
+        await asyncio.sleep(60)
+
+    scraper._scrape_page = scrape_page
+    events = []
+
+    async def run():
+        task = asyncio.create_task(scraper.scrape_url("https://a/", 0, 1, False, False, on_progress=events.append))
+        await started.wait()
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        await scraper.db_writer.run(lambda conn: None)
+
+    asyncio.run(run())
+    assert session_statuses(scraper) == ["cancelled"]
+    assert events[-1]["event"] == "session_cancelled"
+
+def test_report_jobs_run_exporters_on_the_callers_loop(lens):
+    """Report and sitemap jobs await the exporters, whose blocking part runs in a worker thread."""
+    app = lens.ElysianLens.__new__(lens.ElysianLens)
+    threads = []
+
+    def export(session_id):
+        threads.append(threading.current_thread())
+        return f"/tmp/report_{session_id}.pdf" if session_id == 7 else None
+
+    app._export_pdf_report = export
+    app._generate_site_map = export
+
+    async def run():
+        result = await app.run_job("report", {"session_id": "7"})
+        with pytest.raises(RuntimeError):
+            await app.run_job("sitemap", {"session_id": 8})
+        return result
+
+    assert asyncio.run(run()) == {"session_id": 7, "path": "/tmp/report_7.pdf"}
+    assert threads and all(thread is not threading.main_thread() for thread in threads)
+
+class LostLeaseQueue:
+    """Job queue stand-in that hands out one job and then refuses its heartbeat"""
+    lease_seconds = 0.03
+
+    def __init__(self):
+        self.jobs = [{"id": 1, "type": "scrape", "params": {}, "attempts": 1, "max_attempts": 3}]
+
+    def claim(self, worker_id):
+        return self.jobs.pop() if self.jobs else None
+
+    def heartbeat(self, job_id, worker_id):
+        return False
+
+    def counts(self):
+        return {}
+
+def test_lost_lease_waits_for_the_abandoned_job_to_clean_up(lens):
+    """The worker cancels a job whose lease was lost and waits for its cleanup before returning."""
+    app = lens.ElysianLens.__new__(lens.ElysianLens)
+    app.config = Config("", {"WORKER_POLL_INTERVAL": "0.01"})
+    app.job_queue = LostLeaseQueue()
+    cleaned_up = []
+
+    async def run_job(job_type, params, on_progress=None):
+        try:
+            await asyncio.sleep(60)
+        finally:
+            await asyncio.sleep(0.2)
+            cleaned_up.append(job_type)
+
+    app.run_job = run_job
+
+    async def run():
+        summary = await app.run_worker(worker_id="w", concurrency=1, drain=True)
+        return summary, list(cleaned_up)
+
+    summary, cleaned_up_on_return = asyncio.run(run())
+    assert summary["lost"] == 1
+    assert cleaned_up_on_return == ["scrape"]
@@ -0,0 +1,110 @@
+"""
+Tests for screenshot encoding, scaling and perceptual-hash dedup in ScreenshotPipeline.
+"""
+import asyncio
+import io
+import os
+
+import numpy as np
+import pytest
+from PIL import Image
+
+class Config:
+    def __init__(self, data_dir, values):
+        self.data_dir = data_dir
+        self.values = values
+
+    def get(self, key, default=None):
+        return self.values.get(key, default)
+
+def gradient(width=120, height=80, horizontal=True):
+    """PNG bytes of a grey ramp running left to right or top to bottom"""
+    ramp = np.linspace(0, 255, width if horizontal else height, dtype=np.uint8)
+    pixels = np.tile(ramp, (height, 1)) if horizontal else np.tile(ramp[:, None], (1, width))
+    buffer = io.BytesIO()
+    Image.fromarray(pixels).convert("RGB").save(buffer, "PNG")
+    return buffer.getvalue()
+
+class FakeBrowserTools:
+    device_scale_factor = 2.0
+
+    def __init__(self, image=None):
+        self.image = image or gradient()
+        self.calls = []
+
+    async def capture_screenshot(self, page, **options):
+        self.calls.append(options)
+        if options["image_type"] == "jpeg":
+            buffer = io.BytesIO()
+            Image.open(io.BytesIO(self.image)).save(buffer, "JPEG", quality=options["quality"])
+            return buffer.getvalue()
+        return self.image
+
+def make_pipeline(lens, tmp_path, **values):
+    tools = FakeBrowserTools()
+    pipeline = lens.ScreenshotPipeline(Config(str(tmp_path), {key.upper(): str(value) for key, value in values.items()}), tools)
+    return pipeline, tools
+
+def capture(pipeline, url, session_id=1, **options):
+    return asyncio.run(pipeline.capture(None, url, session_id, **options))
+
+def test_jpeg_at_css_scale_is_encoded_by_the_browser(lens, tmp_path):
+    """Unscaled JPEG is captured natively and written as-is with the configured quality."""
+    pipeline, tools = make_pipeline(lens, tmp_path, screenshot_quality=55, screenshot_max_height=3000)
+    path, info = capture(pipeline, "https://a/page")
+
+    assert tools.calls == [{"scope": "full", "max_height": 3000, "image_type": "jpeg", "quality": 55, "scale": "css"}]
+    assert path.endswith(".jpg") and os.path.getsize(path) == info["bytes"] > 0
+    assert info["deduplicated"] is False
+    with Image.open(path) as image:
+        assert image.format == "JPEG"
+
+def test_downscaled_webp_is_resized_off_the_browser(lens, tmp_path):
+    """A reduced scale captures PNG at CSS pixels and resizes it before encoding."""
+    pipeline, tools = make_pipeline(lens, tmp_path, screenshot_format="webp", screenshot_scale=0.5)
+    path, _ = capture(pipeline, "https://a/page", scope="viewport", max_height=500)
+
+    assert tools.calls[0]["image_type"] == "png" and tools.calls[0]["scale"] == "css"
+    assert (tools.calls[0]["scope"], tools.calls[0]["max_height"]) == ("viewport", 500)
+    with Image.open(path) as image:
+        assert (image.format, image.size) == ("WEBP", (60, 40))
+
+def test_upscaling_captures_device_pixels(lens, tmp_path):
+    """A scale above 1 captures at device pixels and resizes from there."""
+    pipeline, tools = make_pipeline(lens, tmp_path, screenshot_format="png", screenshot_scale=2)
+    path, _ = capture(pipeline, "https://a/page")
+
+    assert tools.calls[0]["scale"] == "device"
+    with Image.open(path) as image:
+        assert image.size == (120, 80)
+
+def test_unsupported_format_falls_back_to_png(lens, tmp_path):
+    """An unknown SCREENSHOT_FORMAT is replaced with PNG."""
+    pipeline, _ = make_pipeline(lens, tmp_path, screenshot_format="tiff")
+    path, _ = capture(pipeline, "https://a/page")
+    assert pipeline.format == "png" and path.endswith(".png")
+
+def test_identical_templates_are_stored_once_per_session(lens, tmp_path):
+    """A page that looks like one already captured in the session reuses its file."""
+    pipeline, tools = make_pipeline(lens, tmp_path, screenshot_format="png")
+    first, _ = capture(pipeline, "https://a/one")
+    second, info = capture(pipeline, "https://a/two")
+    assert (second, info) == (first, {"deduplicated": True, "bytes": 0})
+    assert os.listdir(os.path.dirname(first)) == [os.path.basename(first)]
+
+    tools.image = gradient(horizontal=False)
+    third, info = capture(pipeline, "https://a/three")
+    assert third != first and not info["deduplicated"]
+
+    # Other sessions and discarded sessions start with an empty index
+    tools.image = gradient()
+    assert not capture(pipeline, "https://a/one", session_id=2)[1]["deduplicated"]
+    pipeline.discard(1)
+    assert not capture(pipeline, "https://a/two")[1]["deduplicated"]
+
+@pytest.mark.parametrize("distance, deduplicated", [(-1, False), (0, True)])
+def test_dedup_distance(lens, tmp_path, distance, deduplicated):
+    """A negative SCREENSHOT_DEDUP_DISTANCE turns dedup off; zero only merges exact hash matches."""
+    pipeline, _ = make_pipeline(lens, tmp_path, screenshot_format="png", screenshot_dedup_distance=distance)
+    capture(pipeline, "https://a/one")
+    assert capture(pipeline, "https://a/two")[1]["deduplicated"] is deduplicated
@@ -0,0 +1,35 @@
+"""
+Tests for tiled screenshot manifests.
+"""
+import json
+
+from PIL import Image
+
+def write_tiles(directory, heights, width=40):
+    tiles = []
+    y = 0
+    for i, height in enumerate(heights):
+        name = f"tile_{i:04d}.png"
+        Image.new("RGB", (width, height), (i * 60, 0, 0)).save(directory / name)
+        tiles.append({"file": name, "y": y, "offset": 0, "height": height})
+        y += height
+    manifest = directory / "manifest.json"
+    manifest.write_text(json.dumps({"width": width, "tile_height": max(heights), "total_height": y, "tiles": tiles}))
+    return manifest
+
+def test_preview_of_tiled_capture_is_first_tile(lens, tmp_path):
+    """Reports show the first tile instead of the manifest itself."""
+    manifest = write_tiles(tmp_path, [30, 30])
+    
+    assert lens.BrowserTools.preview_image(str(manifest)) == str(tmp_path / "tile_0000.png")
+    assert lens.BrowserTools.preview_image("/shots/page.jpg") == "/shots/page.jpg"
+    assert lens.BrowserTools.preview_image(None) is None
+
+def test_stitch_tiles(lens, tmp_path):
+    """Stitching places every tile at its offset on one canvas."""
+    manifest = write_tiles(tmp_path, [30, 30, 10])
+    output = lens.BrowserTools.stitch_tiles(str(manifest))
+    
+    with Image.open(output) as image:
+        assert image.size == (40, 70)
+        assert image.getpixel((0, 65)) == (120, 0, 0)
@@ -0,0 +1,96 @@
+"""
+Tests for SimHash signatures and the LSH near-duplicate index.
+"""
+import asyncio
+import random
+
+import pytest
+
+WORDS = "alpha beta gamma delta epsilon zeta eta theta iota kappa lambda mu nu xi omicron pi rho sigma".split()
+
+def text(seed, length=300):
+    rng = random.Random(seed)
+    return " ".join(rng.choice(WORDS) + str(rng.randrange(50)) for _ in range(length))
+
+def test_signature_needs_enough_tokens(lens):
+    """Short texts have no signature."""
+    assert lens.SimHashIndex.signature("too short", min_tokens=20) is None
+    assert lens.SimHashIndex.signature(text(1)) == lens.SimHashIndex.signature(text(1))
+
+def test_small_edit_stays_near(lens):
+    """A one-word edit flips far fewer bits than switching to an unrelated text."""
+    original = text(2)
+    edited = original.replace(original.split()[100], "changed", 1)
+    a, b, c = (lens.SimHashIndex.signature(t) for t in (original, edited, text(3)))
+    
+    assert bin(a ^ b).count("1") <= 8
+    assert bin(a ^ c).count("1") >= 20
+
+def test_index_finds_every_signature_in_range(lens):
+    """Band splitting finds all signatures within max_distance bits."""
+    rng = random.Random(4)
+    index = lens.SimHashIndex(max_distance=3)
+    base = rng.getrandbits(64)
+    index.add(base, "base")
+    
+    for _ in range(200):
+        flipped = base
+        for bit in rng.sample(range(64), rng.randint(0, 3)):
+            flipped ^= 1 << bit
+        assert index.query(flipped)[0] == "base"
+    
+    far = base ^ 0b1111
+    assert index.query(far) is None
+
+def test_query_or_add_reserves_first_signature(lens):
+    """The first of two near-identical signatures is indexed; the second matches it."""
+    index = lens.SimHashIndex(max_distance=3)
+    assert index.query_or_add(0b1010, "first") is None
+    assert index.query_or_add(0b1011, "second") == ("first", 1)
+    assert index.size == 1
+
+def test_remove_releases_reservation(lens):
+    """A removed signature no longer matches."""
+    index = lens.SimHashIndex(max_distance=3)
+    index.query_or_add(12345, "page")
+    index.remove(12345, "page")
+    index.remove(12345, "page")
+    
+    assert index.query(12345) is None
+    assert index.size == 0
+
+@pytest.fixture
+def scraper(lens):
+    scraper = lens.Scraper.__new__(lens.Scraper)
+    scraper.near_duplicate_indexes = {}
+    scraper.near_duplicate_distance = 3
+    return scraper
+
+def test_copy_waits_for_the_canonical_page_id(scraper):
+    """A near-identical copy waits until the canonical page is stored and reports its id."""
+    async def run():
+        reservation, duplicate_of, _ = await scraper._reserve_canonical(1, 0b1010)
+        assert duplicate_of is None
+        copy = asyncio.create_task(scraper._reserve_canonical(1, 0b1011))
+        await asyncio.sleep(0)
+        assert not copy.done()
+        reservation.set_result(42)
+        return await copy
+
+    assert asyncio.run(run()) == (None, 42, 1)
+
+def test_copy_becomes_canonical_when_the_original_fails(scraper):
+    """If the canonical page fails before it is stored, a waiting copy takes its place."""
+    async def run():
+        reservation, _, _ = await scraper._reserve_canonical(1, 0b1010)
+        copy = asyncio.create_task(scraper._reserve_canonical(1, 0b1011))
+        await asyncio.sleep(0)
+        # What _scrape_page does for a page that fails before db_write
+        scraper.near_duplicate_indexes[1].remove(0b1010, reservation)
+        reservation.set_result(None)
+        new_reservation, duplicate_of, _ = await copy
+        assert duplicate_of is None
+        assert new_reservation is not None and not new_reservation.done()
+        assert scraper.near_duplicate_indexes[1].query(0b1010) == (new_reservation, 1)
+
+    asyncio.run(run())
@@ -0,0 +1,112 @@
+"""
+Tests for per-stage page timings, their histograms and the stats command.
+"""
+import asyncio
+import sqlite3
+import types
+
+import pytest
+from typer.testing import CliRunner
+
+def test_stage_timer_accumulates_and_times_failed_stages(lens):
+    """Repeated stages add up, and a stage that raises is still timed."""
+    timer = lens.StageTimer()
+    with timer.stage("evaluate"):
+        pass
+    with pytest.raises(ValueError):
+        with timer.stage("evaluate"):
+            raise ValueError("script error")
+    assert list(timer.durations) == ["evaluate"]
+    assert timer.durations["evaluate"] >= 0
+
+def test_histogram_quantiles(lens):
+    """Quantiles are bucket upper bounds, capped at the largest observation and past the last bucket."""
+    histogram = lens.StageHistogram()
+    assert histogram.quantile(0.5) is None
+    assert histogram.to_dict()["mean"] is None
+
+    for value in (0.004, 0.004, 0.2, 45.0):
+        histogram.observe(value)
+    summary = histogram.to_dict()
+    assert (summary["p50"], summary["p95"], summary["max"]) == (0.005, 45.0, 45.0)
+    assert histogram.quantile(0.75) == 0.25
+    assert summary["buckets"]["0.005"] == 2 and summary["buckets"]["30.0"] == 3 and summary["buckets"]["+Inf"] == 4
+
+    small = lens.StageHistogram()
+    small.observe(0.002)
+    assert small.quantile(0.95) == 0.002
+
+def store_timings(lens, db_path, rows):
+    conn = sqlite3.connect(db_path)
+    for session_id, page_id, url, durations in rows:
+        timer = lens.StageTimer()
+        timer.durations = durations
+        timer.store(conn, session_id, page_id, url)
+    conn.commit()
+    conn.close()
+
+@pytest.fixture
+def timings_app(lens, db_path):
+    store_timings(lens, db_path, [
+        (1, 1, "https://a/1", {"goto": 1.0, "screenshot": 3.0}),
+        (1, 2, "https://a/2", {"goto": 0.5, "wait": 0.25}),
+        (1, 3, "https://b/1", {"goto": 0.1}),
+        (2, 4, "https://a/3", {"goto": 9.0}),
+    ])
+    app = lens.ElysianLens.__new__(lens.ElysianLens)
+    app.scraper = types.SimpleNamespace(db_path=db_path)
+    return app
+
+def test_stage_timings_aggregate_per_domain(timings_app):
+    """Timings are grouped by domain and stage, slowest first, and can be filtered."""
+    domains = asyncio.run(timings_app.stage_timings(session_id=1))
+    assert list(domains) == ["a", "b"]
+    assert (domains["a"]["pages"], domains["a"]["total"]) == (2, 4.75)
+    assert list(domains["a"]["stages"]) == ["screenshot", "goto", "wait"]
+    assert domains["a"]["stages"]["goto"]["count"] == 2
+
+    assert list(asyncio.run(timings_app.stage_timings(domain="a"))["a"]["stages"]) == ["goto", "screenshot", "wait"]
+    assert asyncio.run(timings_app.stage_timings(session_id=99)) == {}
+
+class FakeLens:
+    instances = []
+    domains = {}
+
+    def __init__(self):
+        self.closed = False
+        FakeLens.instances.append(self)
+
+    async def stage_timings(self, session_id, domain):
+        return self.domains
+
+    async def close(self):
+        self.closed = True
+
+def run_stats(lens, monkeypatch, app_class, *args):
+    monkeypatch.setattr(lens, "ElysianLens", app_class)
+    return CliRunner().invoke(lens.app, ["stats", *args])
+
+def test_stats_command_reports_open_failures(lens, monkeypatch):
+    """A database that can't be opened is reported as an error, not a traceback."""
+    def broken():
+        raise sqlite3.DatabaseError("file is not a database")
+
+    result = run_stats(lens, monkeypatch, broken)
+    assert result.exit_code == 0
+    assert "Error: file is not a database" in result.output
+
+def test_stats_command_without_timings(lens, monkeypatch):
+    """An empty timing table prints a notice and still closes the application."""
+    FakeLens.instances.clear()
+    FakeLens.domains = {}
+    result = run_stats(lens, monkeypatch, FakeLens)
+    assert "No page timings recorded yet" in result.output
+    assert FakeLens.instances[0].closed
+
+def test_stats_command_limits_domains(lens, monkeypatch, timings_app):
+    """The slowest domains are tabulated up to --top."""
+    FakeLens.domains = asyncio.run(timings_app.stage_timings())
+    result = run_stats(lens, monkeypatch, FakeLens, "--top", "1")
+    assert result.exit_code == 0
+    assert "a - 3 pages" in result.output and "screenshot" in result.output
+    assert "... and 1 more domains" in result.output
@@ -0,0 +1,27 @@
+"""
+Tests for the synthetic benchmark site.
+"""
+import os
+import urllib.request
+
+def test_render_is_deterministic(lens):
+    """The same seed produces the same pages, each linking to the next."""
+    first = lens.SyntheticSite(pages=20, seed=7)
+    second = lens.SyntheticSite(pages=20, seed=7)
+    
+    assert first.render(3) == second.render(3)
+    assert 'href="/p/4"' in first.render(3)[0]
+
+def test_site_runs_in_child_process(lens):
+    """The site is served by a separate process that stops cleanly."""
+    site = lens.SyntheticSite(pages=5, js_fraction=0, slow_fraction=0)
+    site.start()
+    try:
+        assert site.pid != os.getpid()
+        with urllib.request.urlopen(f"{site.base_url}/p/1", timeout=10) as response:
+            assert b"Synthetic page 1" in response.read()
+    finally:
+        process = site._process
+        site.stop()
+    
+    assert process.returncode is not None and site.pid is None
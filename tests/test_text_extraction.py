@@ -0,0 +1,108 @@
+"""
+Tests for offline HTML text extraction and stored-HTML re-extraction.
+"""
+import asyncio
+import json
+import sqlite3
+import types
+
+import pytest
+
+@pytest.mark.parametrize("html, expected", [
+    # Omitted </head> before the body
+    ("<html><head><title>t</title><body><p>Hello world body text</p></body>", "Hello world body text"),
+    ("<head><title>t</title><meta charset=utf-8><p>After an unclosed head</p>", "After an unclosed head"),
+    # Unclosed boilerplate list items end at the next item and at the list's end tag
+    ('<ul><li class="menu-item">Home<li class="menu-item">About</ul><p>Main article text here</p>', "Main article text here"),
+    # Unclosed options end with their select
+    ("<select><option>a<option>b</select><p>Chosen text</p>", "Chosen text"),
+    # Unclosed paragraphs end at the next block
+    ("<p>One<p>Two<div>Three</div><p>Four", "One\nTwo\nThree\nFour"),
+    ("<table><tr><td>a<td>b<tr><td>c</table>after", "a\nb\nc\nafter"),
+])
+def test_omitted_end_tags_keep_the_document(lens, html, expected):
+    """End tags HTML lets authors omit don't swallow the rest of the page."""
+    assert lens.extract_text_from_html(html) == expected
+
+def test_boilerplate_and_hidden_elements_are_dropped(lens):
+    """Scripts, navigation and boilerplate-classed blocks are removed, nested or not."""
+    html = """<html><head><script>var x = "<p>no</p>";</script></head><body>
+        <nav><ul><li><a href="/">Home</a></ul></nav>
+        <div class="sidebar"><div><p>Side <b>note</b></p></div></div>
+        <article><h1>Title</h1><p>Body <a href="#">link</a> text and more words</p></article>
+        <footer>Copyright</footer></body></html>"""
+    assert lens.extract_text_from_html(html) == "Title\nBody link text and more words"
+
+def test_link_dominated_blocks_are_dropped(lens):
+    """Blocks that are mostly link text are treated as menus."""
+    html = '<div><a href="/a">Alpha</a> <a href="/b">Beta</a> x</div><p>Real <a href="/c">content</a> paragraph here</p>'
+    assert lens.extract_text_from_html(html) == "Real content paragraph here"
+
+def test_nested_links_do_not_leak_link_depth(lens):
+    """An unclosed link ends at the next link, so later text isn't counted as link text."""
+    html = '<p><a href="/x">one<a href="/y">two</a> plain words that are not links at all</p>'
+    assert lens.extract_text_from_html(html) == "onetwo plain words that are not links at all"
+
+def store_pages(db_path, pages):
+    conn = sqlite3.connect(db_path)
+    conn.execute("INSERT INTO scrape_sessions (id, url, timestamp, status) VALUES (1, 'https://a/', 't', 'completed')")
+    conn.execute("INSERT INTO scrape_sessions (id, url, timestamp, status) VALUES (2, 'https://b/', 't', 'completed')")
+    for page_id, session_id, html in pages:
+        conn.execute(
+            "INSERT INTO pages (id, session_id, url, content_hash, timestamp) VALUES (?, ?, ?, 'h', 't')",
+            (page_id, session_id, f"https://a/{page_id}"),
+        )
+        conn.execute(
+            "INSERT INTO page_content (page_id, content_type, content, metadata) VALUES (?, 'html', ?, '{}')",
+            (page_id, html),
+        )
+        conn.execute(
+            "INSERT INTO page_content (page_id, content_type, content, metadata) VALUES (?, 'text', 'stale', '{}')",
+            (page_id,),
+        )
+    conn.commit()
+    conn.close()
+
+def texts(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        return dict(conn.execute("SELECT page_id, content FROM page_content WHERE content_type = 'text' ORDER BY page_id"))
+    finally:
+        conn.close()
+
+@pytest.fixture
+def extractor(lens, config):
+    config.values.update({"EXTRACTION_WORKERS": "1", "EXTRACTION_BATCH_SIZE": "2"})
+    extractor = lens.ContentExtractor(config)
+    yield extractor
+    extractor.close()
+
+def test_reextract_replaces_text_for_selected_sessions(db_path, extractor):
+    """Re-extraction pages through stored HTML and replaces only the selected sessions' text."""
+    store_pages(db_path, [
+        (1, 1, "<head><title>t</title><p>First page</p>"),
+        (2, 1, "<p>Second page"),
+        (3, 1, "<ul><li class=menu>Menu<li class=menu>More</ul><p>Third page</p>"),
+        (4, 2, "<p>Other session</p>"),
+    ])
+    batches = []
+    stats = extractor.reextract(db_path, session_ids=[1], on_batch=batches.append)
+
+    assert stats["pages"] == 3
+    assert batches == [2, 3]
+    assert texts(db_path) == {1: "First page", 2: "Second page", 3: "Third page", 4: "stale"}
+
+    conn = sqlite3.connect(db_path)
+    metadata = conn.execute("SELECT metadata FROM page_content WHERE page_id = 1 AND content_type = 'text'").fetchone()[0]
+    conn.close()
+    assert json.loads(metadata) == {"extracted_from": "html", "extractor": "offline"}
+
+def test_reextract_text_runs_off_the_event_loop(lens, db_path, extractor):
+    """ElysianLens.reextract_text re-extracts every session when none are given."""
+    store_pages(db_path, [(1, 1, "<p>One</p>"), (2, 2, "<p>Two</p>")])
+    app = lens.ElysianLens.__new__(lens.ElysianLens)
+    app.scraper = types.SimpleNamespace(content_extractor=extractor, db_path=db_path)
+
+    stats = asyncio.run(app.reextract_text())
+    assert stats["pages"] == 2
+    assert texts(db_path) == {1: "One", 2: "Two"}
@@ -0,0 +1,160 @@
+"""
+Tests for URL scoring, scorer loading and sitemap priority seeding.
+"""
+import asyncio
+import gzip
+import types
+
+import pytest
+
+def candidate(url, depth=1, anchor_text="", inlinks=0, sitemap_priority=None):
+    return {
+        "url": url, "depth": depth, "anchor_text": anchor_text, "inlinks": inlinks,
+        "sitemap_priority": sitemap_priority, "source_url": "https://a/",
+    }
+
+@pytest.fixture
+def scorer(lens, config):
+    config.profiles = {"a": {"url_rules": [{"pattern": r"/tag/", "weight": -3}, [r"/articles/", 2], ["(", 1]]}}
+    return lens.UrlScorer(config)
+
+def test_scoring_order(scorer):
+    """Content links outrank boilerplate, deep, query-heavy and rule-penalized links."""
+    ranked = sorted([
+        candidate("https://a/page/2", anchor_text="next"),
+        candidate("https://a/story", anchor_text="How the river changed its course"),
+        candidate("https://a/story?utm_source=x&utm_medium=y", anchor_text="How the river changed its course"),
+        candidate("https://a/deep/story", depth=4, anchor_text="How the river changed its course"),
+        candidate("https://a/tag/rivers", anchor_text="Rivers and lakes of the north"),
+        candidate("https://a/articles/river", anchor_text="How the river changed its course"),
+    ], key=scorer, reverse=True)
+    assert [c["url"] for c in ranked] == [
+        "https://a/articles/river",
+        "https://a/story",
+        "https://a/story?utm_source=x&utm_medium=y",
+        "https://a/page/2",
+        "https://a/deep/story",
+        "https://a/tag/rivers",
+    ]
+
+def test_inlinks_and_sitemap_priority_raise_the_score(scorer):
+    """More in-links and a higher sitemap priority score higher; a missing priority is neutral."""
+    url = "https://a/story"
+    assert scorer(candidate(url, inlinks=5)) > scorer(candidate(url, inlinks=1)) > scorer(candidate(url))
+    assert scorer(candidate(url, sitemap_priority=0.9)) > scorer(candidate(url)) > scorer(candidate(url, sitemap_priority=0.1))
+    assert scorer(candidate(url, sitemap_priority=0.5)) == scorer(candidate(url))
+
+def test_profile_weights_override_defaults(lens, config):
+    """A domain's score_weights replace the default weights for its URLs."""
+    config.profiles = {"b": {"score_weights": {"depth": 0.0}}}
+    scorer = lens.UrlScorer(config)
+    assert scorer(candidate("https://b/x", depth=5)) == scorer(candidate("https://b/x", depth=0))
+    assert scorer(candidate("https://a/x", depth=5)) < scorer(candidate("https://a/x", depth=0))
+
+def test_load_url_scorer_from_config(lens, config, tmp_path, monkeypatch):
+    """FRONTIER_ORDER selects BFS, the default scorer, a plugin function or a plugin class."""
+    (tmp_path / "my_scorers.py").write_text(
+        "def score(candidate):\n"
+        "    return len(candidate['url'])\n"
+        "\n"
+        "class Factory:\n"
+        "    def __init__(self, config):\n"
+        "        self.config = config\n"
+        "\n"
+        "    def __call__(self, candidate):\n"
+        "        return -candidate['depth']\n"
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    assert lens.load_url_scorer(config) is None
+    config.values["FRONTIER_ORDER"] = "Priority"
+    assert isinstance(lens.load_url_scorer(config), lens.UrlScorer)
+    config.values["FRONTIER_ORDER"] = "my_scorers"
+    assert lens.load_url_scorer(config)(candidate("https://a/x")) == 11
+    config.values["FRONTIER_ORDER"] = "my_scorers:Factory"
+    factory = lens.load_url_scorer(config)
+    assert factory.config is config and factory(candidate("https://a/x", depth=3)) == -3
+
+@pytest.mark.parametrize("order", ["no_such_module_xyz", "my_scorers:missing"])
+def test_unloadable_scorer_falls_back_to_bfs(lens, config, tmp_path, monkeypatch, order):
+    """A plugin that can't be imported or found falls back to BFS."""
+    (tmp_path / "my_scorers.py").write_text("def score(candidate):\n    return 0\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    config.values["FRONTIER_ORDER"] = order
+    assert lens.load_url_scorer(config) is None
+
+class InlinkFrontier:
+    async def count_inlinks(self, urls):
+        return [2] * len(urls)
+
+def test_score_links_negates_scores_and_survives_scorer_errors(lens):
+    """Links get the negated score as their priority; a failing scorer gives a neutral score."""
+    scraper = lens.Scraper.__new__(lens.Scraper)
+    links = [{"target_url": "https://a/good", "text": "x"}, {"target_url": "https://a/bad", "text": "y"}]
+    seen = []
+
+    def score(candidate):
+        seen.append(candidate)
+        if candidate["url"].endswith("bad"):
+            raise ValueError("broken plugin")
+        return 3
+
+    scraper.url_scorer = score
+    entries = asyncio.run(scraper._score_links(InlinkFrontier(), links, "https://a/", 2, {"https://a/good": 0.8}))
+    assert entries == [("https://a/good", 2, -3.0), ("https://a/bad", 2, 0.0)]
+    assert (seen[0]["inlinks"], seen[0]["sitemap_priority"], seen[1]["sitemap_priority"]) == (2, 0.8, None)
+
+    scraper.url_scorer = None
+    assert asyncio.run(scraper._score_links(None, links, "https://a/", 2, {})) == [
+        ("https://a/good", 2, 0.0), ("https://a/bad", 2, 0.0),
+    ]
+
+URLSET = b"""<?xml version="1.0"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+  <url><loc>https://a/important</loc><priority>0.9</priority></url>
+  <url><loc>https://a/default</loc></url>
+  <url><loc>https://a/garbled</loc><priority>high</priority></url>
+  <url><priority>1.0</priority></url>
+</urlset>"""
+
+INDEX = b"""<?xml version="1.0"?>
+<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+  <sitemap><loc>https://a/pages.xml.gz</loc></sitemap>
+  <sitemap><loc>https://a/missing.xml</loc></sitemap>
+  <sitemap><loc>https://a/broken.xml</loc></sitemap>
+</sitemapindex>"""
+
+def sitemap_scraper(lens, responses, max_files=10):
+    scraper = lens.Scraper.__new__(lens.Scraper)
+    scraper.browser_tools = types.SimpleNamespace(user_agents=["test-agent"])
+    scraper.sitemap_max_files = max_files
+    requested = []
+
+    async def http_get(url, headers):
+        requested.append(url)
+        if url not in responses:
+            raise OSError("connection refused")
+        status, content = responses[url]
+        return types.SimpleNamespace(status_code=status, content=content)
+
+    scraper._http_get = http_get
+    return scraper, requested
+
+def test_sitemap_priorities_follow_robots_and_indexes(lens):
+    """Sitemaps listed in robots.txt are read through indexes and gzip; unreadable ones are skipped."""
+    scraper, requested = sitemap_scraper(lens, {
+        "https://a/robots.txt": (200, b"User-agent: *\nSitemap: https://a/index.xml\n"),
+        "https://a/index.xml": (200, INDEX),
+        "https://a/pages.xml.gz": (200, gzip.compress(URLSET)),
+        "https://a/missing.xml": (404, b""),
+        "https://a/broken.xml": (200, b"<urlset"),
+    })
+    priorities = asyncio.run(scraper._sitemap_priorities("https://a/start"))
+    assert priorities == {"https://a/important": 0.9, "https://a/default": 0.5, "https://a/garbled": 0.5}
+    assert requested[:2] == ["https://a/robots.txt", "https://a/index.xml"]
+
+def test_sitemap_priorities_fall_back_to_sitemap_xml(lens):
+    """Without robots.txt the conventional /sitemap.xml is read, within the file budget."""
+    scraper, requested = sitemap_scraper(lens, {"https://a/sitemap.xml": (200, INDEX)}, max_files=2)
+    assert asyncio.run(scraper._sitemap_priorities("https://a/")) == {}
+    assert requested == ["https://a/robots.txt", "https://a/sitemap.xml", "https://a/pages.xml.gz"]